@@ -4,10 +4,13 @@
 
 from core.constants import *
 from core.utils import (
-    valid, normalize_engine_name, get_db_path,
+    valid, normalize_engine_name, get_db_path, get_learned_book_path,
     get_tier, classify_move_quality, build_pgn,
 )
-from core.elo import compute_elo_ratings, compute_elo_history
+from core.elo import compute_elo_ratings, compute_elo_history, EloService, EloHistory
+from core.ml_ratings import compute_ml_ratings, MLRatingService
 from core.board import Board
 from core.engine import UCIEngine, AnalyzerEngine
 from core.opening_book import OpeningBook
+from core.learned_book import LearnedBook, LearnedBookBuilder
+from core.engine_learning import EngineLearningFile
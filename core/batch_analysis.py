@@ -0,0 +1,238 @@
+# ═══════════════════════════════════════════════════════════
+#  batch_analysis.py — Background analysis of stored games
+# ═══════════════════════════════════════════════════════════
+
+import os
+import sys
+import threading
+import time
+from array import array
+
+from core.constants import QUALITY_COLORS
+from core.engine import AnalyzerEngine
+from core.movecodec import decode_move, encode_move
+from core.utils import classify_move_quality
+
+# Per-game arrays, all little-endian:
+#   evals      int16 per position (start … final), White's POV, mates ±30000
+#   best_moves uint16 move code per position (0 = none, e.g. after mate)
+#   quality    uint8 per move, an index into QUALITY_CLASSES
+NO_EVAL         = -32768
+QUALITY_CLASSES = (None,) + tuple(QUALITY_COLORS)
+_QUALITY_INDEX  = {q: i for i, q in enumerate(QUALITY_CLASSES)}
+
+
+def _to_bytes(values):
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode, blob):
+    values = array(typecode)
+    values.frombytes(bytes(blob or b''))
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def classify_game(evals):
+    """Quality label (or None) of every move, from the per-position evals."""
+    return [classify_move_quality(evals[i], evals[i + 1], i % 2 == 0)
+            for i in range(len(evals) - 1)]
+
+
+def pack_analysis(evals, best_moves, quality):
+    """
+    Pack one game's analysis into ``(evals, best_moves, quality)`` blobs.
+
+    Parameters
+    ----------
+    evals      : [int | None] — one per position
+    best_moves : [str | None] — UCI, one per position
+    quality    : [str | None] — one per move, see ``classify_game``
+    """
+    return (
+        _to_bytes(array('h', (NO_EVAL if cp is None else max(-30000, min(30000, cp))
+                              for cp in evals))),
+        _to_bytes(array('H', (encode_move(m) if m else 0 for m in best_moves))),
+        bytes(_QUALITY_INDEX.get(q, 0) for q in quality),
+    )
+
+
+def unpack_analysis(evals, best_moves, quality):
+    """Inverse of ``pack_analysis``: the three lists, with None for gaps."""
+    return (
+        [None if cp == NO_EVAL else cp for cp in _from_bytes('h', evals)],
+        [decode_move(c) if c else None for c in _from_bytes('H', best_moves)],
+        [QUALITY_CLASSES[i] if i < len(QUALITY_CLASSES) else None
+         for i in bytes(quality or b'')],
+    )
+
+
+class BatchAnalyzer:
+    """
+    Analyse every stored game that has no analysis yet, in the background.
+
+    Each worker thread drives its own low-priority ``AnalyzerEngine``
+    process (one search thread, small hash) and takes games from a shared
+    queue filled in id order.  Every position of a game is searched to the
+    same fixed limit; the evals, best moves and move qualities are saved in
+    one row per game, so a stopped job simply resumes with the games that
+    have no row yet.
+
+    The job keeps to *cpu_budget*: after each search a worker sleeps long
+    enough that the workers together use about that share of the machine.
+    While *is_busy* returns True (a game or tournament is being played)
+    the workers wait between positions.
+
+    Parameters
+    ----------
+    db          : database.Database
+    engine_path : str — analyzer executable
+    workers     : int — engine processes
+    depth       : int | None — fixed search depth (default when no nodes)
+    nodes       : int | None — fixed node count, used instead of depth
+    cpu_budget  : float — share of all CPUs the job may use (0–1)
+    hash_mb     : int — hash table size of each engine
+    is_busy     : callable() -> bool | None
+    on_progress : callable(done, total) | None — called from worker threads
+    on_done     : callable(done) | None — called once every worker has ended
+    """
+
+    BATCH = 64    # game ids fetched per queue refill
+
+    def __init__(self, db, engine_path, workers=2, depth=12, nodes=None,
+                 cpu_budget=0.5, hash_mb=16, is_busy=None, on_progress=None,
+                 on_done=None):
+        self.db          = db
+        self.engine_path = engine_path
+        self.workers     = max(1, workers)
+        self.depth       = None if nodes else (depth or 12)
+        self.nodes       = nodes
+        self.cpu_budget  = cpu_budget
+        self.hash_mb     = hash_mb
+        self.is_busy     = is_busy
+        self.on_progress = on_progress
+        self.on_done     = on_done
+        self.limit       = (f"nodes {nodes}" if nodes else f"depth {self.depth}")
+        self.done        = 0
+        self.total       = 0
+        self._lock       = threading.Lock()
+        self._stop       = threading.Event()
+        self._paused     = False
+        self._pending    = []
+        self._after_id   = 0
+        self._threads    = []
+        self._live       = 0       # workers that have not exited yet
+
+    # ── Lifecycle ─────────────────────────────────────────
+
+    def start(self):
+        """Count the games to analyse and start the workers."""
+        self._stop.clear()
+        self.done, self.total = 0, self.db.count_unanalyzed()
+        self._pending, self._after_id = [], 0
+        self._live = self.workers
+        self._threads = [threading.Thread(target=self._worker, args=(i,),
+                                          name=f"BatchAnalyzer-{i + 1}", daemon=True)
+                         for i in range(self.workers)]
+        for t in self._threads:
+            t.start()
+
+    def stop(self):
+        """Ask the workers to finish their current position and exit."""
+        self._stop.set()
+
+    def pause(self):  self._paused = True
+    def resume(self): self._paused = False
+
+    @property
+    def running(self):
+        return any(t.is_alive() for t in self._threads)
+
+    # ── Workers ───────────────────────────────────────────
+
+    def _next_game(self):
+        with self._lock:
+            if not self._pending:
+                self._pending = self.db.get_unanalyzed_games(self._after_id, self.BATCH)
+                if not self._pending:
+                    return None
+                self._pending.reverse()
+                self._after_id = self._pending[0]
+            return self._pending.pop()
+
+    def _share(self):
+        # Fraction of its own time each worker may spend searching
+        cpus = os.cpu_count() or 1
+        return min(1.0, max(0.01, self.cpu_budget * cpus / self.workers))
+
+    def _wait_idle(self):
+        """Block while paused or busy; False once the job is stopped."""
+        while not self._stop.is_set():
+            if not self._paused and not (self.is_busy and self.is_busy()):
+                return True
+            self._stop.wait(0.5)
+        return False
+
+    def _worker(self, index):
+        eng = None
+        try:
+            eng = AnalyzerEngine(self.engine_path, f"Batch {index + 1}",
+                                 low_priority=True)
+            eng.start()
+            eng.set_option("Threads", 1)
+            eng.set_option("Hash", self.hash_mb)
+            eng.cache = self.db.eval_cache
+            analyzer = eng.identity
+            while self._wait_idle():
+                gid = self._next_game()
+                if gid is None:
+                    break
+                moves = self.db.get_game_moves(gid)
+                if moves is None:
+                    continue
+                result = self._analyse_game(eng, moves)
+                if result is None:
+                    break
+                self.db.save_game_analysis(gid, analyzer, self.limit,
+                                           *pack_analysis(*result))
+                with self._lock:
+                    self.done += 1
+                    done = self.done
+                if self.on_progress:
+                    self.on_progress(done, self.total)
+        except Exception as e:
+            print(f"[BatchAnalyzer] worker {index + 1} stopped: {e}")
+        finally:
+            if eng is not None:
+                eng.stop()
+            self._on_worker_exit()
+
+    def _on_worker_exit(self):
+        # A counter, not is_alive(): workers stopped together are all
+        # still alive while they run this
+        with self._lock:
+            self._live -= 1
+            last = self._live == 0
+        if last and self.on_done:
+            self.on_done(self.done)
+
+    def _analyse_game(self, eng, moves):
+        """``(evals, best_moves, quality)`` for one game, or None if stopped."""
+        share = self._share()
+        evals, best = [], []
+        for ply in range(len(moves) + 1):
+            if not self._wait_idle():
+                return None
+            if not eng.alive:
+                raise RuntimeError("analyzer process exited")
+            t0 = time.perf_counter()
+            cp, move = eng.analyse(' '.join(moves[:ply]),
+                                   depth=self.depth, nodes=self.nodes)
+            evals.append(cp)
+            best.append(move)
+            if share < 1.0:
+                self._stop.wait((time.perf_counter() - t0) * (1 / share - 1))
+        return evals, best, classify_game(evals)
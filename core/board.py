@@ -2,12 +2,16 @@
 #  board.py — Full chess rules engine (Board class)
 # ═══════════════════════════════════════════════════════════
 
+import re
+
 from core.constants import (
     START_FEN, PIECE_VALUES,
     ROOK_D, BISHOP_D, QUEEN_D, KNIGHT_D, KING_D,
 )
 from core.utils import valid
 
+_SAN_RE = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([QRBNqrbn]))?$')
+
 
 class Board:
     """
@@ -360,7 +364,18 @@ class Board:
                 raise ValueError(f"Illegal move: {uci!r}")
 
         san = self._build_san(fr, fc, tr, tc, promo, legal)
+        cap = self._advance(fr, fc, tr, tc, promo)
+
+        in_chk = self.in_check()
+        no_mvs = len(self.legal_moves()) == 0
+        if in_chk:
+            san += '#' if no_mvs else '+'
+
+        self._record(uci, san)
+        return san, cap
 
+    def _advance(self, fr, fc, tr, tc, promo):
+        """Play a move in place and track the captured piece; returns it or None."""
         piece  = self.board[fr][fc]
         target = self.board[tr][tc]
         p      = piece.lower()
@@ -381,23 +396,119 @@ class Board:
         self.turn     = new.turn
         self._material_cache = None
 
-        in_chk = self.in_check()
-        no_mvs = len(self.legal_moves()) == 0
-        if in_chk:
-            san += '#' if no_mvs else '+'
-
         cap = ep_removed or (target if target != '.' else None)
         if cap and cap != '.':
             if self.turn == 'w':
                 self.cap_white.append(cap)
             else:
                 self.cap_black.append(cap)
+        return cap
 
+    def _record(self, uci, san):
+        """Append the move just played to the move and repetition history."""
         fen_after = self.to_fen()
         self.move_history.append((uci, san, fen_after))
         pos = self._pos_key()
         self.pos_history[pos] = self.pos_history.get(pos, 0) + 1
-        return san, cap
+
+    def apply_san(self, san):
+        """
+        Apply a SAN-format move (check/mate suffixes optional).
+
+        Returns
+        -------
+        uci : str  — the UCI form of the move that was applied.
+        """
+        fr, fc, tr, tc, promo = self.san_to_move(san)
+        uci = f"{chr(ord('a') + fc)}{8 - fr}{chr(ord('a') + tc)}{8 - tr}"
+        if promo:
+            uci += promo
+        self.apply_uci(uci)
+        return uci
+
+    def san_to_move(self, san):
+        """
+        Resolve a SAN move to its ``(fr, fc, tr, tc, promo)`` tuple without
+        applying it.  Raises ValueError if it is not legal here.
+
+        Only the pieces that could make the move are generated and checked
+        for legality; redundant disambiguation (``Ngf3``) is accepted.
+        """
+        want = san.rstrip('+#!?')
+        if want.startswith('0-0'):
+            want = want.replace('0', 'O')
+        if want in ('O-O', 'O-O-O'):
+            rank = '1' if self.turn == 'w' else '8'
+            want = f"Ke{rank}{'g' if want == 'O-O' else 'c'}{rank}"
+        m = _SAN_RE.match(want)
+        if m:
+            return self._resolve_san(san, *m.groups())
+        if (len(want) > 2 and want[0] in 'abcdefgh'
+              and want[-1] in 'QRBN' and '=' not in want):
+            want = f"{want[:-1]}={want[-1]}"
+        legal = self.legal_moves()
+        for mv in legal:
+            if self._build_san(*mv, legal) == want:
+                return mv
+        raise ValueError(f"Illegal SAN: {san!r}")
+
+    def _resolve_san(self, san, piece, file_, rank, to_sq, promo):
+        turn  = self.turn
+        want  = piece or 'P'
+        want  = want if turn == 'w' else want.lower()
+        tc    = ord(to_sq[0]) - ord('a'); tr = 8 - int(to_sq[1])
+        fc    = ord(file_) - ord('a') if file_ else None
+        fr    = 8 - int(rank) if rank else None
+        if piece is None and fc is None:
+            fc = tc     # pawn push
+        promo = promo.lower() if promo else None
+        found = None
+        for r in range(8) if fr is None else (fr,):
+            row = self.board[r]
+            for c in range(8) if fc is None else (fc,):
+                if row[c] != want:
+                    continue
+                for mv in self._pseudo(r, c):
+                    if mv[2] != tr or mv[3] != tc or mv[4] != promo:
+                        continue
+                    if self._apply_raw(*mv).in_check(turn):
+                        continue
+                    if found is not None:
+                        raise ValueError(f"Ambiguous SAN: {san!r}")
+                    found = mv
+        if found is None:
+            raise ValueError(f"Illegal SAN: {san!r}")
+        return found
+
+    def replay_moves(self, ucis, sans=None):
+        """
+        Play a stored move list (e.g. ``Database.get_game_moves``) onto
+        this board.
+
+        When *sans* — the game's SAN tokens, one per move — is given, the
+        moves are trusted: no legal-move generation is done and each SAN
+        is taken from the list, so a whole game replays in well under a
+        millisecond per move.  Without it every move goes through
+        ``apply_uci``.
+
+        Returns
+        -------
+        self, so ``Board().replay_moves(...)`` can be chained.
+        """
+        if sans is None or len(sans) != len(ucis):
+            for uci in ucis:
+                self.apply_uci(uci)
+            return self
+        for uci, san in zip(ucis, sans):
+            fc = ord(uci[0]) - ord('a'); fr = 8 - int(uci[1])
+            tc = ord(uci[2]) - ord('a'); tr = 8 - int(uci[3])
+            promo = uci[4].lower() if len(uci) > 4 else None
+            piece = self.board[fr][fc]
+            if piece == '.' or piece.isupper() != (self.turn == 'w'):
+                raise ValueError(f"Illegal move: {uci!r}")
+            self._advance(fr, fc, tr, tc, promo)
+            self._record(uci, san)
+        return self
 
     # ── SAN builder ───────────────────────────────────────
 
@@ -0,0 +1,227 @@
+# ═══════════════════════════════════════════════════════════
+#  bootstrap.py — Bootstrap confidence intervals for ML ratings
+# ═══════════════════════════════════════════════════════════
+
+import math
+import multiprocessing
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from core.ml_ratings import compute_ml_ratings, np
+
+# Looser than a normal fit: stops within ~0.1 Elo of the optimum, far
+# inside any interval, in half the iterations
+_BOOT_TOL = 1e-4
+
+
+def _poisson(rng, lam):
+    # Knuth's product method; a normal approximation is plenty for the
+    # large counts, where it would need ~lam draws
+    if lam <= 0:
+        return 0
+    if lam > 30:
+        return max(0, round(rng.gauss(lam, math.sqrt(lam))))
+    limit, k, p = math.exp(-lam), 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def _resample(keys, counts, seed, rep):
+    """One Poisson-bootstrap copy of the pair table: every game is drawn
+    Poisson(1) times, i.e. each count n becomes Poisson(n).  Pairs left
+    with no games are kept, so the prior stays the same in every copy."""
+    if np is not None:
+        rng  = np.random.default_rng([seed, rep])
+        drawn = rng.poisson(counts).tolist()
+    else:
+        rng  = random.Random(f"{seed}:{rep}")
+        drawn = [[_poisson(rng, n) for n in cell] for cell in counts]
+    return dict(zip(keys, drawn))
+
+
+def bootstrap_chunk(item):
+    """
+    Worker for ``bootstrap_ratings`` (runs in a process pool).
+
+    Parameters
+    ----------
+    item : (keys, counts, names, reps, seed, options) — the pair table
+           split into keys and [wa, d, wb] counts, the engines in output
+           order, the replicate numbers to run and the fit options
+
+    Returns
+    -------
+    list of rating lists, one per replicate, in *names* order.
+    """
+    keys, counts, names, reps, seed, options = item
+    if np is not None:
+        counts = np.asarray(counts, dtype=float)
+    out = []
+    for rep in reps:
+        fit = compute_ml_ratings(_resample(keys, counts, seed, rep),
+                                 tol=_BOOT_TOL, errors=False, **options)
+        ratings = fit['ratings']
+        out.append([ratings[name] for name in names])
+    return out
+
+
+def bootstrap_ratings(pairs, draws=True, prior=1.0, anchor=1500,
+                      replicates=200, seed=0, workers=None, start=None):
+    """
+    Resample the games and refit the ratings *replicates* times.
+
+    Each replicate has its own seed derived from *seed* and its number, so
+    the result does not depend on the number of workers or on how the
+    replicates are split between them.
+
+    Parameters
+    ----------
+    pairs      : dict {(a, b): [wins_a, draws, wins_b]} — see ``pair_results``
+    draws, prior, anchor : as for ``compute_ml_ratings``
+    replicates : int
+    seed       : int
+    workers    : int | None — processes (None = one per CPU, 1 = this thread)
+    start      : dict {engine: elo} | None — warm start for every refit
+
+    Returns
+    -------
+    dict with keys
+        names   : [engine] — sorted
+        samples : [[float]] — one rating list per replicate
+    """
+    names  = sorted({e for key in pairs for e in key})
+    keys   = list(pairs)
+    counts = [list(pairs[k]) for k in keys]
+    options = {'draws': draws, 'prior': prior, 'anchor': anchor, 'start': start}
+    reps    = list(range(replicates))
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, replicates)
+    if workers <= 1 or not names:
+        samples = bootstrap_chunk((keys, counts, names, reps, seed, options))
+        return {'names': names, 'samples': samples}
+
+    chunks = [reps[i::workers] for i in range(workers)]
+    # spawn: the caller usually has Tk and writer threads running
+    with ProcessPoolExecutor(workers,
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        parts = list(pool.map(bootstrap_chunk,
+                              [(keys, counts, names, c, seed, options) for c in chunks]))
+    by_rep = {}
+    for chunk, part in zip(chunks, parts):
+        by_rep.update(zip(chunk, part))
+    return {'names': names, 'samples': [by_rep[r] for r in reps]}
+
+
+def percentile_intervals(names, samples, level=0.95):
+    """{engine: (low, high)} percentile intervals from bootstrap samples."""
+    tail = (1 - level) / 2
+    intervals = {}
+    for i, name in enumerate(names):
+        values = sorted(s[i] for s in samples)
+        last = len(values) - 1
+        intervals[name] = (values[round(tail * last)],
+                           values[round((1 - tail) * last)])
+    return intervals
+
+
+def los_matrix(names, samples, engines):
+    """
+    Likelihood of superiority: ``{(a, b): P(a stronger than b)}`` for every
+    ordered pair of *engines*, as the share of replicates where a is rated
+    above b (ties count half).
+    """
+    col = {name: i for i, name in enumerate(names)}
+    los = {}
+    for a in engines:
+        for b in engines:
+            if a == b or a not in col or b not in col:
+                continue
+            ia, ib = col[a], col[b]
+            wins = sum(1.0 if s[ia] > s[ib] else 0.5 if s[ia] == s[ib] else 0.0
+                       for s in samples)
+            los[(a, b)] = wins / len(samples) if samples else 0.5
+    return los
+
+
+# ── Cached service ────────────────────────────────────────
+
+class BootstrapService:
+    """
+    Bootstrap intervals and LOS for one maximum-likelihood rating model,
+    cached until games are added or the history changes.
+
+    The replicate ratings are persisted with the rating snapshots, so a
+    new session with no new games reuses them.
+
+    Parameters
+    ----------
+    db         : database.Database
+    service    : ml_ratings.MLRatingService — the model to bootstrap
+    replicates : int
+    seed       : int
+    """
+
+    def __init__(self, db, service, replicates=200, seed=0):
+        self.db         = db
+        self.service    = service
+        self.replicates = replicates
+        self.seed       = seed
+        self.name       = f"boot:{service.name}:{replicates}:{seed}"
+        self._lock      = threading.Lock()
+        self._result    = None    # {'names', 'samples', 'intervals'}
+        self._key       = None    # (last game id, revision) it covers
+
+    def is_current(self):
+        """True when a read would not have to resample (cheap check)."""
+        with self._lock:
+            return (self._result is not None
+                    and self._key == self.db.get_games_watermark())
+
+    def intervals(self, workers=None):
+        """{engine: (low, high)} 95% intervals, in the model's Elo scale."""
+        with self._lock:
+            self._sync(workers)
+            return dict(self._result['intervals'])
+
+    def los(self, engines, workers=None):
+        """``{(a, b): P(a > b)}`` for every ordered pair of *engines*."""
+        with self._lock:
+            self._sync(workers)
+            return los_matrix(self._result['names'], self._result['samples'],
+                              engines)
+
+    def _sync(self, workers):
+        watermark = self.db.get_games_watermark()
+        if self._result is not None and self._key == watermark:
+            return
+        if self._result is None:
+            snap = self.db.load_rating_snapshot(self.name)
+            if snap is not None and tuple(snap[:2]) == watermark:
+                data = snap[2]
+                data['intervals'] = {e: tuple(iv) for e, iv in data['intervals'].items()}
+                self._result, self._key = data, watermark
+                return
+
+        pairs, key = self.service.pair_totals()    # keyed by engine id
+        names = self.db.engine_names()
+        ids   = {name: i for i, name in enumerate(names) if name is not None}
+        svc   = self.service
+        boot  = bootstrap_ratings(pairs, draws=svc.draws, prior=svc.prior,
+                                  anchor=svc.anchor, replicates=self.replicates,
+                                  seed=self.seed, workers=workers,
+                                  start={ids[n]: v for n, v in svc.ratings().items()
+                                         if n in ids})
+        engines = [names[i] for i in boot['names']]
+        samples = [[round(r, 1) for r in s] for s in boot['samples']]
+        self._result = {
+            'names':     engines,
+            'samples':   samples,
+            'intervals': percentile_intervals(engines, samples),
+        }
+        self._key = key
+        self.db.save_rating_snapshot(self.name, key[0], key[1], self._result)
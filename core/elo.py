@@ -2,8 +2,40 @@
 #  elo.py — Elo rating computation helpers
 # ═══════════════════════════════════════════════════════════
 
+import threading
+from array import array
+
 from core.utils import normalize_engine_name
 
+_SCORES = {'1-0': (1.0, 0.0), '0-1': (0.0, 1.0), '1/2-1/2': (0.5, 0.5)}
+
+
+def apply_elo_game(ratings, white, black, result, k=32, start_elo=1500):
+    """
+    Update *ratings* ({engine: float elo}) in place with one game.
+
+    Names must already be normalised.  Returns False (and changes
+    nothing) for aborted / no-result games.
+    """
+    scores = _SCORES.get(result)
+    if scores is None:
+        return False
+    rw = ratings.setdefault(white, start_elo)
+    rb = ratings.setdefault(black, start_elo)
+    ew = 1 / (1 + 10 ** ((rb - rw) / 400))
+    eb = 1 - ew
+    ratings[white] = rw + k * (scores[0] - ew)
+    ratings[black] = rb + k * (scores[1] - eb)
+    return True
+
+
+class _NameCache(dict):
+    """raw name -> normalize_engine_name(name), computed once per name."""
+
+    def __missing__(self, name):
+        self[name] = canon = normalize_engine_name(name)
+        return canon
+
 
 def compute_elo_ratings(games, k=32, start_elo=1500):
     """
@@ -23,33 +55,9 @@ def compute_elo_ratings(games, k=32, start_elo=1500):
     dict  — {engine_name: rounded_elo}
     """
     ratings = {}
-
-    def get_r(name):
-        return ratings.setdefault(normalize_engine_name(name), start_elo)
-
-    def set_r(name, val):
-        ratings[normalize_engine_name(name)] = val
-
+    names   = _NameCache()
     for white, black, result in games:
-        w = normalize_engine_name(white)
-        b = normalize_engine_name(black)
-        rw = get_r(w)
-        rb = get_r(b)
-        ew = 1 / (1 + 10 ** ((rb - rw) / 400))
-        eb = 1 - ew
-
-        if result == '1-0':
-            sw, sb = 1.0, 0.0
-        elif result == '0-1':
-            sw, sb = 0.0, 1.0
-        elif result == '1/2-1/2':
-            sw, sb = 0.5, 0.5
-        else:
-            continue  # skip aborted / no-result games
-
-        set_r(w, rw + k * (sw - ew))
-        set_r(b, rb + k * (sb - eb))
-
+        apply_elo_game(ratings, names[white], names[black], result, k, start_elo)
     return {n: round(v) for n, v in ratings.items()}
 
 
@@ -74,35 +82,315 @@ def compute_elo_history(games, engine_name, k=32, start_elo=1500):
     """
     ratings = {}
     history = []
+    names   = _NameCache()
     engine_name = normalize_engine_name(engine_name)
 
-    def get_r(name):
-        return ratings.setdefault(normalize_engine_name(name), start_elo)
-
-    def set_r(name, val):
-        ratings[normalize_engine_name(name)] = val
-
-    for i, (white, black, result) in enumerate(games):
-        w = normalize_engine_name(white)
-        b = normalize_engine_name(black)
-        rw = get_r(w)
-        rb = get_r(b)
-        ew = 1 / (1 + 10 ** ((rb - rw) / 400))
-        eb = 1 - ew
-
-        if result == '1-0':
-            sw, sb = 1.0, 0.0
-        elif result == '0-1':
-            sw, sb = 0.0, 1.0
-        elif result == '1/2-1/2':
-            sw, sb = 0.5, 0.5
-        else:
+    for white, black, result in games:
+        w, b = names[white], names[black]
+        if not apply_elo_game(ratings, w, b, result, k, start_elo):
             continue
-
-        set_r(w, rw + k * (sw - ew))
-        set_r(b, rb + k * (sb - eb))
-
         if w == engine_name or b == engine_name:
-            history.append((len(history) + 1, round(get_r(engine_name))))
+            history.append((len(history) + 1, round(ratings[engine_name])))
 
     return history
+
+
+class RatingService:
+    """
+    Base for the cached rating models reached through ``Database.ratings``.
+
+    Subclasses implement ``_sync()``, which brings ``self._values``
+    ({engine: float rating}) and optionally ``self._errors`` up to date
+    with the games table, then calls ``_round()``.  Thread-safe.
+    """
+
+    label = ""
+
+    def __init__(self, db):
+        self.db       = db
+        self._lock    = threading.Lock()
+        self._values  = None    # {engine: float}, None until first sync
+        self._errors  = {}
+        self._rounded = {}
+        self._ranks   = {}
+
+    # ── Public API ────────────────────────────────────────
+
+    def ratings(self):
+        """{engine_name: rounded rating} for every rated engine (a copy)."""
+        with self._lock:
+            self._sync()
+            return dict(self._rounded)
+
+    def ranking(self):
+        """
+        Returns
+        -------
+        (ratings, rank_map) — rounded ratings and {engine: 1-based rank},
+        both copies.
+        """
+        with self._lock:
+            self._sync()
+            return dict(self._rounded), dict(self._ranks)
+
+    def errors(self):
+        """{engine_name: ± rating error (95%)}; empty for models without one."""
+        with self._lock:
+            self._sync()
+            return dict(self._errors)
+
+    def invalidate(self):
+        """Drop the in-memory state; the next read reloads the snapshot."""
+        with self._lock:
+            self._values = None
+
+    # ── Internals ─────────────────────────────────────────
+
+    def _sync(self):
+        raise NotImplementedError
+
+    def _round(self):
+        self._rounded = {n: round(v) for n, v in self._values.items()}
+        ordered = sorted(self._rounded.items(), key=lambda x: x[1], reverse=True)
+        self._ranks = {name: i + 1 for i, (name, _) in enumerate(ordered)}
+
+
+class EloService(RatingService):
+    """
+    Current Elo ratings of every engine, kept up to date incrementally.
+
+    Ratings live in memory and are brought up to date on each read by
+    applying only the games saved since the last one seen — O(1) per new
+    game.  A snapshot (ratings + last game id) is persisted in the
+    database, so a new session resumes from it instead of replaying the
+    whole history.  Everything is recomputed from scratch only when the
+    history itself changes (games deleted or their players / results
+    edited), which the database tracks as a revision counter.
+
+    Parameters
+    ----------
+    db        : database.Database
+    k         : int — K-factor
+    start_elo : int — rating of an engine's first game
+    """
+
+    label = "Elo (sequential, K=32)"
+
+    def __init__(self, db, k=32, start_elo=1500):
+        super().__init__(db)
+        self.k         = k
+        self.start_elo = start_elo
+        self.name      = f"elo:{k}:{start_elo}"
+        self._last_id  = 0
+        self._revision = None
+
+    def _sync(self):
+        max_id, revision = self.db.get_games_watermark()
+        if self._values is None:
+            self._load(revision)
+        if revision != self._revision or max_id < self._last_id:
+            # History was rewritten: nothing incremental is safe
+            self._values, self._last_id = {}, 0
+            self._revision, self._rounded = revision, None
+        if max_id > self._last_id:
+            self._apply(self.db.get_games_for_ratings(after_id=self._last_id),
+                        self.db.engine_names())
+            self.db.save_rating_snapshot(self.name, self._last_id,
+                                         self._revision, self._values)
+        elif self._rounded is None:
+            self._round()
+
+    def _load(self, revision):
+        snap = self.db.load_rating_snapshot(self.name)
+        if snap is not None and snap[1] == revision:
+            self._last_id, self._revision, self._values = snap
+        else:
+            self._last_id, self._revision, self._values = 0, revision, {}
+        self._rounded = None
+
+    def _apply(self, rows, names):
+        ratings, k, start = self._values, self.k, self.start_elo
+        for game_id, white_id, black_id, result in rows:
+            apply_elo_game(ratings, names[white_id], names[black_id],
+                           result, k, start)
+            self._last_id = game_id
+        self._round()
+
+
+# ── Rating history ────────────────────────────────────────
+
+def downsample_lttb(xs, ys, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling of a line series.
+
+    Keeps the first and last point and, from each of ``threshold - 2``
+    equal buckets in between, the point forming the largest triangle with
+    the point kept before it and the next bucket's average, so peaks and
+    dips survive.
+
+    Returns
+    -------
+    list of int — indices of the kept points, ascending.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    every = (n - 2) / (threshold - 2)
+    kept  = [0]
+    a     = 0
+    for i in range(threshold - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        # Average of the next bucket (the last point for the final one)
+        nlo, nhi = hi, min(int((i + 2) * every) + 1, n)
+        if nlo >= nhi:
+            nlo, nhi = n - 1, n
+        avg_x = sum(xs[nlo:nhi]) / (nhi - nlo)
+        avg_y = sum(ys[nlo:nhi]) / (nhi - nlo)
+        ax, ay = xs[a], ys[a]
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+class EloHistory:
+    """
+    Elo time series of every engine, built in one pass over the games and
+    kept up to date incrementally, like ``EloService``.
+
+    Each engine's series is a pair of arrays (game ids, rating after each
+    of its games), so a chart request is a slice of them rather than a
+    replay of the whole history.  Changed series are persisted after each
+    update; a history rewrite (revision change) rebuilds everything.
+
+    Parameters
+    ----------
+    db        : database.Database
+    k         : int — K-factor
+    start_elo : int — rating of an engine's first game
+    """
+
+    def __init__(self, db, k=32, start_elo=1500):
+        self.db        = db
+        self.k         = k
+        self.start_elo = start_elo
+        self.name      = f"elo-history:{k}:{start_elo}"
+        self._lock     = threading.Lock()
+        self._ids      = None    # {engine: array('I')} game ids
+        self._values   = None    # {engine: array('d')} Elo after each game
+        self._ratings  = {}      # {engine: float} current Elo
+        self._last_id  = 0
+        self._revision = None
+        self._replace  = False   # next save drops the stored series first
+
+    # ── Public API ────────────────────────────────────────
+
+    def history(self, engine, start=0, stop=None, max_points=None):
+        """
+        Elo history of one engine.
+
+        Parameters
+        ----------
+        engine     : str — colour suffixes are stripped
+        start/stop : int | None — slice of the engine's games (0-based)
+        max_points : int | None — downsample longer slices with LTTB
+
+        Returns
+        -------
+        list of (game_number, game_id, elo) — game_number counts the
+        engine's own games from 1; elo is rounded.
+        """
+        engine = normalize_engine_name(engine)
+        with self._lock:
+            self._sync()
+            ids    = self._ids.get(engine)
+            values = self._values.get(engine)
+            if ids is None:
+                return []
+            start, stop, _ = slice(start, stop).indices(len(ids))
+            ids, values = ids[start:stop], values[start:stop]
+        numbers = range(start + 1, start + 1 + len(ids))
+        if max_points and len(ids) > max_points:
+            keep = downsample_lttb(numbers, values, max_points)
+        else:
+            keep = range(len(ids))
+        return [(numbers[i], ids[i], round(values[i])) for i in keep]
+
+    def series(self, engines, max_points=None):
+        """``{engine: history(engine, max_points=max_points)}`` for several engines."""
+        return {e: self.history(e, max_points=max_points) for e in engines}
+
+    def summary(self, engine):
+        """
+        Returns
+        -------
+        dict {games, first, last, peak, lowest} over the engine's whole
+        history (rounded Elo), or None when it has no games.
+        """
+        engine = normalize_engine_name(engine)
+        with self._lock:
+            self._sync()
+            values = self._values.get(engine)
+            if not values:
+                return None
+            return {'games': len(values), 'first': round(values[0]),
+                    'last': round(values[-1]), 'peak': round(max(values)),
+                    'lowest': round(min(values))}
+
+    # ── Internals ─────────────────────────────────────────
+
+    def _sync(self):
+        max_id, revision = self.db.get_games_watermark()
+        if self._ids is None:
+            self._load(revision)
+        if revision != self._revision or max_id < self._last_id:
+            # History was rewritten: nothing incremental is safe
+            self._reset(revision)
+        if max_id > self._last_id:
+            dirty = self._apply(self.db.get_games_for_ratings(after_id=self._last_id),
+                                self.db.engine_names())
+            self.db.save_rating_series(
+                self.name, self._last_id, self._revision,
+                {e: (self._ids[e].tobytes(), self._values[e].tobytes()) for e in dirty},
+                replace=self._replace)
+            self._replace = False
+
+    def _reset(self, revision):
+        self._ids, self._values, self._ratings = {}, {}, {}
+        self._last_id, self._revision, self._replace = 0, revision, True
+
+    def _load(self, revision):
+        snap = self.db.load_rating_series(self.name)
+        if snap is None or snap[1] != revision:
+            self._reset(revision)
+            return
+        self._last_id, self._revision, stored = snap
+        self._ids, self._values, self._ratings = {}, {}, {}
+        for engine, (ids, vals) in stored.items():
+            self._ids[engine] = array('I', ids)
+            self._values[engine] = values = array('d', vals)
+            if values:
+                self._ratings[engine] = values[-1]
+
+    def _apply(self, rows, names):
+        ratings, k, start = self._ratings, self.k, self.start_elo
+        ids, values = self._ids, self._values
+        dirty = set()
+        for game_id, white_id, black_id, result in rows:
+            self._last_id = game_id
+            w, b = names[white_id], names[black_id]
+            if not apply_elo_game(ratings, w, b, result, k, start):
+                continue
+            for engine in {w, b}:
+                if engine not in ids:
+                    ids[engine], values[engine] = array('I'), array('d')
+                ids[engine].append(game_id)
+                values[engine].append(ratings[engine])
+                dirty.add(engine)
+        return dirty
@@ -2,6 +2,7 @@
 #  engine.py — UCI engine wrapper and dedicated analyzer
 # ═══════════════════════════════════════════════════════════
 
+import os
 import queue
 import subprocess
 import sys
@@ -21,13 +22,15 @@ class UCIEngine:
     eng.stop()
     """
 
-    def __init__(self, path, name="Engine"):
+    def __init__(self, path, name="Engine", low_priority=False):
         self.path     = path
         self.name     = name
+        self.low_priority = low_priority    # run below normal CPU priority
         self.process  = None
         self.ready    = False
         self.q        = queue.Queue()
         self.last_info = {}
+        self.id_name  = None    # "id name" reported during the handshake
 
     # ── Lifecycle ─────────────────────────────────────────
 
@@ -42,12 +45,19 @@ class UCIEngine:
         )
         if sys.platform == 'win32':
             kw['creationflags'] = subprocess.CREATE_NO_WINDOW
+            if self.low_priority:
+                kw['creationflags'] |= subprocess.BELOW_NORMAL_PRIORITY_CLASS
         try:
             self.process = subprocess.Popen([self.path], **kw)
         except FileNotFoundError:
             raise RuntimeError(f"Engine not found: {self.path}")
         except PermissionError:
             raise RuntimeError(f"Permission denied: {self.path}")
+        if self.low_priority and hasattr(os, 'setpriority'):
+            try:
+                os.setpriority(os.PRIO_PROCESS, self.process.pid, 10)
+            except OSError:
+                pass
 
         threading.Thread(target=self._reader, daemon=True).start()
 
@@ -73,6 +83,12 @@ class UCIEngine:
             self.process = None
             self.ready   = False
 
+    def set_option(self, name, value):
+        """Send ``setoption`` and wait until the engine has applied it."""
+        self._send(f"setoption name {name} value {value}")
+        self._send("isready")
+        return self._wait("readyok", 10)
+
     @property
     def alive(self):
         """True if the engine process is running."""
@@ -113,6 +129,8 @@ class UCIEngine:
                 line = self.q.get(timeout=0.2)
                 if not line:
                     continue
+                if line.startswith('id name '):
+                    self.id_name = line[8:].strip()
                 if line.strip() == kw or line.startswith(kw):
                     return True
             except queue.Empty:
@@ -265,8 +283,21 @@ class AnalyzerEngine(UCIEngine):
     """
     A dedicated UCIEngine instance for position evaluation and move-quality
     analysis.  Returns scores always from White's perspective.
+
+    With a ``cache`` (data/eval_cache.py EvalCache) attached, positions
+    already searched to the same limit are answered from it without
+    touching the engine.
     """
 
+    def __init__(self, path, name="Analyzer", low_priority=False):
+        super().__init__(path, name, low_priority)
+        self.cache = None
+
+    @property
+    def identity(self):
+        """Name the cache files results under: the engine's ``id name``."""
+        return self.id_name or os.path.basename(self.path)
+
     def eval_position(self, moves_str, movetime_ms=150):
         """
         Evaluate a position and return the score from White's perspective.
@@ -286,24 +317,124 @@ class AnalyzerEngine(UCIEngine):
         """
         if not self.ready or not self.alive:
             return None, None
+        score, score_type, _ = self._cached_search(
+            moves_str, f"movetime {movetime_ms}", movetime_ms / 1000 + 5)
+        if score is None:
+            return None, None
+        return score, score_type
+
+    def analyse(self, moves_str, depth=None, nodes=None, movetime_ms=None,
+                timeout=60):
+        """
+        Search a position to a fixed limit and return its score and best move.
+
+        Parameters
+        ----------
+        moves_str : str
+            Space-separated UCI move history.
+        depth, nodes, movetime_ms : int | None
+            Search limit; the first one given is used (default: depth 12).
+        timeout : float
+            Seconds to wait before the search is stopped.
+
+        Returns
+        -------
+        (cp: int | None, best_move: str | None)
+            cp is the score from White's perspective, mates as ±30000.
+        """
+        if not self.ready or not self.alive:
+            return None, None
+        if depth is not None:
+            limit = f"depth {depth}"
+        elif nodes is not None:
+            limit = f"nodes {nodes}"
+        elif movetime_ms is not None:
+            limit = f"movetime {movetime_ms}"
+        else:
+            limit = "depth 12"
+        score, _, best = self._cached_search(moves_str, limit, timeout)
+        return score, best
+
+    def _cached_search(self, moves_str, limit, timeout):
+        """``_search`` with ``go <limit>``, through the cache when attached."""
+        cache = self.cache
+        if cache is None:
+            return self._search(moves_str, f"go {limit}", timeout)
+        key = cache.position_key(moves_str)
+        hit = cache.get(key, self.identity, limit)
+        if hit is not None:
+            return hit
+        result = self._search(moves_str, f"go {limit}", timeout)
+        cache.put(key, self.identity, limit, *result)
+        return result
+
+    def analyse_infinite(self, moves_str, on_score=None, should_stop=None,
+                         max_seconds=30):
+        """
+        Search a position with ``go infinite`` until *should_stop* returns
+        True (or *max_seconds* pass), then ``stop`` it.
+
+        Parameters
+        ----------
+        on_score    : callable(cp, score_type, depth) | None — every score
+                      the engine reports, cp from White's perspective
+        should_stop : callable() -> bool | None — polled while searching
+
+        Returns
+        -------
+        (cp, score_type, best_move) of the last report, as ``_search``.
+        """
+        if not self.ready or not self.alive:
+            return None, None, None
+        return self._search(moves_str, "go infinite", max_seconds,
+                            on_score=on_score, should_stop=should_stop)
+
+    @staticmethod
+    def _white_pov(score, score_type, side_to_move):
+        # Engine always reports score for the side to move; convert to White's POV
+        if score_type == 'mate':
+            cp = 30000 if score > 0 else -30000
+        else:
+            cp = score
+        return -cp if side_to_move == 'b' else cp
+
+    def _search(self, moves_str, go, timeout, on_score=None, should_stop=None):
+        """
+        Run one search and return ``(cp, score_type, best_move)`` for its
+        last reported score, cp from White's perspective (None if no score).
+
+        The search is stopped after *timeout* seconds, or as soon as
+        *should_stop* returns True; *on_score* sees every reported score.
+        """
         self._drain()
 
         cmd = (f"position startpos moves {moves_str}"
                if moves_str else "position startpos")
         self._send(cmd)
-        self._send(f"go movetime {movetime_ms}")
+        self._send(go)
 
-        end  = time.time() + movetime_ms / 1000 + 5
+        end  = time.time() + timeout
         last_score      = None
         last_score_type = 'cp'
+        best = None
+        stopped = False
+        poll = 0.05 if should_stop else 0.2
 
         # Determine which side is to move (needed to flip the engine score)
         n_moves     = len(moves_str.split()) if moves_str else 0
         side_to_move = 'w' if n_moves % 2 == 0 else 'b'
 
-        while time.time() < end:
+        while True:
+            if not stopped and should_stop is not None and should_stop():
+                end = time.time()
+            if time.time() >= end:
+                if stopped:
+                    break
+                # Out of time: ask for the result so far
+                self._send("stop")
+                stopped, end = True, time.time() + 5
             try:
-                line = self.q.get(timeout=0.2)
+                line = self.q.get(timeout=poll)
             except queue.Empty:
                 if self.process and self.process.poll() is not None:
                     break
@@ -315,19 +446,16 @@ class AnalyzerEngine(UCIEngine):
                 if 'score' in info:
                     last_score      = info['score']
                     last_score_type = info.get('score_type', 'cp')
+                    if on_score is not None:
+                        on_score(self._white_pov(last_score, last_score_type, side_to_move),
+                                 last_score_type, info.get('depth'))
             elif line.startswith('bestmove'):
+                parts = line.split()
+                if len(parts) > 1 and parts[1] not in ('(none)', 'null', '0000'):
+                    best = parts[1]
                 break
 
         if last_score is None:
-            return None, None
-
-        # Engine always reports score for the side to move; convert to White's POV
-        if last_score_type == 'mate':
-            cp = 30000 if last_score > 0 else -30000
-        else:
-            cp = last_score
-
-        if side_to_move == 'b':
-            cp = -cp
-
-        return cp, last_score_type
+            return None, None, best
+        return (self._white_pov(last_score, last_score_type, side_to_move),
+                last_score_type, best)
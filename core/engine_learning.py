@@ -0,0 +1,444 @@
+# ═══════════════════════════════════════════════════════════
+#  engine_learning.py — Index engine learning files (.learn / .exp)
+# ═══════════════════════════════════════════════════════════
+
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+
+from core.movecodec import encode_move, decode_move
+
+# ── Source formats ────────────────────────────────────────
+#
+#   .learn : text, one record per line
+#            EVAL|BOOK <key> <uci> <score> <count> <engine-specific fields…>
+#   .exp   : "# Revolution experience format v1" header, then
+#            <key> <move16> <score> <eval> <depth> <count>
+#
+# Keys are the engine's own 64-bit position hashes.  They are kept verbatim;
+# probing by FEN needs a key function matching the engine that wrote them —
+# ``stockfish_key`` for the Stockfish derivatives these files come from.
+#
+# ── Index format (<source>.idx) ───────────────────────────
+#
+#   header  : magic(4) version(u16) record_count(u64) src_size(u64) src_mtime_ns(i64)
+#   records : sorted by (key, move, kind), fixed size, little-endian
+#             key u64 · move u16 · kind u8 · depth u16 · score i32 · eval i32 · count u32
+
+KIND_EVAL = 0
+KIND_BOOK = 1
+KIND_EXP  = 2
+KIND_NAMES = {KIND_EVAL: 'EVAL', KIND_BOOK: 'BOOK', KIND_EXP: 'EXP'}
+_KIND_CODES = {'EVAL': KIND_EVAL, 'BOOK': KIND_BOOK}
+
+EXP_HEADER = '# Revolution experience format v1'
+
+_MAGIC   = b'CELI'
+_VERSION = 1
+_HEADER  = struct.Struct('<4sHQQq')
+_RECORD  = struct.Struct('<QHBHiiI')
+_KEY     = struct.Struct('<Q')
+
+_I32_MIN, _I32_MAX = -2**31, 2**31 - 1
+_CASTLE_FIX = {'e1h1': 'e1g1', 'e1a1': 'e1c1', 'e8h8': 'e8g8', 'e8a8': 'e8c8'}
+
+
+# ── Stockfish position keys ───────────────────────────────
+#
+# Stockfish draws its Zobrist keys from a xorshift64* generator seeded with
+# 1070372, in this order: piece-square keys (white P N B R Q K, then black,
+# squares a1 … h8), the en-passant files a … h, one key per set of castling
+# rights (16), then the side-to-move key.  This is the layout since
+# Stockfish 12; the bundled .learn files are keyed with it.
+
+_M64 = (1 << 64) - 1
+
+
+def _sf_randoms(seed=1070372):
+    s = seed
+    while True:
+        s ^= s >> 12
+        s ^= (s << 25) & _M64
+        s ^= s >> 27
+        yield (s * 2685821657736338717) & _M64
+
+
+def _sf_tables():
+    rng      = _sf_randoms()
+    psq      = {p: [next(rng) for _ in range(64)] for p in 'PNBRQKpnbrqk'}
+    ep       = [next(rng) for _ in range(8)]
+    castling = [next(rng) for _ in range(16)]
+    return psq, ep, castling, next(rng)
+
+
+_SF_PSQ, _SF_EP, _SF_CASTLING, _SF_SIDE = _sf_tables()
+_SF_CASTLING_BITS = {'K': 1, 'Q': 2, 'k': 4, 'q': 8}
+
+
+def stockfish_key(fen):
+    """
+    Stockfish's 64-bit key for the position in *fen* (move counters ignored).
+
+    As in Stockfish, the en-passant file only counts when a pawn of the
+    side to move stands next to the double-stepped pawn.
+    """
+    parts = fen.split()
+    rows  = []
+    for row_str in parts[0].split('/'):
+        row = []
+        for ch in row_str:
+            row.extend('.' * int(ch) if ch.isdigit() else ch)
+        rows.append(row)
+    turn     = parts[1] if len(parts) > 1 else 'w'
+    castling = parts[2] if len(parts) > 2 else '-'
+    ep       = parts[3] if len(parts) > 3 else '-'
+
+    key = 0
+    for r, row in enumerate(rows):
+        base = (7 - r) * 8
+        for c, piece in enumerate(row):
+            if piece != '.':
+                key ^= _SF_PSQ[piece][base + c]
+    rights = 0
+    for ch in castling:
+        rights |= _SF_CASTLING_BITS.get(ch, 0)
+    key ^= _SF_CASTLING[rights]
+    if ep != '-':
+        file_ = ord(ep[0]) - ord('a')
+        r     = 3 if turn == 'w' else 4
+        pawn  = 'P' if turn == 'w' else 'p'
+        if any(0 <= file_ + d < 8 and rows[r][file_ + d] == pawn for d in (-1, 1)):
+            key ^= _SF_EP[file_]
+    if turn == 'b':
+        key ^= _SF_SIDE
+    return key
+
+
+def _clamp32(v):
+    return max(_I32_MIN, min(_I32_MAX, v))
+
+
+def _exp_move_to_uci(code):
+    """
+    Decode a Stockfish-style 16-bit move as stored in .exp files.
+
+    bits 0-5 to · 6-11 from · 12-13 promotion piece (n,b,r,q) · 14-15 type
+    (1 promotion, 2 en passant, 3 castling encoded as king-takes-rook).
+    """
+    frm, to = (code >> 6) & 63, code & 63
+    uci = (f"{chr(ord('a') + frm % 8)}{frm // 8 + 1}"
+           f"{chr(ord('a') + to % 8)}{to // 8 + 1}")
+    mtype = code >> 14
+    if mtype == 1:
+        uci += 'nbrq'[(code >> 12) & 3]
+    elif mtype == 3:
+        uci = _CASTLE_FIX.get(uci, uci)
+    return uci
+
+
+def iter_learning_records(path):
+    """
+    Stream the records of a .learn or .exp file.
+
+    Yields ``(key, move16, kind, depth, score, eval, count)`` tuples with
+    moves re-encoded by ``core.movecodec``.  Malformed lines are skipped, so
+    a partially written file still yields everything before the damage.
+    """
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        first = f.readline()
+        is_exp = first.strip() == EXP_HEADER
+        if not is_exp:
+            f.seek(0)
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith('#'):
+                continue
+            try:
+                if is_exp:
+                    key, move, score, ev, depth, count = (int(x) for x in parts[:6])
+                    yield (key, encode_move(_exp_move_to_uci(move)), KIND_EXP,
+                           min(depth, 0xFFFF), _clamp32(score), _clamp32(ev),
+                           min(count, 0xFFFFFFFF))
+                else:
+                    kind = _KIND_CODES.get(parts[0])
+                    if kind is None:
+                        continue
+                    score = int(parts[3])
+                    count = int(parts[4]) if len(parts) > 4 else 1
+                    yield (int(parts[1]), encode_move(parts[2]), kind, 0,
+                           _clamp32(score), 0, min(max(count, 0), 0xFFFFFFFF))
+            except (ValueError, IndexError):
+                continue
+
+
+def _default_index_path(path):
+    return path + '.idx'
+
+
+def _fallback_index_path(path):
+    digest = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+    folder = os.path.join(tempfile.gettempdir(), 'chess_arena_learn')
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f"{os.path.basename(path)}.{digest}.idx")
+
+
+class EngineLearningFile:
+    """
+    Lazily indexed, memory-mapped view of an engine learning file.
+
+    The first lookup streams the text file into a sorted binary index
+    (``<file>.idx``, or a temp-dir copy when the engine folder is
+    read-only) using bounded-memory sorted runs.  The index is reused until
+    the source file changes, and lookups binary-search the mapped records.
+
+    Parameters
+    ----------
+    path          : str             — .learn or .exp file
+    key_fn        : callable | None — maps a FEN to the writing engine's
+                                      64-bit key; None disables FEN lookups
+    chunk_records : int             — records held in memory per sorted run
+    """
+
+    def __init__(self, path, key_fn=stockfish_key, chunk_records=500_000):
+        self.path          = path
+        self.key_fn        = key_fn
+        self.chunk_records = chunk_records
+        self.index_path    = None
+        self._file  = None
+        self._mm    = None
+        self._count = 0
+        self._stats = None
+
+    # ── Index management ──────────────────────────────────
+
+    def _source_sig(self):
+        st = os.stat(self.path)
+        return st.st_size, st.st_mtime_ns
+
+    def _index_valid(self, idx_path, sig):
+        try:
+            with open(idx_path, 'rb') as f:
+                magic, ver, _, size, mtime = _HEADER.unpack(f.read(_HEADER.size))
+            return magic == _MAGIC and ver == _VERSION and (size, mtime) == sig
+        except (OSError, struct.error):
+            return False
+
+    def ensure_index(self, on_progress=None):
+        """Build (if stale) and map the index.  Safe to call repeatedly."""
+        if self._mm is not None or self._file is not None:
+            return
+        sig = self._source_sig()
+        for candidate in (_default_index_path(self.path),
+                          _fallback_index_path(self.path)):
+            if self._index_valid(candidate, sig):
+                self._open_index(candidate)
+                return
+        try:
+            idx = _default_index_path(self.path)
+            self._build_index(idx, sig, on_progress)
+        except OSError:
+            idx = _fallback_index_path(self.path)
+            self._build_index(idx, sig, on_progress)
+        self._open_index(idx)
+
+    def _build_index(self, idx_path, sig, on_progress=None):
+        runs, chunk, total = [], [], 0
+        try:
+            for rec in iter_learning_records(self.path):
+                chunk.append(rec)
+                total += 1
+                if len(chunk) >= self.chunk_records:
+                    runs.append(self._spill(chunk))
+                    chunk = []
+                    if on_progress:
+                        on_progress(total)
+            chunk.sort()
+
+            tmp_out = idx_path + '.tmp'
+            with open(tmp_out, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, _VERSION, total, *sig))
+                merged = heapq.merge(chunk, *(self._read_run(p) for p in runs))
+                for key, move, kind, depth, score, ev, count in merged:
+                    f.write(_RECORD.pack(key, move, kind, depth, score, ev, count))
+            os.replace(tmp_out, idx_path)
+        finally:
+            for p in runs:
+                try: os.remove(p)
+                except OSError: pass
+        if on_progress:
+            on_progress(total)
+
+    @staticmethod
+    def _spill(chunk):
+        chunk.sort()
+        fd, path = tempfile.mkstemp(prefix='learn_run_', suffix='.bin')
+        with os.fdopen(fd, 'wb') as f:
+            for rec in chunk:
+                f.write(_RECORD.pack(*rec))
+        return path
+
+    @staticmethod
+    def _read_run(path):
+        with open(path, 'rb') as f:
+            while True:
+                buf = f.read(_RECORD.size * 4096)
+                if not buf:
+                    return
+                yield from _RECORD.iter_unpack(buf)
+
+    def _open_index(self, idx_path):
+        self.index_path = idx_path
+        self._file = open(idx_path, 'rb')
+        if os.path.getsize(idx_path) <= _HEADER.size:
+            self._count = 0
+            return
+        self._mm    = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = _HEADER.unpack_from(self._mm, 0)[2]
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._count = 0
+
+    # ── Lookup ────────────────────────────────────────────
+
+    def _key_at(self, i):
+        return _KEY.unpack_from(self._mm, _HEADER.size + i * _RECORD.size)[0]
+
+    def _record_at(self, i):
+        return _RECORD.unpack_from(self._mm, _HEADER.size + i * _RECORD.size)
+
+    @staticmethod
+    def _as_dict(rec):
+        key, move, kind, depth, score, ev, count = rec
+        return {
+            'key':   key,
+            'uci':   decode_move(move),
+            'kind':  KIND_NAMES.get(kind, '?'),
+            'depth': depth,
+            'score': score,
+            'eval':  ev,
+            'count': count,
+        }
+
+    def entries(self, position):
+        """
+        Return all records for *position*: a raw 64-bit key, or a FEN when
+        a ``key_fn`` was supplied.  Best-scoring moves come first.
+        """
+        if isinstance(position, int):
+            key = position
+        elif self.key_fn is not None:
+            key = self.key_fn(position)
+        else:
+            return []
+        self.ensure_index()
+        if not self._count:
+            return []
+
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        out = []
+        while lo < self._count:
+            rec = self._record_at(lo)
+            if rec[0] != key:
+                break
+            out.append(self._as_dict(rec))
+            lo += 1
+        out.sort(key=lambda e: (e['depth'], e['score']), reverse=True)
+        return out
+
+    def probe(self, fen):
+        """
+        Return the learned best move (UCI) for *fen*, or None.
+
+        This is the ``probe(fen)`` hook ``TournamentRunner._book_probe``
+        uses, so a tournament can play from a learning file.
+        """
+        cands = [e for e in self.entries(fen) if e['kind'] != 'BOOK']
+        return cands[0]['uci'] if cands else None
+
+    # ── Statistics ────────────────────────────────────────
+
+    def stats(self, on_progress=None):
+        """
+        One streaming pass over the index.
+
+        Returns
+        -------
+        dict with records, positions, kinds {name: n}, depth_hist
+        {depth: n}, max_depth, avg_depth, min_score, max_score,
+        max_moves_per_pos, avg_moves_per_pos, file_size, index_size.
+        """
+        if self._stats is not None:
+            return self._stats
+        self.ensure_index(on_progress)
+
+        kinds, depth_hist = {}, {}
+        positions = max_moves = run = 0
+        depth_sum = depth_n = 0
+        min_score = max_score = None
+        last_key  = None
+        if self._count:
+            body = memoryview(self._mm)[_HEADER.size:_HEADER.size + self._count * _RECORD.size]
+            for key, _, kind, depth, score, _, _ in _RECORD.iter_unpack(body):
+                if key != last_key:
+                    positions += 1
+                    max_moves  = max(max_moves, run)
+                    run, last_key = 0, key
+                run += 1
+                name = KIND_NAMES.get(kind, '?')
+                kinds[name] = kinds.get(name, 0) + 1
+                if kind == KIND_EXP:
+                    depth_hist[depth] = depth_hist.get(depth, 0) + 1
+                    depth_sum += depth
+                    depth_n   += 1
+                if min_score is None or score < min_score: min_score = score
+                if max_score is None or score > max_score: max_score = score
+            body.release()
+            max_moves = max(max_moves, run)
+
+        self._stats = {
+            'records':           self._count,
+            'positions':         positions,
+            'kinds':             kinds,
+            'depth_hist':        dict(sorted(depth_hist.items())),
+            'max_depth':         max(depth_hist) if depth_hist else 0,
+            'avg_depth':         depth_sum / depth_n if depth_n else 0.0,
+            'min_score':         min_score,
+            'max_score':         max_score,
+            'max_moves_per_pos': max_moves,
+            'avg_moves_per_pos': self._count / positions if positions else 0.0,
+            'file_size':         os.path.getsize(self.path),
+            'index_size':        os.path.getsize(self.index_path) if self.index_path else 0,
+        }
+        return self._stats
+
+    def top_entries(self, n=200):
+        """The *n* records with the highest depth, then count and score."""
+        self.ensure_index()
+        if not self._count:
+            return []
+        body = memoryview(self._mm)[_HEADER.size:_HEADER.size + self._count * _RECORD.size]
+        try:
+            best = heapq.nlargest(n, _RECORD.iter_unpack(body),
+                                  key=lambda r: (r[3], r[6], r[4]))
+        finally:
+            body.release()
+        return [self._as_dict(r) for r in best]
+
+    def __len__(self):
+        self.ensure_index()
+        return self._count
@@ -0,0 +1,341 @@
+# ═══════════════════════════════════════════════════════════
+#  learned_book.py — Opening book learned from the game database
+# ═══════════════════════════════════════════════════════════
+
+import heapq
+import mmap
+import os
+import random
+import struct
+import tempfile
+
+from core.board import Board
+from core.movecodec import encode_move, decode_move
+from core.pgn import movetext_tokens, comment_eval
+from core.zobrist import board_hash, fen_hash
+
+# ── On-disk format ────────────────────────────────────────
+#
+#   header   : magic(4) version(u16) max_ply(u16) record_count(u64)
+#   records  : sorted by (key, move), fixed size, little-endian
+#              key u64 · move u16 · games u32 · wins u32 · draws u32 · avg_eval i16
+#
+# wins / draws are counted from the point of view of the side that plays
+# the move.  avg_eval is White-relative centipawns, NO_EVAL when unknown.
+
+MAGIC       = b'CEAB'
+VERSION     = 1
+NO_EVAL     = -32768
+_HEADER     = struct.Struct('<4sHHQ')
+_RECORD     = struct.Struct('<QHIIIh')
+# Spill-run records keep raw sums so runs can be merged exactly
+_RUN_RECORD = struct.Struct('<QHIIIqI')
+
+
+class LearnedBookBuilder:
+    """
+    Aggregate per-position move statistics from a stream of games and write
+    them to a sorted, indexed book file.
+
+    Memory stays bounded: statistics are accumulated in a dict of at most
+    *chunk_entries* (position, move) pairs, which is sorted and spilled to a
+    temporary run file whenever it fills up.  The runs are k-way merged into
+    the final file at the end, so a million-game database never has to fit
+    in memory at once.
+    """
+
+    def __init__(self, max_ply=24, chunk_entries=250_000, min_games=1,
+                 tmp_dir=None):
+        self.max_ply       = max_ply
+        self.chunk_entries = chunk_entries
+        self.min_games     = min_games
+        self.tmp_dir       = tmp_dir
+        self.games_read    = 0
+        self.games_skipped = 0
+        self._acc  = {}
+        self._runs = []
+
+    # ── Aggregation ───────────────────────────────────────
+
+    def add_game(self, result, pgn):
+        """Feed one game (PGN text + "1-0"/"0-1"/"1/2-1/2" result) into the book."""
+        if result not in ('1-0', '0-1', '1/2-1/2'):
+            self.games_skipped += 1
+            return
+        board = Board()
+        acc   = self._acc
+        try:
+            for ply, (san, comment) in enumerate(movetext_tokens(pgn)):
+                if ply >= self.max_ply:
+                    break
+                white_to_move = board.turn == 'w'
+                key = board_hash(board)
+                # Resolve + raw apply: no full legal-move generation per ply
+                fr, fc, tr, tc, promo = board.san_to_move(san)
+                uci = f"{chr(ord('a') + fc)}{8 - fr}{chr(ord('a') + tc)}{8 - tr}"
+                if promo:
+                    uci += promo
+                board = board._apply_raw(fr, fc, tr, tc, promo)
+                cp  = comment_eval(comment, white_to_move)
+
+                slot = (key, encode_move(uci))
+                stat = acc.get(slot)
+                if stat is None:
+                    stat = acc[slot] = [0, 0, 0, 0, 0]
+                stat[0] += 1
+                if result == '1/2-1/2':
+                    stat[2] += 1
+                elif (result == '1-0') == white_to_move:
+                    stat[1] += 1
+                if cp is not None:
+                    stat[3] += cp
+                    stat[4] += 1
+        except ValueError:
+            pass    # keep the moves parsed before the bad token
+        self.games_read += 1
+        if len(acc) >= self.chunk_entries:
+            self._spill()
+
+    def _spill(self):
+        """Write the in-memory accumulator to a sorted temporary run file."""
+        if not self._acc:
+            return
+        fd, path = tempfile.mkstemp(prefix='book_run_', suffix='.bin',
+                                    dir=self.tmp_dir)
+        with os.fdopen(fd, 'wb') as f:
+            for (key, move) in sorted(self._acc):
+                g, w, d, esum, en = self._acc[(key, move)]
+                f.write(_RUN_RECORD.pack(key, move, g, w, d, esum, en))
+        self._runs.append(path)
+        self._acc = {}
+
+    @staticmethod
+    def _read_run(path):
+        size = _RUN_RECORD.size
+        with open(path, 'rb') as f:
+            while True:
+                buf = f.read(size * 4096)
+                if not buf:
+                    return
+                for off in range(0, len(buf), size):
+                    yield _RUN_RECORD.unpack_from(buf, off)
+
+    # ── Output ────────────────────────────────────────────
+
+    def build(self, games, out_path, on_progress=None, progress_every=500):
+        """
+        Consume *games* — an iterable of ``(result, pgn)`` — and write the book.
+
+        Parameters
+        ----------
+        games       : iterable of (str, str)
+        out_path    : str       — destination book file
+        on_progress : callable(games_read) | None
+
+        Returns
+        -------
+        int — number of (position, move) records written.
+        """
+        for result, pgn in games:
+            self.add_game(result, pgn)
+            if on_progress and self.games_read % progress_every == 0:
+                on_progress(self.games_read)
+        self._spill()
+
+        tmp_out = out_path + '.tmp'
+        count   = 0
+        try:
+            with open(tmp_out, 'wb') as f:
+                f.write(_HEADER.pack(MAGIC, VERSION, self.max_ply, 0))
+                merged = heapq.merge(*(self._read_run(p) for p in self._runs))
+                cur = None
+                for key, move, g, w, d, esum, en in merged:
+                    if cur is not None and cur[0] == key and cur[1] == move:
+                        cur[2] += g; cur[3] += w; cur[4] += d
+                        cur[5] += esum; cur[6] += en
+                        continue
+                    if cur is not None:
+                        count += self._write_record(f, cur)
+                    cur = [key, move, g, w, d, esum, en]
+                if cur is not None:
+                    count += self._write_record(f, cur)
+                f.seek(0)
+                f.write(_HEADER.pack(MAGIC, VERSION, self.max_ply, count))
+            os.replace(tmp_out, out_path)
+        finally:
+            for p in self._runs:
+                try: os.remove(p)
+                except OSError: pass
+            self._runs = []
+            if os.path.exists(tmp_out):
+                os.remove(tmp_out)
+        if on_progress:
+            on_progress(self.games_read)
+        return count
+
+    def _write_record(self, f, rec):
+        key, move, g, w, d, esum, en = rec
+        if g < self.min_games:
+            return 0
+        avg = max(-32767, min(32767, round(esum / en))) if en else NO_EVAL
+        f.write(_RECORD.pack(key, move, g, w, d, avg))
+        return 1
+
+
+class LearnedBook:
+    """
+    Memory-mapped reader for a book written by ``LearnedBookBuilder``.
+
+    Lookups binary-search the sorted record array, so opening even a very
+    large book is instant and only touched pages are read from disk.
+
+    Tournaments use it through ``probe(fen)`` (see
+    ``TournamentRunner._book_probe``); the opening picker uses ``lines()``.
+    """
+
+    def __init__(self, path=None, min_games=2, rng=None):
+        self.path      = path
+        self.min_games = min_games
+        self.max_ply   = 0
+        self._count    = 0
+        self._file     = None
+        self._mm       = None
+        self._rng      = rng or random.Random()
+        if path and os.path.isfile(path):
+            self._open(path)
+
+    def _open(self, path):
+        try:
+            self._file = open(path, 'rb')
+            if os.path.getsize(path) <= _HEADER.size:
+                return
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, max_ply, count = _HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"not a learned book: {path}")
+            self.max_ply = max_ply
+            self._count  = count
+        except Exception as e:
+            print(f"[LearnedBook] Failed to open {path}: {e}")
+            self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._count = 0
+
+    # ── Lookup ────────────────────────────────────────────
+
+    def _key_at(self, i):
+        return struct.unpack_from('<Q', self._mm, _HEADER.size + i * _RECORD.size)[0]
+
+    def entries(self, position):
+        """
+        Return every book move for *position* (a FEN string, a Board or a
+        raw 64-bit key), most played first.
+
+        Returns
+        -------
+        list of dicts: {uci, games, wins, draws, losses, score, avg_eval}
+        """
+        if not self._count:
+            return []
+        if isinstance(position, int):
+            key = position
+        elif isinstance(position, str):
+            key = fen_hash(position)
+        else:
+            key = board_hash(position)
+
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        out = []
+        i = lo
+        while i < self._count:
+            k, move, g, w, d, avg = _RECORD.unpack_from(
+                self._mm, _HEADER.size + i * _RECORD.size)
+            if k != key:
+                break
+            out.append({
+                'uci':      decode_move(move),
+                'games':    g,
+                'wins':     w,
+                'draws':    d,
+                'losses':   g - w - d,
+                'score':    (w + 0.5 * d) / g if g else 0.0,
+                'avg_eval': None if avg == NO_EVAL else avg,
+            })
+            i += 1
+        out.sort(key=lambda e: e['games'], reverse=True)
+        return out
+
+    def probe(self, fen):
+        """
+        Pick a book move for *fen*, weighted by games played and score.
+
+        Returns a UCI string, or None when the position is out of book.
+        """
+        cands = [e for e in self.entries(fen) if e['games'] >= self.min_games]
+        if not cands:
+            return None
+        weights = [e['games'] * (0.25 + e['score']) for e in cands]
+        return self._rng.choices(cands, weights=weights)[0]['uci']
+
+    def lines(self, max_depth=8, min_games=None, limit=200):
+        """
+        Enumerate the book's main lines from the starting position.
+
+        Returns
+        -------
+        list of (uci_seq: list[str], games: int, score: float) for every
+        leaf reached by following moves with at least *min_games* games,
+        most played first.
+        """
+        min_games = self.min_games if min_games is None else min_games
+        results   = []
+
+        def walk(board, seq, games, score):
+            if len(results) >= limit * 4:
+                return
+            if len(seq) >= max_depth:
+                results.append((list(seq), games, score))
+                return
+            kids = [e for e in self.entries(board) if e['games'] >= min_games]
+            if not kids:
+                if seq:
+                    results.append((list(seq), games, score))
+                return
+            for e in kids:
+                uci = e['uci']
+                fc = ord(uci[0]) - ord('a'); fr = 8 - int(uci[1])
+                tc = ord(uci[2]) - ord('a'); tr = 8 - int(uci[3])
+                promo = uci[4] if len(uci) > 4 else None
+                seq.append(uci)
+                walk(board._apply_raw(fr, fc, tr, tc, promo), seq,
+                     e['games'], e['score'])
+                seq.pop()
+
+        if self._count:
+            walk(Board(), [], 0, 0.0)
+        results.sort(key=lambda x: x[1], reverse=True)
+        return results[:limit]
+
+    # ── Properties ────────────────────────────────────────
+
+    @property
+    def loaded(self):
+        """True if the book file was opened and holds at least one record."""
+        return self._count > 0
+
+    def __len__(self):
+        return self._count
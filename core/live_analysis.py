@@ -0,0 +1,297 @@
+# ═══════════════════════════════════════════════════════════
+#  live_analysis.py — Asynchronous analysis pipeline for played games
+# ═══════════════════════════════════════════════════════════
+
+import os
+import queue
+import threading
+import time
+
+from core.engine import AnalyzerEngine
+from core.utils import classify_move_quality
+
+# mode -> label shown in the tournament dialog
+ANALYSIS_MODES = {
+    'live':      "Live (alongside play)",
+    'post-game': "After each game",
+    'budget':    "Live, CPU budget",
+}
+
+_STOP = object()
+
+
+class AnalysisPipeline:
+    """
+    Evaluates game positions on a dedicated analyzer, off the move loop.
+
+    The game loop only queues positions with ``submit`` — it never waits
+    for the analyzer — and a single worker thread evaluates them in order
+    and reports each result through *on_eval*.  Positions of one game
+    arrive in ply order, so each move's quality is classified from the
+    previous position's eval.
+
+    Modes
+    -----
+    live      : evaluate positions as they are queued
+    post-game : hold a game's positions until ``end_game``, so the
+                analyzer never runs while that game is being played
+    budget    : like live, but sleep after each search so the analyzer
+                uses at most *cpu_budget* of the machine's CPU time; the
+                backlog is worked off after the game if it falls behind
+
+    Parameters
+    ----------
+    engine_path : str
+    mode        : str — an ANALYSIS_MODES key
+    movetime_ms : int — search time per position
+    cpu_budget  : float — share of all CPUs (budget mode)
+    on_eval     : callable(key, ply, cp, score_type, quality) | None —
+                  called from the worker thread; cp is White's POV and
+                  quality the label of the move that led to the position
+                  (None for ply 0 or when an eval is missing)
+    cache       : eval_cache.EvalCache | None — shared evaluation cache
+    """
+
+    def __init__(self, engine_path, mode='live', movetime_ms=150,
+                 cpu_budget=0.25, on_eval=None, cache=None):
+        if mode not in ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode: {mode}")
+        self.engine_path = engine_path
+        self.mode        = mode
+        self.movetime_ms = movetime_ms
+        self.cpu_budget  = cpu_budget
+        self.on_eval     = on_eval
+        self.cache       = cache
+        self.engine      = None
+        self._queue      = queue.Queue()
+        self._held       = {}      # key -> [(ply, moves)] (post-game mode)
+        self._last       = {}      # key -> (ply, cp) of the last result
+        self._thread     = None
+
+    # ── Lifecycle ─────────────────────────────────────────
+
+    def start(self):
+        """Start the analyzer (below normal priority) and the worker."""
+        self.engine = AnalyzerEngine(self.engine_path, "PipelineAnalyzer",
+                                     low_priority=True)
+        self.engine.start()
+        self.engine.set_option("Threads", 1)
+        self.engine.cache = self.cache
+        self._thread = threading.Thread(target=self._worker,
+                                        name="AnalysisPipeline", daemon=True)
+        self._thread.start()
+
+    def close(self, drain=False, timeout=None):
+        """
+        Stop the worker and the analyzer.  With *drain*, positions already
+        queued (and held ones) are evaluated first.
+        """
+        if drain:
+            for key in list(self._held):
+                self.end_game(key)
+        else:
+            self._discard()
+        self._queue.put(_STOP)
+        if self._thread is not None and timeout is not None:
+            self._thread.join(timeout)
+
+    @property
+    def pending(self):
+        """Positions waiting to be evaluated."""
+        return self._queue.qsize() + sum(len(v) for v in list(self._held.values()))
+
+    # ── Producer side (game loop) ─────────────────────────
+
+    def submit(self, key, ply, moves_str):
+        """Queue the position after *ply* moves (*moves_str*) of game *key*."""
+        if self.mode == 'post-game':
+            self._held.setdefault(key, []).append((ply, moves_str))
+        else:
+            self._queue.put((key, ply, moves_str))
+
+    def end_game(self, key):
+        """Mark game *key* finished: release its held positions."""
+        for ply, moves_str in self._held.pop(key, ()):
+            self._queue.put((key, ply, moves_str))
+        self._queue.put((key, None, None))
+
+    # ── Worker ────────────────────────────────────────────
+
+    def _discard(self):
+        self._held.clear()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def _share(self):
+        if self.mode != 'budget':
+            return 1.0
+        return min(1.0, max(0.01, self.cpu_budget * (os.cpu_count() or 1)))
+
+    def _worker(self):
+        share = self._share()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                key, ply, moves_str = item
+                if ply is None:
+                    self._last.pop(key, None)    # game done
+                    continue
+                if not self.engine.alive:
+                    continue
+                t0 = time.perf_counter()
+                cp, score_type = self.engine.eval_position(
+                    moves_str, movetime_ms=self.movetime_ms)
+                prev = self._last.get(key)
+                quality = None
+                if prev is not None and prev[0] == ply - 1:
+                    quality = classify_move_quality(prev[1], cp, ply % 2 == 1)
+                self._last[key] = (ply, cp)
+                if self.on_eval:
+                    try:
+                        self.on_eval(key, ply, cp, score_type, quality)
+                    except Exception as e:
+                        print(f"[AnalysisPipeline] on_eval error: {e}")
+                if share < 1.0:
+                    time.sleep((time.perf_counter() - t0) * (1 / share - 1))
+        finally:
+            self.engine.stop()
+
+
+# ── Rolling eval chain (GUI games) ────────────────────────
+
+class EvalChain:
+    """
+    Rolling evaluation of the game on the main board, on one analyzer.
+
+    Every played move is ``push``-ed; a single worker thread searches the
+    newest position with ``go infinite``, reporting the refining eval for
+    the eval bar, and judges the move's quality once the search has run
+    *quality_ms*.  The final eval of each position is kept per position,
+    so the next move's "before" eval is the one already computed — each
+    move costs one search, not two.  A move pushed while an older one is
+    still waiting or being searched replaces it: the stale search is
+    stopped and its move gets no quality.
+
+    Parameters
+    ----------
+    engine     : AnalyzerEngine | None — may be swapped at any time
+    quality_ms : int — search time before a move's quality is judged
+    refine_ms  : int — how long a position keeps being refined
+    on_eval    : callable(ply, cp) | None — eval-bar updates
+    on_quality : callable(ply, san, quality, cp) | None — once per move
+    Both callbacks run on the worker thread.
+    """
+
+    BAR_INTERVAL = 0.1    # seconds between eval-bar updates
+
+    def __init__(self, engine=None, quality_ms=200, refine_ms=15000,
+                 on_eval=None, on_quality=None):
+        self.engine     = engine
+        self.quality_ms = quality_ms
+        self.refine_ms  = refine_ms
+        self.on_eval    = on_eval
+        self.on_quality = on_quality
+        self._lock      = threading.Lock()
+        self._wake      = threading.Event()
+        self._request   = None    # newest (generation, ply, before, after, white, san)
+        self._gen       = 0       # bumped by reset(): drops older results
+        self._chain     = {}      # moves string -> latest eval of that position
+        self._closed    = False
+        self._thread    = threading.Thread(target=self._worker,
+                                           name="EvalChain", daemon=True)
+        self._thread.start()
+
+    def push(self, moves_before, moves_after, was_white_moving, san):
+        """Queue the move just played; supersedes any pending one."""
+        with self._lock:
+            ply = len(moves_after.split()) if moves_after else 0
+            self._request = (self._gen, ply, moves_before, moves_after,
+                             was_white_moving, san)
+        self._wake.set()
+
+    def reset(self):
+        """New game: forget the chain and cancel any search."""
+        with self._lock:
+            self._gen    += 1
+            self._request = None
+            self._chain   = {}
+        self._wake.set()
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+
+    def _stale(self, gen):
+        return self._closed or self._request is not None or gen != self._gen
+
+    def _worker(self):
+        while not self._closed:
+            self._wake.wait()
+            with self._lock:
+                req, self._request = self._request, None
+                self._wake.clear()
+            if req is None:
+                continue
+            try:
+                self._run(*req)
+            except Exception as e:
+                print(f"[EvalChain] error: {e}")
+
+    def _run(self, gen, ply, before, after, was_white, san):
+        eng = self.engine
+        if eng is None or not eng.alive or self._stale(gen):
+            return
+        cp_before = self._chain.get(before)
+        if cp_before is None:
+            # The chain was broken (first move, or a skipped stale move)
+            cp_before, _ = eng.eval_position(before, movetime_ms=self.quality_ms)
+            if self._stale(gen):
+                return
+        # Positions searched before (this session or a cached one) are
+        # judged at once; the search then only refines the eval bar
+        limit = f"movetime {self.quality_ms}"
+        cache = eng.cache
+        key   = cache.position_key(after) if cache is not None else None
+        hit   = cache.get(key, eng.identity, limit) if cache is not None else None
+        judged = [False]
+        last_bar = [0.0]
+        t0 = time.perf_counter()
+
+        def _judge(cp):
+            judged[0] = True
+            if gen == self._gen and self.on_quality:
+                quality = classify_move_quality(cp_before, cp, was_white)
+                self.on_quality(ply, san, quality, cp)
+
+        if hit is not None:
+            _judge(hit[0])
+
+        def _on_score(cp, score_type, depth):
+            if gen != self._gen:
+                return
+            self._chain[after] = cp
+            now = time.perf_counter()
+            if not judged[0] and now - t0 >= self.quality_ms / 1000:
+                _judge(cp)
+                if cache is not None:
+                    cache.put(key, eng.identity, limit, cp, score_type, None)
+            elif now - last_bar[0] >= self.BAR_INTERVAL and self.on_eval:
+                last_bar[0] = now
+                self.on_eval(ply, cp)
+
+        cp, score_type, best = eng.analyse_infinite(
+            after, on_score=_on_score, should_stop=lambda: self._stale(gen),
+            max_seconds=self.refine_ms / 1000)
+        if cp is None or gen != self._gen:
+            return
+        self._chain[after] = cp
+        if not judged[0] and not self._stale(gen):
+            # The search ended early (e.g. mate found)
+            _judge(cp)
+        elif self.on_eval:
+            self.on_eval(ply, cp)
@@ -0,0 +1,323 @@
+# ═══════════════════════════════════════════════════════════
+#  ml_ratings.py — Maximum-likelihood ratings (Bradley–Terry / Davidson)
+# ═══════════════════════════════════════════════════════════
+
+import math
+
+from core.elo import RatingService
+
+try:
+    import numpy as np
+except ImportError:     # optional — the pure-Python solver is used instead
+    np = None
+
+# One natural-log unit of strength in Elo points
+ELO_PER_NAT = 400 / math.log(10)
+# Two-sided 95% normal quantile, for the error bars
+Z95 = 1.959964
+
+
+def pair_results(games):
+    """
+    Fold ``(white, black, result[, count])`` rows into per-pair totals.
+
+    Returns
+    -------
+    dict {(a, b): [wins_a, draws, wins_b]} with a < b; colours are
+    ignored and aborted / no-result games dropped.
+    """
+    table = {}
+    for row in games:
+        white, black, result = row[0], row[1], row[2]
+        n = row[3] if len(row) > 3 else 1
+        if white == black or result not in ('1-0', '0-1', '1/2-1/2'):
+            continue
+        if white < black:
+            key, first_wins = (white, black), result == '1-0'
+        else:
+            key, first_wins = (black, white), result == '0-1'
+        cell = table.get(key)
+        if cell is None:
+            cell = table[key] = [0, 0, 0]
+        if result == '1/2-1/2':
+            cell[1] += n
+        elif first_wins:
+            cell[0] += n
+        else:
+            cell[2] += n
+    return table
+
+
+def compute_ml_ratings(pairs, draws=True, prior=1.0, anchor=1500,
+                       start=None, max_iter=5000, tol=1e-9, errors=True):
+    """
+    Fit ratings to pairwise results by maximum likelihood.
+
+    With *draws* the Davidson model is used: a draw has probability
+    ``ν·√(πa·πb) / (πa + πb + ν·√(πa·πb))`` and ν is fitted too.  Without
+    it, the Bradley–Terry model scores a draw as half a win.  Either way
+    the result does not depend on game order.
+
+    The fit uses the minorise–maximise iteration (Hunter 2004), which
+    converges monotonically.  *prior* virtual games, split evenly, are
+    added to every pair that played so engines with a perfect or a zero
+    score still get a finite rating.
+
+    Parameters
+    ----------
+    pairs    : dict {(a, b): [wins_a, draws, wins_b]} — see ``pair_results``
+    draws    : bool  — Davidson (True) or Bradley–Terry (False)
+    prior    : float — virtual games per pair
+    anchor   : float — rating of the average engine
+    start    : dict {engine: elo} | None — warm start (e.g. the last fit)
+    max_iter : int
+    tol      : float — convergence threshold on the log-strengths
+    errors   : bool  — compute the error bars (skipped by the bootstrap)
+
+    Returns
+    -------
+    dict with keys
+        ratings    : {engine: float elo}
+        errors     : {engine: float} — 95% error bar (± Elo); empty
+                     without *errors*
+        draw_param : float — fitted ν (0.0 for Bradley–Terry)
+        iterations : int
+    """
+    names = sorted({e for key in pairs for e in key})
+    if not names:
+        return {'ratings': {}, 'errors': {}, 'draw_param': 0.0, 'iterations': 0}
+    index = {name: i for i, name in enumerate(names)}
+    rows  = [(index[a], index[b], wa + prior / 2, d, wb + prior / 2)
+             for (a, b), (wa, d, wb) in pairs.items()]
+    theta = [0.0] * len(names)
+    if start:
+        mean  = sum(start.values()) / len(start)
+        theta = [(start.get(name, mean) - mean) / ELO_PER_NAT for name in names]
+
+    solve = _solve_numpy if np is not None else _solve_python
+    theta, var, nu, iters = solve(len(names), rows, theta, draws, max_iter,
+                                  tol, errors)
+
+    mean = sum(theta) / len(theta)
+    return {
+        'ratings':    {name: anchor + ELO_PER_NAT * (theta[i] - mean)
+                       for i, name in enumerate(names)},
+        'errors':     {name: Z95 * ELO_PER_NAT * math.sqrt(max(var[i], 0.0))
+                       for i, name in enumerate(names)} if errors else {},
+        'draw_param': nu,
+        'iterations': iters,
+    }
+
+
+# ── Solvers ───────────────────────────────────────────────
+#
+# Both take rows of (i, j, wins_i, draws, wins_j) and return
+# (theta, variance of each theta or None, ν, iterations).  MM step:
+#
+#   π_i ← (2·W_i + D_i) / Σ_j n_ij · (2 + ν·√(π_j/π_i)) / (π_i + π_j + ν·√(π_i·π_j))
+#   ν   ← D / Σ_pairs n_ij · √(π_i·π_j) / (π_i + π_j + ν·√(π_i·π_j))
+#
+# Variances come from the observed information: each game between i and
+# j contributes Var(score) = p_w + p_d/4 − (p_w + p_d/2)² to I_ii and I_jj
+# and its negative to I_ij.
+
+def _initial_nu(rows, draws):
+    if not draws:
+        return 0.0
+    d = sum(r[3] for r in rows)
+    n = sum(r[2] + r[3] + r[4] for r in rows)
+    # For equal strengths P(draw) = ν / (2 + ν)
+    return 2 * d / max(n - d, 1e-9)
+
+
+def _solve_python(n, rows, theta, draws, max_iter, tol, errors=True):
+    score = [0.0] * n
+    for i, j, wi, d, wj in rows:
+        score[i] += 2 * wi + d
+        score[j] += 2 * wj + d
+    total_draws = sum(r[3] for r in rows)
+    nu = _initial_nu(rows, draws)
+    pi = [math.exp(t) for t in theta]
+
+    # The ν update reuses this pass's terms (with the strengths from
+    # before the step), which halves the work per iteration
+    sqrt  = math.sqrt
+    flat  = [(i, j, wi + d + wj) for i, j, wi, d, wj in rows]
+    iters = 0
+    for iters in range(1, max_iter + 1):
+        denom = [0.0] * n
+        acc   = 0.0
+        for i, j, games in flat:
+            pii, pj = pi[i], pi[j]
+            s = sqrt(pii * pj)
+            q = games / (pii + pj + nu * s)
+            t = nu * s * q
+            denom[i] += 2 * q + t / pii
+            denom[j] += 2 * q + t / pj
+            acc += s * q
+        new = [math.log(max(score[i], 1e-12) / denom[i]) for i in range(n)]
+        mean = sum(new) / n
+        new = [t - mean for t in new]
+        delta = max(abs(a - b) for a, b in zip(new, theta))
+        theta = new
+        pi = [math.exp(t) for t in theta]
+        if draws:
+            nu = total_draws / acc if acc > 0 else 0.0
+        if delta < tol:
+            break
+    if not errors:
+        return theta, None, nu, iters
+
+    # Diagonal of the information matrix only — a full inverse is too
+    # slow in pure Python; this slightly understates the error bars
+    info = [0.0] * n
+    for i, j, wi, d, wj in rows:
+        games = wi + d + wj
+        s  = math.sqrt(pi[i] * pi[j])
+        z  = pi[i] + pi[j] + nu * s
+        pw, pd = pi[i] / z, nu * s / z
+        v  = games * (pw + pd / 4 - (pw + pd / 2) ** 2)
+        info[i] += v
+        info[j] += v
+    var = [1 / x if x > 0 else 0.0 for x in info]
+    return theta, var, nu, iters
+
+
+def _solve_numpy(n, rows, theta, draws, max_iter, tol, errors=True):
+    arr = np.asarray(rows, dtype=float)
+    i, j = arr[:, 0].astype(np.intp), arr[:, 1].astype(np.intp)
+    wi, d, wj = arr[:, 2], arr[:, 3], arr[:, 4]
+    games = wi + d + wj
+    score = (np.bincount(i, 2 * wi + d, minlength=n)
+             + np.bincount(j, 2 * wj + d, minlength=n))
+    score = np.maximum(score, 1e-12)
+    total_draws = d.sum()
+    nu    = _initial_nu(rows, draws)
+    theta = np.asarray(theta, dtype=float)
+
+    iters = 0
+    for iters in range(1, max_iter + 1):
+        pi = np.exp(theta)
+        s  = np.sqrt(pi[i] * pi[j])
+        z  = pi[i] + pi[j] + nu * s
+        denom = (np.bincount(i, games * (2 + nu * s / pi[i]) / z, minlength=n)
+                 + np.bincount(j, games * (2 + nu * s / pi[j]) / z, minlength=n))
+        new = np.log(score / denom)
+        new -= new.mean()
+        delta = np.abs(new - theta).max()
+        theta = new
+        if draws:
+            pi  = np.exp(theta)
+            s   = np.sqrt(pi[i] * pi[j])
+            acc = (games * s / (pi[i] + pi[j] + nu * s)).sum()
+            nu  = float(total_draws / acc) if acc > 0 else 0.0
+        if delta < tol:
+            break
+    if not errors:
+        return theta.tolist(), None, nu, iters
+
+    pi = np.exp(theta)
+    s  = np.sqrt(pi[i] * pi[j])
+    z  = pi[i] + pi[j] + nu * s
+    pw, pd = pi[i] / z, nu * s / z
+    v  = games * (pw + pd / 4 - (pw + pd / 2) ** 2)
+    info = np.zeros((n, n))
+    np.add.at(info, (i, i), v)
+    np.add.at(info, (j, j), v)
+    np.add.at(info, (i, j), -v)
+    np.add.at(info, (j, i), -v)
+    # Ratings are only defined up to a constant: the pseudo-inverse gives
+    # the covariance under the zero-mean constraint
+    var = np.diag(np.linalg.pinv(info))
+    return theta.tolist(), var.tolist(), nu, iters
+
+
+# ── Cached service ────────────────────────────────────────
+
+class MLRatingService(RatingService):
+    """
+    Maximum-likelihood ratings of every engine, refitted only when games
+    are added or the history changes.
+
+    Pair totals are kept in memory and extended with just the new games;
+    each refit starts from the previous ratings, so it converges in a few
+    iterations.  The last fit is persisted, so a new session with no new
+    games starts without fitting at all.
+
+    Parameters
+    ----------
+    db     : database.Database
+    draws  : bool  — Davidson (True) or Bradley–Terry (False)
+    prior  : float — virtual games per pair
+    anchor : float — rating of the average engine
+    """
+
+    def __init__(self, db, draws=True, prior=1.0, anchor=1500):
+        super().__init__(db)
+        self.draws     = draws
+        self.prior     = prior
+        self.anchor    = anchor
+        self.name      = f"ml:{'davidson' if draws else 'bt'}:{prior:g}:{anchor:g}"
+        self.label     = ("Davidson (max. likelihood)" if draws
+                          else "Bradley–Terry (max. likelihood)")
+        self.draw_param = 0.0
+        self._pairs    = None
+        self._key      = None    # (last game id, revision) of the current fit
+
+    def pair_totals(self):
+        """
+        The ``pair_results`` table behind the current fit (a copy, keyed
+        by engine id — see ``Database.engine_names``), and the
+        ``(last game id, revision)`` it covers.
+        """
+        with self._lock:
+            self._sync()
+            if self._pairs is None:     # fit came from the snapshot
+                self._pairs = self._load_pairs(self._key[0])
+            return {k: list(v) for k, v in self._pairs.items()}, self._key
+
+    def _sync(self):
+        max_id, revision = self.db.get_games_watermark()
+        if self._values is None:
+            snap = self.db.load_rating_snapshot(self.name)
+            if snap is not None:
+                last_id, rev, data = snap
+                self._values = data['ratings']
+                self._errors = data['errors']
+                self.draw_param = data['draw_param']
+                self._key = (last_id, rev)
+            else:
+                self._values, self._key = {}, None
+            self._pairs = None
+            self._round()
+        if self._key == (max_id, revision):
+            return
+
+        if self._pairs is not None and self._key and self._key[1] == revision \
+                and self._key[0] <= max_id:
+            pairs = pair_results(
+                row[1:] for row in self.db.get_games_for_ratings(after_id=self._key[0])
+                if row[0] <= max_id)
+            for key, (wa, d, wb) in pairs.items():
+                cell = self._pairs.setdefault(key, [0, 0, 0])
+                cell[0] += wa; cell[1] += d; cell[2] += wb
+        else:
+            self._pairs = self._load_pairs(max_id)
+
+        # Fitted on engine ids, so the solver's arrays follow id order
+        names = self.db.engine_names()
+        ids   = {name: i for i, name in enumerate(names) if name is not None}
+        start = {ids[n]: v for n, v in self._values.items() if n in ids}
+        fit = compute_ml_ratings(self._pairs, draws=self.draws, prior=self.prior,
+                                 anchor=self.anchor, start=start or None)
+        self._values    = {names[i]: v for i, v in fit['ratings'].items()}
+        self._errors    = {names[i]: v for i, v in fit['errors'].items()}
+        self.draw_param = fit['draw_param']
+        self._key       = (max_id, revision)
+        self._round()
+        self.db.save_rating_snapshot(self.name, max_id, revision, {
+            'ratings': self._values, 'errors': self._errors,
+            'draw_param': self.draw_param})
+
+    def _load_pairs(self, max_id):
+        return pair_results(self.db.get_pair_results(max_id))
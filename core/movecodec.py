@@ -0,0 +1,52 @@
+# ═══════════════════════════════════════════════════════════
+#  movecodec.py — Compact 16-bit move encoding
+# ═══════════════════════════════════════════════════════════
+
+import sys
+from array import array
+
+# Layout (same square numbering as most engine learning files):
+#   bits  0-5   destination square   (a1 = 0 … h8 = 63)
+#   bits  6-11  origin square
+#   bits 12-14  promotion piece      (0 none, 1 n, 2 b, 3 r, 4 q)
+
+_PROMO_CODE  = {None: 0, 'n': 1, 'b': 2, 'r': 3, 'q': 4}
+_PROMO_PIECE = {v: k for k, v in _PROMO_CODE.items()}
+
+
+def _sq(name):
+    return (int(name[1]) - 1) * 8 + (ord(name[0]) - ord('a'))
+
+
+def _sq_name(sq):
+    return f"{chr(ord('a') + sq % 8)}{sq // 8 + 1}"
+
+
+def encode_move(uci):
+    """Encode a UCI move string (``e2e4``, ``e7e8q``) as a 16-bit int."""
+    promo = uci[4].lower() if len(uci) > 4 else None
+    return (_PROMO_CODE.get(promo, 0) << 12) | (_sq(uci[0:2]) << 6) | _sq(uci[2:4])
+
+
+def decode_move(code):
+    """Decode a 16-bit move back to its UCI string."""
+    promo = _PROMO_PIECE.get((code >> 12) & 7)
+    uci   = _sq_name((code >> 6) & 63) + _sq_name(code & 63)
+    return uci + promo if promo else uci
+
+
+def pack_moves(ucis):
+    """Pack a sequence of UCI moves into a little-endian uint16 blob (2 bytes/move)."""
+    codes = array('H', (encode_move(u) for u in ucis))
+    if sys.byteorder != 'little':
+        codes.byteswap()
+    return codes.tobytes()
+
+
+def unpack_moves(blob):
+    """Inverse of ``pack_moves``: return the list of UCI strings."""
+    codes = array('H')
+    codes.frombytes(bytes(blob or b''))
+    if sys.byteorder != 'little':
+        codes.byteswap()
+    return [decode_move(c) for c in codes]
@@ -18,6 +18,7 @@ class OpeningBook:
 
     def __init__(self, csv_path=None):
         self._entries = []   # list of (uci_seq_tuple, eco_str, name_str)
+        self.learned  = None # optional LearnedBook built from the game DB
         if csv_path and os.path.isfile(csv_path):
             self._load(csv_path)
 
@@ -111,6 +112,43 @@ class OpeningBook:
                 return eco, name
         return None, None
 
+    # ── Learned book ──────────────────────────────────────
+
+    def attach_learned(self, learned_book):
+        """Attach (or detach with None) a ``LearnedBook`` built from the game DB."""
+        if self.learned is not None and self.learned is not learned_book:
+            self.learned.close()
+        self.learned = learned_book if learned_book and learned_book.loaded else None
+
+    def probe(self, fen):
+        """
+        Return a book move for *fen* from the attached learned book.
+
+        The CSV openings only name positions, so without a learned book this
+        always returns None and engines play their own moves.
+        """
+        if self.learned is None:
+            return None
+        return self.learned.probe(fen)
+
+    def learned_lines(self, max_depth=8, limit=200):
+        """
+        Return the learned book's main lines as opening-picker entries.
+
+        Returns
+        -------
+        list of (uci_seq_tuple, eco_str, name_str)
+        """
+        if self.learned is None:
+            return []
+        out = []
+        for seq, games, score in self.learned.lines(max_depth=max_depth, limit=limit):
+            eco, name = self.lookup(seq)
+            label = name or ' '.join(seq)
+            out.append((tuple(seq), 'DB',
+                        f"{label}  ({games} games, {score * 100:.0f}%)"))
+        return out
+
     # ── Properties ────────────────────────────────────────
 
     @property
@@ -0,0 +1,85 @@
+# ═══════════════════════════════════════════════════════════
+#  pgn.py — Lightweight PGN header / movetext parsing
+# ═══════════════════════════════════════════════════════════
+
+import re
+
+_HEADER_RE  = re.compile(r'\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]')
+_TOKEN_RE   = re.compile(r'\{[^}]*\}|\([^)]*\)|\$\d+|[^\s{}()]+')
+_MOVENUM_RE = re.compile(r'^\d+\.+')
+_EVAL_RE    = re.compile(r'\[%eval\s+(#?)([+-]?\d+(?:\.\d+)?)\]')
+_CUTE_RE    = re.compile(r'^\s*([+-]?)(M?)(\d+(?:\.\d+)?)/\d+')
+
+RESULT_TOKENS = ('1-0', '0-1', '1/2-1/2', '*')
+
+
+def parse_headers(pgn):
+    """Return the ``[Tag "value"]`` pairs of a PGN as a dict."""
+    return {m.group(1): m.group(2) for m in _HEADER_RE.finditer(pgn or '')}
+
+
+def split_pgn(pgn):
+    """Split a PGN into (header_text, movetext) at the first blank line after the tags."""
+    pgn   = pgn or ''
+    lines = pgn.split('\n')
+    i = 0
+    while i < len(lines) and lines[i].strip().startswith('['):
+        i += 1
+    return '\n'.join(lines[:i]), '\n'.join(lines[i:])
+
+
+def movetext_tokens(pgn):
+    """
+    Yield ``(san, comment)`` pairs from the movetext of *pgn*.
+
+    Move numbers, NAGs, variations and the result token are skipped.  The
+    comment is the text of the ``{…}`` block directly following the move,
+    or None.
+    """
+    _, body = split_pgn(pgn)
+    pending = None
+    for tok in _TOKEN_RE.findall(body):
+        if tok.startswith('{'):
+            if pending is not None:
+                yield pending, tok[1:-1].strip()
+                pending = None
+            continue
+        if tok.startswith('(') or tok.startswith('$'):
+            continue
+        tok = _MOVENUM_RE.sub('', tok)
+        if not tok or tok in RESULT_TOKENS:
+            continue
+        if pending is not None:
+            yield pending, None
+        pending = tok
+    if pending is not None:
+        yield pending, None
+
+
+def san_moves(pgn):
+    """Return the bare SAN move list of *pgn*."""
+    return [san for san, _ in movetext_tokens(pgn)]
+
+
+def comment_eval(comment, white_moved):
+    """
+    Extract a centipawn eval (White's perspective) from a move comment.
+
+    Understands lichess-style ``[%eval 0.35]`` / ``[%eval #-3]`` (already
+    White-relative) and cutechess-style ``+0.35/18`` (relative to the side
+    that just moved).  Returns None when no eval is present.
+    """
+    if not comment:
+        return None
+    m = _EVAL_RE.search(comment)
+    if m:
+        if m.group(1):
+            return 30000 if not m.group(2).startswith('-') else -30000
+        return int(round(float(m.group(2)) * 100))
+    m = _CUTE_RE.match(comment)
+    if m:
+        sign = -1 if m.group(1) == '-' else 1
+        cp   = 30000 if m.group(2) else int(round(float(m.group(3)) * 100))
+        cp  *= sign
+        return cp if white_moved else -cp
+    return None
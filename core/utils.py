@@ -60,6 +60,12 @@ def get_db_path():
     return os.path.join(db_dir, "chess_arena.db")
 
 
+def get_learned_book_path(db_path=None):
+    """Return the path of the opening book learned from *db_path* (default DB if None)."""
+    db_path = db_path or get_db_path()
+    return os.path.splitext(db_path)[0] + ".book"
+
+
 def get_tier(rating):
     """Return the (label, color) tier tuple for a given Elo rating."""
     for threshold, label, color in RANK_TIERS:
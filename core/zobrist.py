@@ -0,0 +1,86 @@
+# ═══════════════════════════════════════════════════════════
+#  zobrist.py — 64-bit Zobrist position hashing
+# ═══════════════════════════════════════════════════════════
+
+import random
+
+# Keys are generated from a fixed seed so every build of the arena hashes a
+# position to the same 64-bit value; anything written to disk (learned books,
+# position indexes) stays valid across runs.
+_SEED  = 0x43454142   # "CEAB"
+_rng   = random.Random(_SEED)
+
+_PIECES = 'PNBRQKpnbrqk'
+
+# PIECE_KEYS[piece_char][square]  — square 0 = a1, 63 = h8
+PIECE_KEYS = {p: [_rng.getrandbits(64) for _ in range(64)] for p in _PIECES}
+CASTLE_KEYS = {c: _rng.getrandbits(64) for c in 'KQkq'}
+EP_KEYS     = [_rng.getrandbits(64) for _ in range(8)]
+SIDE_KEY    = _rng.getrandbits(64)     # XOR-ed in when White is to move
+
+del _rng
+
+
+def _ep_capturable(rows, turn, ep):
+    """True if the side to move has a pawn that can actually capture on *ep*."""
+    if not ep or ep == '-':
+        return False
+    file_ = ord(ep[0]) - ord('a')
+    # The capturing pawn stands on the rank "behind" the ep square
+    r    = 3 if turn == 'w' else 4
+    pawn = 'P' if turn == 'w' else 'p'
+    for df in (-1, 1):
+        f = file_ + df
+        if 0 <= f < 8 and rows[r][f] == pawn:
+            return True
+    return False
+
+
+def hash_rows(rows, turn, castling, ep):
+    """
+    Hash a position given as an 8×8 list of piece chars (row 0 = rank 8).
+
+    The en-passant file only contributes when a capture is possible, so
+    transpositions that differ only by an unusable ep square hash equal.
+    """
+    h = 0
+    for r in range(8):
+        row = rows[r]
+        base = (7 - r) * 8
+        for c in range(8):
+            p = row[c]
+            if p != '.':
+                h ^= PIECE_KEYS[p][base + c]
+    if castling and castling != '-':
+        for ch in castling:
+            k = CASTLE_KEYS.get(ch)
+            if k:
+                h ^= k
+    if _ep_capturable(rows, turn, ep):
+        h ^= EP_KEYS[ord(ep[0]) - ord('a')]
+    if turn == 'w':
+        h ^= SIDE_KEY
+    return h
+
+
+def board_hash(board):
+    """Return the Zobrist key of a ``core.board.Board`` position."""
+    return hash_rows(board.board, board.turn, board.castling, board.ep)
+
+
+def fen_hash(fen):
+    """Return the Zobrist key of a FEN string (move counters are ignored)."""
+    parts = fen.split()
+    rows  = []
+    for row_str in parts[0].split('/'):
+        row = []
+        for ch in row_str:
+            if ch.isdigit():
+                row.extend(['.'] * int(ch))
+            else:
+                row.append(ch)
+        rows.append(row)
+    turn     = parts[1] if len(parts) > 1 else 'w'
+    castling = parts[2] if len(parts) > 2 else '-'
+    ep       = parts[3] if len(parts) > 3 else '-'
+    return hash_rows(rows, turn, castling, ep)
@@ -3,3 +3,5 @@
 # ═══════════════════════════════════════════════════════════
 
 from data.database import Database
+from data.writer import GameWriter
+from data.pgn_codec import compress_pgn, decompress_pgn
@@ -2,9 +2,243 @@
 #  database.py — SQLite persistence layer  (FIXED)
 # ═══════════════════════════════════════════════════════════════════════════════
 
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import re
 import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from core.elo import EloService, EloHistory
+from core.ml_ratings import MLRatingService
+from core.bootstrap import BootstrapService
+from core.batch_analysis import unpack_analysis
+from core.pgn import parse_headers
 from core.utils import normalize_engine_name, get_db_path
+from core.movecodec import decode_move, pack_moves, unpack_moves
+from data.eval_cache import EvalCache
+from data.pgn_codec import compress_pgn, decompress_pgn
+from data.pgn_export import write_pgns
+from data.pgn_import import file_fingerprint, parse_game, scan_games
+from data.positions import NO_MOVE, fen_key, game_ucis, index_game, position_rows
+from data.writer import GameWriter
+
+
+# Connection-level settings, applied once when a pooled connection is opened
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",    # durable at checkpoints; safe with WAL
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA cache_size=-16000",     # 16 MB page cache
+    "PRAGMA mmap_size=268435456",   # 256 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+)
+
+_GAMES_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        id                INTEGER PRIMARY KEY AUTOINCREMENT,
+        white_engine      TEXT    NOT NULL,
+        black_engine      TEXT    NOT NULL,
+        white_id          INTEGER REFERENCES engines(id),
+        black_id          INTEGER REFERENCES engines(id),
+        result            TEXT    NOT NULL,
+        reason            TEXT    NOT NULL,
+        date              TEXT    NOT NULL,
+        time              TEXT    NOT NULL,
+        move_count        INTEGER,
+        duration_seconds  INTEGER,
+        source            TEXT    DEFAULT 'regular',
+        opening           TEXT,
+        eco               TEXT
+    )
+'''
+
+_INSERT_GAME_SQL = '''
+    INSERT INTO games
+        (white_engine, black_engine, white_id, black_id, result, reason,
+         date, time, move_count, duration_seconds, source, opening, eco)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Rating models selectable for rankings and tournaments: key -> factory(db)
+RATING_MODELS = {
+    'elo':      EloService,
+    'davidson': lambda db: MLRatingService(db, draws=True),
+    'bt':       lambda db: MLRatingService(db, draws=False),
+}
+
+UNKNOWN_OPENING = "Unknown / No Opening"
+
+# One row per (engine, colour, opening); engine '' holds the all-engines total.
+# Losses are games - wins - draws, matching the original tag-scan counting.
+_BUMP_OPENING_SQL = '''
+    INSERT INTO opening_stats (engine, color, opening, games, wins, draws)
+    VALUES (?, ?, ?, 1, ?, ?)
+    ON CONFLICT (engine, color, opening) DO UPDATE SET
+        games = games + 1,
+        wins  = wins  + excluded.wins,
+        draws = draws + excluded.draws
+'''
+
+# One row per (white engine, black engine); kept up to date by
+# _insert_game and, for deleted / edited games, by triggers
+_H2H_UNCOUNT_OLD = '''
+    UPDATE head_to_head SET
+        white_wins = white_wins - (OLD.result = '1-0'),
+        draws      = draws      - (OLD.result = '1/2-1/2'),
+        black_wins = black_wins - (OLD.result = '0-1')
+    WHERE white_id = OLD.white_id AND black_id = OLD.black_id;
+'''
+_H2H_COUNT_NEW = '''
+    INSERT INTO head_to_head (white_id, black_id, white_wins, draws, black_wins)
+    SELECT NEW.white_id, NEW.black_id, NEW.result = '1-0',
+           NEW.result = '1/2-1/2', NEW.result = '0-1'
+    WHERE NEW.white_id IS NOT NULL AND NEW.black_id IS NOT NULL
+    ON CONFLICT (white_id, black_id) DO UPDATE SET
+        white_wins = white_wins + excluded.white_wins,
+        draws      = draws      + excluded.draws,
+        black_wins = black_wins + excluded.black_wins;
+'''
+_BUMP_HEAD_TO_HEAD_SQL = '''
+    INSERT INTO head_to_head (white_id, black_id, white_wins, draws, black_wins)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (white_id, black_id) DO UPDATE SET
+        white_wins = white_wins + excluded.white_wins,
+        draws      = draws      + excluded.draws,
+        black_wins = black_wins + excluded.black_wins
+'''
+
+_INSERT_PGN_SQL = ("INSERT INTO game_pgn (game_id, pgn, moves, positions_indexed) "
+                   "VALUES (?, ?, ?, ?)")
+
+_INSERT_POSITION_SQL = ("INSERT OR IGNORE INTO positions (hash, move, game_id, ply) "
+                        "VALUES (?, ?, ?, ?)")
+
+# One row per (position, move) played; a game counts once even if it
+# repeats the position
+_BUMP_EXPLORER_SQL = '''
+    INSERT INTO explorer_moves (hash, move, games, white_wins, draws, black_wins)
+    VALUES (?, ?, 1, ?, ?, ?)
+    ON CONFLICT (hash, move) DO UPDATE SET
+        games      = games      + 1,
+        white_wins = white_wins + excluded.white_wins,
+        draws      = draws      + excluded.draws,
+        black_wins = black_wins + excluded.black_wins
+'''
+
+_GAMES_LIST_SQL = '''
+    SELECT id, white_engine, black_engine, result, reason,
+           date, time, move_count, duration_seconds,
+           COALESCE(source, 'regular') as source
+    FROM games
+'''
+
+# Legacy rows may still carry their own PGN; newer ones point at game_pgn.
+# pgn comes back as stored (possibly compressed) — see decompress_pgn.
+_TOURNAMENT_GAMES_SQL = '''
+    SELECT tg.id, tg.game_id, tg.tournament_id, tg.tournament_name, tg.format,
+           tg.round_num, tg.white_engine, tg.black_engine, tg.result, tg.reason,
+           COALESCE(NULLIF(tg.pgn, ''), gp.pgn, '') AS pgn,
+           tg.move_count, tg.duration_sec, tg.opening, tg.date, tg.time,
+           gp.moves
+    FROM tournament_games tg
+    LEFT JOIN game_pgn gp ON gp.game_id = tg.game_id
+'''
+
+_TOURNAMENT_LIST_SQL = '''
+    SELECT tournament_id,
+           tournament_name,
+           format,
+           COUNT(*)  AS game_count,
+           MIN(date) AS date
+    FROM tournament_games
+    GROUP BY tournament_id
+    ORDER BY MAX(id) DESC
+'''
+
+_INSERT_TOURNAMENT_GAME_SQL = '''
+    INSERT INTO tournament_games
+        (game_id, tournament_id, tournament_name, format,
+         round_num, white_engine, black_engine, result, reason,
+         pgn, move_count, duration_sec, opening, date, time)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+# Full-text index over the searchable text of each game; rowid = games.id.
+# Contentless: searches only need rowids and bm25, so the indexed text is
+# not stored a second time.  prefix='2 3' keeps short type-ahead prefixes
+# off the slow path.
+_FTS_TABLE_SQL = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS games_fts USING fts5(
+        white, black, event, opening, reason, headers,
+        content  = '',
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix   = '2 3'
+    )
+'''
+
+_INSERT_FTS_SQL = '''
+    INSERT INTO games_fts (rowid, white, black, event, opening, reason, headers)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# bm25() column weights: engine names, event, opening, reason, other headers
+_FTS_RANK = "bm25(games_fts, 10.0, 10.0, 4.0, 6.0, 2.0, 1.0)"
+
+# Tags that already have their own games_fts column
+_FTS_OWN_TAGS = ('White', 'Black', 'Event', 'Opening')
+
+_FTS_WORD_RE    = re.compile(r'\w+')
+_OPENING_TAG_RE = re.compile(r'\[Opening\s+"([^"]+)"\]')
+_ECO_TAG_RE     = re.compile(r'\[ECO\s+"([A-E]\d\d)"\]')
+_ECO_RE         = re.compile(r'(?:^|;\s*)([A-E]\d\d)\s*$')
+
+
+def _like_escape(text):
+    """Escape LIKE wildcards so user input matches literally (ESCAPE '\\')."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _fts_query(text):
+    """
+    Turn free search text into an FTS5 MATCH expression in which every
+    word must match the start of a token (``stock 16`` finds
+    "Stockfish 16").  Returns '' when *text* holds no words.
+    """
+    return ' '.join(f'"{w}"*' for w in _FTS_WORD_RE.findall(text or ''))
+
+
+def _fts_row(game_id, white, black, reason, opening, pgn, event=None):
+    """Build the games_fts row for one game from its columns and PGN tags."""
+    tags   = parse_headers(pgn)
+    events = ' '.join(e for e in (tags.get('Event'), event) if e)
+    extra  = ' '.join(v for k, v in tags.items() if k not in _FTS_OWN_TAGS)
+    return (game_id, white, black, events, opening or '', reason or '', extra)
+
+
+def opening_from_pgn(pgn, fallback=None):
+    """
+    Return ``(opening, eco)`` for a PGN.
+
+    *opening* is the ``[Opening "..."]`` tag text exactly as written (or
+    *fallback*); *eco* comes from an ``[ECO]`` tag or a trailing ``; C67``
+    style code in the opening name.  Either may be None.
+    """
+    m = _OPENING_TAG_RE.search(pgn or '')
+    opening = m.group(1).strip() if m else (fallback or None)
+    m = _ECO_TAG_RE.search(pgn or '')
+    if m:
+        eco = m.group(1)
+    else:
+        m = _ECO_RE.search(opening or '')
+        eco = m.group(1) if m else None
+    return opening, eco
 
 
 class Database:
@@ -14,38 +248,294 @@ class Database:
     All engine names are normalised (color suffixes stripped) before
     storing or querying so that "Stockfish (White)" and "Stockfish (Black)"
     are treated as the same engine.
+
+    Connections are long-lived and pooled: each method borrows one for the
+    duration of a call and hands it back, so pragmas are applied once per
+    connection and sqlite3's per-connection statement cache is reused
+    across calls and threads.
     """
 
+    POOL_SIZE         = 4     # idle connections kept open
+    CACHED_STATEMENTS = 256   # prepared statements cached per connection
+
     def __init__(self, db_path=None):
         self.db_path = db_path or get_db_path()
+        self._pool   = queue.LifoQueue(maxsize=self.POOL_SIZE)
+        self._closed = False
+        self._lock   = threading.Lock()
+        self._writer = None
+        self._rating_services = {}
+        self._bootstraps      = {}
+        self._elo_history     = None
+        self._eval_cache      = None
+        self._engine_cache    = {}      # alias -> (engine id, canonical name)
+        self._binary_hashes   = {}      # (path, size, mtime) -> sha256
+        self.rating_model     = 'elo'   # RATING_MODELS key used by .ratings
+        self._fts    = False    # set by _create_tables when FTS5 is available
+        self._vacuum = False    # set by migrations that free a lot of pages
+        self._explorer_cache = OrderedDict()
+        self._explorer_epoch = 0    # bumped when old games join explorer_moves
         self._init_schema()
 
+    # ── Connections ───────────────────────────────────────
+
+    def _open_connection(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            check_same_thread=False,    # pooled; only one thread uses it at a time
+            cached_statements=self.CACHED_STATEMENTS,
+        )
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def _conn(self):
+        """
+        Borrow a pooled connection for one unit of work.
+
+        The block runs as a single transaction: it is committed when the
+        block exits normally and rolled back if it raises.
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._open_connection()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+                self._forget_engine_ids()
+            raise
+        finally:
+            conn.row_factory = None
+            with self._lock:
+                keep = not self._closed
+            if keep:
+                try:
+                    self._pool.put_nowait(conn)
+                except queue.Full:
+                    conn.close()
+            else:
+                conn.close()
+
+    def close(self):
+        """
+        Commit any queued write-behind games, then close every idle pooled
+        connection; connections in use close on return.
+        """
+        if self._writer is not None:
+            self._writer.close()
+        if self._eval_cache is not None:
+            self._eval_cache.flush()
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
     # ── Schema ────────────────────────────────────────────
 
+    # Bump SCHEMA_VERSION and append to _MIGRATIONS when the schema changes.
+    # PRAGMA user_version records the last migration applied to a file.
+    SCHEMA_VERSION = 9
+
     def _init_schema(self):
-        """Create the games and tournament_games tables if they do not exist yet."""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA journal_mode=WAL")
-        conn.execute("PRAGMA foreign_keys=ON")
+        """Create missing tables, apply pending migrations, then ensure indexes."""
+        with self._conn() as conn:
+            self._create_tables(conn)
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+        migrated = False
+        for target, migrate in self._migrations():
+            if version < target:
+                self._run_migration(migrate, target)
+                version  = target
+                migrated = True
+
+        with self._conn() as conn:
+            if self._vacuum:
+                conn.execute("VACUUM")
+                self._vacuum = False
+            self._create_indexes(conn)
+            # Fresh planner statistics after a rebuild; otherwise let SQLite
+            # decide whether any are stale
+            conn.execute("ANALYZE" if migrated else "PRAGMA optimize")
+
+    def _create_tables(self, conn):
+        # Engine registry: one row per canonical engine name.  Ids are
+        # dense (rows are never deleted) so rating code can index arrays
+        # with them; games.white_id / black_id reference them.
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS engines (
+                id           INTEGER PRIMARY KEY,
+                name         TEXT    NOT NULL UNIQUE,
+                path         TEXT,
+                binary_hash  TEXT,
+                version      TEXT
+            )
+        ''')
+        # Every spelling an engine was saved under (colour suffixes,
+        # renamed binaries) -> its engine id
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS engine_aliases (
+                alias      TEXT    PRIMARY KEY,
+                engine_id  INTEGER NOT NULL REFERENCES engines(id)
+            ) WITHOUT ROWID
+        ''')
+
+        # Main games table (regular + tournament games).  The PGN lives in
+        # game_pgn so scans over games only ever read the small hot columns.
+        # game_pgn.pgn holds compress_pgn() blobs (older files: plain text);
+        # moves is the pack_moves() list, NULL until first packed;
+        # positions_indexed is NULL until the game's positions are indexed.
+        conn.execute(_GAMES_TABLE_SQL.format(name='games'))
+
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS opening_stats (
+                engine   TEXT    NOT NULL,
+                color    TEXT    NOT NULL,
+                opening  TEXT    NOT NULL,
+                games    INTEGER NOT NULL DEFAULT 0,
+                wins     INTEGER NOT NULL DEFAULT 0,
+                draws    INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (engine, color, opening)
+            ) WITHOUT ROWID
+        ''')
+
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS game_pgn (
+                game_id  INTEGER PRIMARY KEY REFERENCES games(id) ON DELETE CASCADE,
+                pgn      BLOB    NOT NULL,
+                moves    BLOB,
+                positions_indexed INTEGER
+            )
+        ''')
+
+        # Every position reached in every game, keyed by its Zobrist hash
+        # (data/positions.py), with the move played from it (0 = none).
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS positions (
+                hash     INTEGER NOT NULL,
+                move     INTEGER NOT NULL,
+                game_id  INTEGER NOT NULL,
+                ply      INTEGER NOT NULL,
+                PRIMARY KEY (hash, move, game_id, ply)
+            ) WITHOUT ROWID
+        ''')
+
+        # Opening-explorer tree: result totals per (position, move),
+        # maintained alongside positions
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS explorer_moves (
+                hash        INTEGER NOT NULL,
+                move        INTEGER NOT NULL,
+                games       INTEGER NOT NULL DEFAULT 0,
+                white_wins  INTEGER NOT NULL DEFAULT 0,
+                draws       INTEGER NOT NULL DEFAULT 0,
+                black_wins  INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (hash, move)
+            ) WITHOUT ROWID
+        ''')
+
+        # Head-to-head results per ordered (white, black) engine pair —
+        # see get_crosstable
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS head_to_head (
+                white_id    INTEGER NOT NULL,
+                black_id    INTEGER NOT NULL,
+                white_wins  INTEGER NOT NULL DEFAULT 0,
+                draws       INTEGER NOT NULL DEFAULT 0,
+                black_wins  INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (white_id, black_id)
+            ) WITHOUT ROWID
+        ''')
+
+        # Engine analysis of every position of a game (core/batch_analysis.py):
+        # packed eval / best-move / move-quality arrays, one row per game
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS game_analysis (
+                game_id     INTEGER PRIMARY KEY REFERENCES games(id) ON DELETE CASCADE,
+                analyzer    TEXT    NOT NULL,
+                search      TEXT    NOT NULL,
+                evals       BLOB    NOT NULL,
+                best_moves  BLOB    NOT NULL,
+                quality     BLOB    NOT NULL,
+                date        TEXT    NOT NULL
+            )
+        ''')
+
+        # Analyzer results per position (data/eval_cache.py): hash is the
+        # positions-table Zobrist key, search the UCI limit ("depth 12"),
+        # cp White's POV and best_move a 16-bit move code (0 = none)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS eval_cache (
+                hash        INTEGER NOT NULL,
+                analyzer    TEXT    NOT NULL,
+                search      TEXT    NOT NULL,
+                cp          INTEGER NOT NULL,
+                score_type  TEXT    NOT NULL,
+                best_move   INTEGER NOT NULL,
+                PRIMARY KEY (hash, analyzer, search)
+            ) WITHOUT ROWID
+        ''')
+
+        # Progress of bulk PGN imports, one row per source file; offset is
+        # the file position after the last committed game
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS pgn_imports (
+                path         TEXT    PRIMARY KEY,
+                fingerprint  INTEGER NOT NULL,
+                offset       INTEGER NOT NULL DEFAULT 0,
+                games        INTEGER NOT NULL DEFAULT 0,
+                skipped      INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+        # Persisted rating-model state (core/elo.py EloService), one row
+        # per model: ratings as JSON, valid up to game last_id at the
+        # given games_revision
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS rating_snapshots (
+                name      TEXT    PRIMARY KEY,
+                last_id   INTEGER NOT NULL,
+                revision  INTEGER NOT NULL,
+                data      TEXT    NOT NULL
+            )
+        ''')
 
-        # Main games table (regular + tournament games)
+        # Per-engine Elo time series (core/elo.py EloHistory): packed
+        # arrays of game ids and ratings, valid as of the rating_snapshots
+        # row of the same name
         conn.execute('''
-            CREATE TABLE IF NOT EXISTS games (
-                id                INTEGER PRIMARY KEY AUTOINCREMENT,
-                white_engine      TEXT    NOT NULL,
-                black_engine      TEXT    NOT NULL,
-                result            TEXT    NOT NULL,
-                reason            TEXT    NOT NULL,
-                date              TEXT    NOT NULL,
-                time              TEXT    NOT NULL,
-                pgn               TEXT    NOT NULL,
-                move_count        INTEGER,
-                duration_seconds  INTEGER,
-                source            TEXT    DEFAULT 'regular'
+            CREATE TABLE IF NOT EXISTS rating_series (
+                name      TEXT    NOT NULL,
+                engine    TEXT    NOT NULL,
+                game_ids  BLOB    NOT NULL,
+                ratings   BLOB    NOT NULL,
+                PRIMARY KEY (name, engine)
             )
         ''')
 
-        # Tournament-specific metadata table
+        # Bumped by triggers (see _create_indexes) whenever existing games
+        # are deleted or their players / result change, so cached ratings
+        # know a full recompute is due
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS games_revision (
+                id        INTEGER PRIMARY KEY CHECK (id = 1),
+                revision  INTEGER NOT NULL
+            )
+        ''')
+        conn.execute("INSERT OR IGNORE INTO games_revision (id, revision) VALUES (1, 0)")
+
+        # Tournament-specific metadata table.  pgn is '' — the text is held
+        # once, in game_pgn, under the same game_id.
         conn.execute('''
             CREATE TABLE IF NOT EXISTS tournament_games (
                 id              INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -67,222 +557,1168 @@ class Database:
             )
         ''')
 
+        # Search index; SQLite builds without FTS5 fall back to LIKE scans
+        try:
+            conn.execute(_FTS_TABLE_SQL)
+            self._fts = True
+        except sqlite3.OperationalError as e:
+            print(f"[Database] full-text search unavailable: {e}")
+            self._fts = False
+
         # Add 'source' column to existing games table if missing (migration)
         try:
             conn.execute("ALTER TABLE games ADD COLUMN source TEXT DEFAULT 'regular'")
         except sqlite3.OperationalError:
             pass  # Column already exists
 
-        conn.commit()
-        conn.close()
+    def _create_indexes(self, conn):
+        # Covering indexes for per-engine aggregates (get_engine_stats) and
+        # engine / result filters
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_games_white_result "
+                     "ON games(white_engine, result, black_engine)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_games_black_result "
+                     "ON games(black_engine, result, white_engine)")
+        # Per-pair result totals for the rating models (get_pair_results)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_games_pair "
+                     "ON games(white_id, black_id, result)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_games_source "
+                     "ON games(source)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_games_result "
+                     "ON games(result)")
+        # Single-column indexes end in the rowid, so "col = ? AND id < ?"
+        # seeks straight to the next history page (get_games_page)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_games_white "
+                     "ON games(white_engine)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_games_black "
+                     "ON games(black_engine)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_games_date "
+                     "ON games(date)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_games_eco "
+                     "ON games(eco)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tgames_tournament "
+                     "ON tournament_games(tournament_id, tournament_name, format, date)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tgames_game "
+                     "ON tournament_games(game_id)")
+        # Shrinks to nothing once backfill_positions has run
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_game_pgn_unindexed "
+                     "ON game_pgn(game_id) WHERE positions_indexed IS NULL")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_opening_stats_top "
+                     "ON opening_stats(engine, color, games)")
+        # Created here, after migrations, because table rebuilds drop them
+        conn.execute("CREATE TRIGGER IF NOT EXISTS trg_games_revision_delete "
+                     "AFTER DELETE ON games BEGIN "
+                     "UPDATE games_revision SET revision = revision + 1; END")
+        conn.execute("CREATE TRIGGER IF NOT EXISTS trg_games_revision_update "
+                     "AFTER UPDATE OF white_engine, black_engine, result ON games BEGIN "
+                     "UPDATE games_revision SET revision = revision + 1; END")
+        # Inserts are counted by _insert_game; these take back a deleted
+        # or edited game's old result
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_head_to_head_delete "
+                     f"AFTER DELETE ON games BEGIN {_H2H_UNCOUNT_OLD} END")
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_head_to_head_update "
+                     f"AFTER UPDATE OF white_id, black_id, result ON games BEGIN "
+                     f"{_H2H_UNCOUNT_OLD} {_H2H_COUNT_NEW} END")
+
+    # ── Migrations ────────────────────────────────────────
+
+    def _migrations(self):
+        """Ordered (version, method) pairs; each runs once per database file."""
+        return [
+            (1, self._migrate_pgn_out_of_games),
+            (2, self._migrate_opening_columns),
+            (3, self._migrate_fts_index),
+            (4, self._migrate_compress_pgn),
+            (5, self._migrate_move_lists),
+            (6, self._migrate_positions_column),
+            (7, self._migrate_explorer_moves),
+            (8, self._migrate_engine_ids),
+            (9, self._migrate_head_to_head),
+        ]
+
+    def _run_migration(self, migrate, target):
+        """
+        Run one migration in its own transaction with foreign keys disabled
+        (table rebuilds must not cascade), then record *target*.
+        """
+        with self._conn() as conn:
+            conn.execute("PRAGMA foreign_keys=OFF")
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                migrate(conn)
+                conn.execute(f"PRAGMA user_version = {int(target)}")
+                conn.commit()
+            except BaseException:
+                # The PRAGMA below is a no-op inside an open transaction
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                conn.execute("PRAGMA foreign_keys=ON")
+        print(f"[Database] schema migrated to v{target}")
+
+    def _migrate_pgn_out_of_games(self, conn):
+        """v1 — move PGN text from games / tournament_games into game_pgn."""
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(games)")]
+        if 'pgn' in cols:
+            conn.execute("INSERT OR IGNORE INTO game_pgn (game_id, pgn) "
+                         "SELECT id, pgn FROM games")
+            seq = conn.execute("SELECT seq FROM sqlite_sequence "
+                               "WHERE name = 'games'").fetchone()
+            conn.execute(_GAMES_TABLE_SQL.format(name='games_new'))
+            conn.execute('''
+                INSERT INTO games_new
+                    (id, white_engine, black_engine, result, reason, date, time,
+                     move_count, duration_seconds, source)
+                SELECT id, white_engine, black_engine, result, reason, date, time,
+                       move_count, duration_seconds, COALESCE(source, 'regular')
+                FROM games
+            ''')
+            conn.execute("DROP TABLE games")
+            conn.execute("ALTER TABLE games_new RENAME TO games")
+            if seq:
+                # Never hand out ids of games that were deleted before the rebuild
+                conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) "
+                             "WHERE name = 'games'", (seq[0],))
+        conn.execute('''
+            UPDATE tournament_games SET pgn = ''
+            WHERE pgn != ''
+              AND pgn = (SELECT gp.pgn FROM game_pgn gp
+                         WHERE gp.game_id = tournament_games.game_id)
+        ''')
+
+    def _migrate_opening_columns(self, conn):
+        """v2 — add games.opening / games.eco, backfill them, build opening_stats."""
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(games)")]
+        for col in ('opening', 'eco'):
+            if col not in cols:
+                conn.execute(f"ALTER TABLE games ADD COLUMN {col} TEXT")
+
+        cursor = conn.execute("SELECT game_id, pgn FROM game_pgn")
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            conn.executemany(
+                "UPDATE games SET opening = ?, eco = ? WHERE id = ?",
+                [(*opening_from_pgn(decompress_pgn(pgn)), gid)
+                 for gid, pgn in rows])
+
+        conn.execute("DELETE FROM opening_stats")
+        self._rebuild_opening_stats(conn)
+
+    def _migrate_fts_index(self, conn):
+        """v3 — fill games_fts from existing games, PGN tags and tournament names."""
+        if not self._fts:
+            return
+        conn.execute("INSERT INTO games_fts (games_fts) VALUES ('delete-all')")
+        cursor = conn.execute('''
+            SELECT g.id, g.white_engine, g.black_engine, g.reason, g.opening,
+                   gp.pgn,
+                   (SELECT tg.tournament_name FROM tournament_games tg
+                    WHERE tg.game_id = g.id LIMIT 1)
+            FROM games g
+            LEFT JOIN game_pgn gp ON gp.game_id = g.id
+        ''')
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            conn.executemany(_INSERT_FTS_SQL, [
+                _fts_row(gid, white, black, reason, opening,
+                         decompress_pgn(pgn), event)
+                for gid, white, black, reason, opening, pgn, event in rows])
+        # Merge the b-tree segments written by the backfill into one
+        conn.execute("INSERT INTO games_fts (games_fts) VALUES ('optimize')")
+
+    def _migrate_compress_pgn(self, conn):
+        """
+        v4 — compress game_pgn text, drop the PGN copies still held by
+        tournament_games (they differ from the game's copy only by its
+        missing Opening tag) and make games_fts contentless.
+        """
+        cursor = conn.execute("SELECT game_id, pgn FROM game_pgn "
+                              "WHERE typeof(pgn) = 'text'")
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            conn.executemany("UPDATE game_pgn SET pgn = ? WHERE game_id = ?",
+                             [(compress_pgn(pgn), gid) for gid, pgn in rows])
+        conn.execute('''
+            UPDATE tournament_games SET pgn = ''
+            WHERE pgn != ''
+              AND game_id IN (SELECT game_id FROM game_pgn)
+        ''')
+        # A v3 index that still stores its own copy of the text is rebuilt
+        # contentless
+        if self._fts:
+            sql = conn.execute("SELECT sql FROM sqlite_master "
+                               "WHERE name = 'games_fts'").fetchone()[0]
+            if "content" not in sql:
+                conn.execute("DROP TABLE games_fts")
+                conn.execute(_FTS_TABLE_SQL)
+                self._migrate_fts_index(conn)
+        self._vacuum = True
+
+    def _migrate_move_lists(self, conn):
+        """
+        v5 — add game_pgn.moves.  Existing games are packed by
+        backfill_positions.
+        """
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(game_pgn)")]
+        if 'moves' not in cols:
+            conn.execute("ALTER TABLE game_pgn ADD COLUMN moves BLOB")
+
+    def _migrate_positions_column(self, conn):
+        """
+        v6 — add game_pgn.positions_indexed.  Existing games are indexed
+        by backfill_positions, which is too slow to run at startup.
+        """
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(game_pgn)")]
+        if 'positions_indexed' not in cols:
+            conn.execute("ALTER TABLE game_pgn ADD COLUMN positions_indexed INTEGER")
+
+    def _migrate_explorer_moves(self, conn):
+        """v7 — build explorer_moves from the positions indexed so far."""
+        conn.execute("DELETE FROM explorer_moves")
+        conn.execute('''
+            INSERT INTO explorer_moves (hash, move, games, white_wins, draws, black_wins)
+            SELECT p.hash, p.move, COUNT(*),
+                   SUM(g.result = '1-0'), SUM(g.result = '1/2-1/2'),
+                   SUM(g.result = '0-1')
+            FROM (SELECT DISTINCT hash, move, game_id FROM positions
+                  WHERE move != ?) p
+            JOIN games g ON g.id = p.game_id
+            GROUP BY p.hash, p.move
+        ''', (NO_MOVE,))
+
+    def _migrate_engine_ids(self, conn):
+        """
+        v8 — register every engine in games (ids in order of first game),
+        store canonical names and fill games.white_id / black_id.
+        """
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(games)")]
+        for col in ('white_id', 'black_id'):
+            if col not in cols:
+                conn.execute(f"ALTER TABLE games ADD COLUMN {col} "
+                             f"INTEGER REFERENCES engines(id)")
+
+        # Rows saved before names were normalised on insert
+        raw = [r[0] for r in conn.execute(
+            "SELECT white_engine FROM games UNION SELECT black_engine FROM games")]
+        renamed = [(normalize_engine_name(n), n) for n in raw
+                   if normalize_engine_name(n) != n]
+        for col in ('white_engine', 'black_engine'):
+            conn.executemany(f"UPDATE games SET {col} = ? WHERE {col} = ?", renamed)
+        if renamed:
+            conn.execute("DELETE FROM opening_stats")
+            self._rebuild_opening_stats(conn)
+
+        conn.execute('''
+            INSERT OR IGNORE INTO engines (name)
+            SELECT name FROM (
+                SELECT white_engine AS name, MIN(id) AS first FROM games GROUP BY 1
+                UNION ALL
+                SELECT black_engine, MIN(id) FROM games GROUP BY 1
+            )
+            GROUP BY name ORDER BY MIN(first)
+        ''')
+        conn.execute("INSERT OR IGNORE INTO engine_aliases (alias, engine_id) "
+                     "SELECT name, id FROM engines")
+        conn.executemany(
+            "INSERT OR IGNORE INTO engine_aliases (alias, engine_id) "
+            "SELECT ?, id FROM engines WHERE name = ?",
+            [(n, canon) for canon, n in renamed])
+        conn.execute('''
+            UPDATE games SET
+                white_id = (SELECT id FROM engines WHERE name = white_engine),
+                black_id = (SELECT id FROM engines WHERE name = black_engine)
+        ''')
+
+    def _migrate_head_to_head(self, conn):
+        """v9 — build head_to_head from the games table."""
+        conn.execute("DELETE FROM head_to_head")
+        conn.execute('''
+            INSERT INTO head_to_head (white_id, black_id, white_wins, draws, black_wins)
+            SELECT white_id, black_id, SUM(result = '1-0'),
+                   SUM(result = '1/2-1/2'), SUM(result = '0-1')
+            FROM games
+            WHERE white_id IS NOT NULL AND black_id IS NOT NULL
+            GROUP BY white_id, black_id
+        ''')
+
+    @staticmethod
+    def _rebuild_opening_stats(conn):
+        """Recompute opening_stats from the games table in one statement."""
+        conn.execute(f'''
+            INSERT INTO opening_stats (engine, color, opening, games, wins, draws)
+            SELECT engine, color, opening, COUNT(*), SUM(win), SUM(draw)
+            FROM (
+                SELECT white_engine AS engine, 'w' AS color,
+                       COALESCE(opening, '{UNKNOWN_OPENING}') AS opening,
+                       result = '1-0' AS win, result = '1/2-1/2' AS draw
+                FROM games
+                UNION ALL
+                SELECT black_engine, 'b', COALESCE(opening, '{UNKNOWN_OPENING}'),
+                       result = '0-1', result = '1/2-1/2'
+                FROM games
+                UNION ALL
+                SELECT '', 'w', COALESCE(opening, '{UNKNOWN_OPENING}'),
+                       result = '1-0', result = '1/2-1/2'
+                FROM games
+                UNION ALL
+                SELECT '', 'b', COALESCE(opening, '{UNKNOWN_OPENING}'),
+                       result = '0-1', result = '1/2-1/2'
+                FROM games
+            )
+            GROUP BY engine, color, opening
+        ''')
+
+    def explain_query_plans(self):
+        """
+        Run ``EXPLAIN QUERY PLAN`` for the filtered public queries.
+
+        Returns
+        -------
+        dict  query name -> list of plan detail strings.  A query whose plan
+        contains a bare ``SCAN games`` / ``SCAN tournament_games`` step
+        (no index) is listed under the ``'_unindexed'`` key.
+        """
+        probes = {
+            'get_engine_stats':      (self._ENGINE_STATS_SQL.format(
+                                          order_expr='engine', direction='ASC'),
+                                      ('x', 'x', -1, 0)),
+            'get_all_games(engine)': (_GAMES_LIST_SQL + " WHERE (white_engine = ? "
+                                      "OR black_engine = ?) ORDER BY id DESC",
+                                      ('x', 'x')),
+            'get_all_games(source)': (_GAMES_LIST_SQL + " WHERE source = ? "
+                                      "ORDER BY id DESC", ('tournament',)),
+            'get_games_page(engine)': (_GAMES_LIST_SQL + " WHERE (white_engine = ? OR "
+                                       "black_engine = ?) AND id < ? ORDER BY id DESC "
+                                       "LIMIT ?", ('x', 'x', 10**9, 100)),
+            'get_games_page(result)': (_GAMES_LIST_SQL + " WHERE result = ? AND id < ? "
+                                       "ORDER BY id DESC LIMIT ?", ('1-0', 10**9, 100)),
+            'get_game_pgn':          ("SELECT pgn FROM game_pgn WHERE game_id = ?", (1,)),
+            'get_tournament_games':  (_TOURNAMENT_GAMES_SQL + " WHERE tg.tournament_id = ? "
+                                      "ORDER BY tg.id ASC", ('x',)),
+            'get_opening_stats':     ("SELECT opening, games, wins, draws FROM opening_stats "
+                                      "WHERE engine = ? AND color = ? ORDER BY games DESC, "
+                                      "opening LIMIT ?", ('x', 'w', 10)),
+            'get_tournament_list':   (_TOURNAMENT_LIST_SQL, ()),
+            'iter_game_pgns':        ("SELECT g.id, g.result, gp.pgn FROM games g "
+                                      "JOIN game_pgn gp ON gp.game_id = g.id "
+                                      "WHERE g.id > ? ORDER BY g.id LIMIT ?", (0, 500)),
+            'explore_position':      ("SELECT move, games, white_wins, draws, black_wins "
+                                      "FROM explorer_moves WHERE hash = ? ORDER BY games DESC",
+                                      (0,)),
+            'find_games_by_position': (_GAMES_LIST_SQL + " WHERE id IN (SELECT game_id "
+                                       "FROM positions WHERE hash = ?) ORDER BY id DESC "
+                                       "LIMIT ?", (0, 200)),
+        }
+        if self._fts:
+            probes['get_games_page(search)'] = (
+                _GAMES_LIST_SQL + " WHERE id IN (SELECT rowid FROM games_fts "
+                "WHERE games_fts MATCH ?) AND id < ? ORDER BY id DESC LIMIT ?",
+                ('"x"*', 10**9, 100))
+        plans, unindexed = {}, []
+        with self._conn() as conn:
+            for name, (sql, params) in probes.items():
+                detail = [r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+                plans[name] = detail
+                if any(d in ('SCAN games', 'SCAN tournament_games') or
+                       d.startswith(('SCAN games ', 'SCAN tournament_games '))
+                       and 'INDEX' not in d for d in detail):
+                    unindexed.append(name)
+        plans['_unindexed'] = unindexed
+        return plans
 
     # ── Write ─────────────────────────────────────────────
 
+    @staticmethod
+    def _timestamp():
+        now = datetime.now()
+        return now.strftime("%Y.%m.%d"), now.strftime("%H:%M:%S")
+
+    def _insert_game(self, conn, white_name, black_name, result, reason,
+                     pgn, move_count, duration_sec, source, date_str, time_str,
+                     opening=None, event=None, moves=None, keys=None):
+        """
+        Insert one game on *conn* — the games row, its PGN and packed move
+        list, its positions, its search index entry and its opening_stats
+        contribution — and return the new id.  *event* (e.g. the tournament name) is
+        indexed alongside the PGN's Event tag; *moves* is the game's UCI
+        move list, when the caller has it, and *keys* its precomputed
+        ``position_keys``.
+        """
+        white_id, white = self._resolve_engine(conn, white_name)
+        black_id, black = self._resolve_engine(conn, black_name)
+        opening, eco = opening_from_pgn(pgn, fallback=opening)
+        cursor = conn.execute(_INSERT_GAME_SQL, (
+            white, black, white_id, black_id,
+            result, reason,
+            date_str, time_str,
+            move_count, duration_sec,
+            source, opening, eco,
+        ))
+        conn.execute(_INSERT_PGN_SQL, (
+            cursor.lastrowid, compress_pgn(pgn),
+            pack_moves(moves) if moves is not None else None,
+            1 if moves is not None else None))
+        if moves is not None:
+            self._index_positions(
+                conn, position_rows(cursor.lastrowid, moves, keys), result)
+        if self._fts:
+            conn.execute(_INSERT_FTS_SQL, _fts_row(
+                cursor.lastrowid, white, black, reason, opening, pgn, event))
+
+        key  = opening or UNKNOWN_OPENING
+        draw = result == '1/2-1/2'
+        conn.execute(_BUMP_HEAD_TO_HEAD_SQL, (
+            white_id, black_id, result == '1-0', draw, result == '0-1'))
+        conn.executemany(_BUMP_OPENING_SQL, [
+            (white, 'w', key, result == '1-0', draw),
+            (black, 'b', key, result == '0-1', draw),
+            ('',    'w', key, result == '1-0', draw),
+            ('',    'b', key, result == '0-1', draw),
+        ])
+        return cursor.lastrowid
+
+    def _forget_engine_ids(self):
+        """
+        Drop the cached engine ids after a rollback: an id read back in the
+        transaction that registered it no longer exists.
+        """
+        self._engine_cache.clear()
+
+    def _resolve_engine(self, conn, name):
+        """
+        ``(id, canonical name)`` of the engine saved as *name* (any alias),
+        registering it on *conn* if it is new.
+        """
+        hit = self._engine_cache.get(name)
+        if hit is not None:
+            return hit
+        row = conn.execute("SELECT e.id, e.name FROM engine_aliases a "
+                           "JOIN engines e ON e.id = a.engine_id "
+                           "WHERE a.alias = ?", (name,)).fetchone()
+        if row is not None:
+            self._engine_cache[name] = row = tuple(row)
+            return row
+        # Not cached: the transaction registering it may still roll back
+        canon = normalize_engine_name(name)
+        row = conn.execute("SELECT id FROM engines WHERE name = ?", (canon,)).fetchone()
+        engine_id = row[0] if row else conn.execute(
+            "INSERT INTO engines (name) VALUES (?)", (canon,)).lastrowid
+        conn.executemany("INSERT OR IGNORE INTO engine_aliases (alias, engine_id) "
+                         "VALUES (?, ?)", [(name, engine_id), (canon, engine_id)])
+        return engine_id, canon
+
+    @staticmethod
+    def _index_positions(conn, rows, result):
+        """Insert one game's position rows and add it to explorer_moves."""
+        conn.executemany(_INSERT_POSITION_SQL, rows)
+        played = {(h, m) for h, m, _, _ in rows if m != NO_MOVE}
+        ww, dd, bw = result == '1-0', result == '1/2-1/2', result == '0-1'
+        conn.executemany(_BUMP_EXPLORER_SQL,
+                         [(h, m, ww, dd, bw) for h, m in played])
+
     def save_game(self, white_name, black_name, result, reason,
-                  pgn, move_count, duration_sec, source='regular'):
+                  pgn, move_count, duration_sec, source='regular', moves=None):
         """Save a game to the games table. Returns the new row id, or None on error."""
         try:
-            conn   = sqlite3.connect(self.db_path)
-            conn.execute("PRAGMA journal_mode=WAL")
-            cursor = conn.cursor()
-            date_str = datetime.now().strftime("%Y.%m.%d")
-            time_str = datetime.now().strftime("%H:%M:%S")
-            cursor.execute('''
-                INSERT INTO games
-                    (white_engine, black_engine, result, reason,
-                     date, time, pgn, move_count, duration_seconds, source)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                normalize_engine_name(white_name),
-                normalize_engine_name(black_name),
-                result, reason,
-                date_str, time_str,
-                pgn, move_count, duration_sec,
-                source,
-            ))
-            conn.commit()
-            game_id = cursor.lastrowid
-            conn.close()
-            return game_id
+            date_str, time_str = self._timestamp()
+            with self._conn() as conn:
+                return self._insert_game(
+                    conn, white_name, black_name, result, reason,
+                    pgn, move_count, duration_sec, source, date_str, time_str,
+                    moves=moves)
         except Exception as e:
             print(f"[Database] save_game error: {e}")
             return None
 
+    def _insert_tournament_game(self, conn, tournament_id, tournament_name,
+                                fmt, round_num, white_name, black_name, result,
+                                reason, pgn, move_count, duration_sec, opening,
+                                date_str, time_str, moves=None):
+        """Insert a tournament game and its metadata row on *conn*; return both ids."""
+        game_id = self._insert_game(
+            conn, white_name, black_name, result, reason,
+            pgn, move_count, duration_sec, 'tournament',
+            date_str, time_str, opening=opening, event=tournament_name,
+            moves=moves)
+        cursor = conn.execute(_INSERT_TOURNAMENT_GAME_SQL, (
+            game_id,
+            tournament_id,
+            tournament_name,
+            fmt,
+            round_num,
+            self._resolve_engine(conn, white_name)[1],
+            self._resolve_engine(conn, black_name)[1],
+            result,
+            reason,
+            '',             # text is stored once, in game_pgn
+            move_count,
+            duration_sec,
+            opening or '',
+            date_str,
+            time_str,
+        ))
+        return game_id, cursor.lastrowid
+
     def save_tournament_game(self, tournament_id, tournament_name, fmt,
                              round_num, white_name, black_name, result,
                              reason, pgn, move_count, duration_sec,
-                             opening=None):
-        try:
-            # 1. Save to main games table so Elo / stats pick it up
-            game_id = self.save_game(
-                white_name   = white_name,
-                black_name   = black_name,
-                result       = result,
-                reason       = reason,
-                pgn          = pgn,
-                move_count   = move_count,
-                duration_sec = duration_sec,
-                source       = 'tournament',
-            )
-            if game_id is None:
-                return None, None
-
-            # 2. Save tournament metadata
-            conn   = sqlite3.connect(self.db_path)
-            conn.execute("PRAGMA journal_mode=WAL")
-            cursor = conn.cursor()
-            now      = datetime.now()
-            date_str = now.strftime("%Y.%m.%d")
-            time_str = now.strftime("%H:%M:%S")
-            cursor.execute('''
-                INSERT INTO tournament_games
-                    (game_id, tournament_id, tournament_name, format,
-                     round_num, white_engine, black_engine, result, reason,
-                     pgn, move_count, duration_sec, opening, date, time)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                game_id,
-                tournament_id,
-                tournament_name,
-                fmt,
-                round_num,
-                normalize_engine_name(white_name),
-                normalize_engine_name(black_name),
-                result,
-                reason,
-                pgn,
-                move_count,
-                duration_sec,
-                opening or '',
-                date_str,
-                time_str,
-            ))
-            conn.commit()
-            t_game_id = cursor.lastrowid
-            conn.close()
-            return game_id, t_game_id
+                             opening=None, moves=None):
+        """
+        Save a tournament game to games (so Elo / stats pick it up) and its
+        metadata to tournament_games, in one transaction.
 
+        Returns
+        -------
+        (game_id, tournament_game_id) | (None, None) on error
+        """
+        try:
+            date_str, time_str = self._timestamp()
+            with self._conn() as conn:
+                return self._insert_tournament_game(
+                    conn, tournament_id, tournament_name, fmt, round_num,
+                    white_name, black_name, result, reason, pgn,
+                    move_count, duration_sec, opening, date_str, time_str,
+                    moves=moves)
         except Exception as e:
             print(f"[Database] save_tournament_game error: {e}")
             return None, None
 
+    @property
+    def writer(self):
+        """
+        The shared write-behind ``GameWriter`` for this database, started
+        on first use.  Prefer it over the synchronous ``save_*`` methods
+        wherever the caller runs on the UI thread.
+        """
+        with self._lock:
+            if self._writer is None:
+                self._writer = GameWriter(self)
+            return self._writer
+
+    def flush_writes(self, timeout=None):
+        """Block until every queued write-behind game is committed."""
+        writer = self._writer
+        return writer.flush(timeout) if writer is not None else True
+
+    # ── Engine registry ───────────────────────────────────
+
+    def register_engine(self, name, path=None, version=None):
+        """
+        Register the engine saved as *name* (created if new) and record
+        its binary — path, SHA-256 of the file — and version when given.
+
+        Returns the engine id, or None on error.
+        """
+        try:
+            binary_hash = self._binary_hash(path) if path else None
+            with self._conn() as conn:
+                engine_id, _ = self._resolve_engine(conn, name)
+                conn.execute(
+                    "UPDATE engines SET path = COALESCE(?, path), "
+                    "binary_hash = COALESCE(?, binary_hash), "
+                    "version = COALESCE(?, version) WHERE id = ?",
+                    (path, binary_hash, version, engine_id))
+            return engine_id
+        except Exception as e:
+            print(f"[Database] register_engine error: {e}")
+            return None
+
+    def _binary_hash(self, path):
+        # Hashing a large binary takes a while; redo it only when it changed
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        digest = self._binary_hashes.get(key)
+        if digest is None:
+            h = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    h.update(chunk)
+            digest = self._binary_hashes[key] = h.hexdigest()
+        return digest
+
+    def add_engine_alias(self, alias, engine_name):
+        """
+        Save future games played under *alias* as *engine_name*.  Returns
+        False when *engine_name* is unknown or *alias* is already taken.
+        """
+        try:
+            with self._conn() as conn:
+                row = conn.execute("SELECT id FROM engines WHERE name = ?",
+                                   (normalize_engine_name(engine_name),)).fetchone()
+                if row is None:
+                    return False
+                cur = conn.execute("INSERT OR IGNORE INTO engine_aliases "
+                                   "(alias, engine_id) VALUES (?, ?)", (alias, row[0]))
+                return cur.rowcount == 1
+        except Exception as e:
+            print(f"[Database] add_engine_alias error: {e}")
+            return False
+
+    def get_engines(self):
+        """
+        Every registered engine, by id.
+
+        Returns
+        -------
+        list of dict {id, name, path, binary_hash, version, aliases}
+        """
+        try:
+            with self._conn() as conn:
+                rows = conn.execute("SELECT id, name, path, binary_hash, version "
+                                    "FROM engines ORDER BY id").fetchall()
+                aliases = {}
+                for alias, engine_id in conn.execute(
+                        "SELECT alias, engine_id FROM engine_aliases ORDER BY alias"):
+                    aliases.setdefault(engine_id, []).append(alias)
+            return [{'id': r[0], 'name': r[1], 'path': r[2], 'binary_hash': r[3],
+                     'version': r[4], 'aliases': aliases.get(r[0], [])}
+                    for r in rows]
+        except Exception as e:
+            print(f"[Database] get_engines error: {e}")
+            return []
+
+    def engine_names(self):
+        """Canonical names indexed by engine id (index 0 is None)."""
+        try:
+            with self._conn() as conn:
+                rows = conn.execute("SELECT id, name FROM engines").fetchall()
+        except Exception as e:
+            print(f"[Database] engine_names error: {e}")
+            return [None]
+        names = [None] * (max((r[0] for r in rows), default=0) + 1)
+        for engine_id, name in rows:
+            names[engine_id] = name
+        return names
+
     # ── Read ──────────────────────────────────────────────
 
     def get_all_games_for_elo(self):
         try:
-            conn   = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT white_engine, black_engine, result "
-                "FROM games ORDER BY id ASC")
-            rows = cursor.fetchall()
-            conn.close()
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT white_engine, black_engine, result "
+                    "FROM games ORDER BY id ASC")
+                rows = cursor.fetchall()
             return rows
         except Exception as e:
             print(f"[Database] get_all_games_for_elo error: {e}")
             return []
 
-    def get_engine_stats(self, search_query=''):
+    def get_games_for_ratings(self, after_id=0):
+        """``(id, white_id, black_id, result)`` of every game after *after_id*,
+        oldest first — engine ids index ``engine_names()``."""
         try:
-            conn   = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._conn() as conn:
+                return conn.execute(
+                    "SELECT id, white_id, black_id, result "
+                    "FROM games WHERE id > ? ORDER BY id ASC", (after_id,)).fetchall()
+        except Exception as e:
+            print(f"[Database] get_games_for_ratings error: {e}")
+            return []
 
-            cursor.execute('SELECT DISTINCT white_engine FROM games')
-            whites = {normalize_engine_name(r[0]) for r in cursor.fetchall()}
-            cursor.execute('SELECT DISTINCT black_engine FROM games')
-            blacks = {normalize_engine_name(r[0]) for r in cursor.fetchall()}
-            engines = sorted(whites | blacks)
+    def get_crosstable(self, engines=None):
+        """
+        Head-to-head results between *engines* (names; None = all) from
+        the maintained head_to_head table — one indexed read, not one
+        query per pair.
 
-            if search_query:
-                q = search_query.lower()
-                engines = [e for e in engines if q in e.lower()]
+        Returns
+        -------
+        dict {(a, b): {'w': (wins, draws, losses), 'b': (wins, draws, losses)}}
+        — a's results against b with white ('w') and with black ('b'), for
+        every ordered pair that has played.
+        """
+        try:
+            with self._conn() as conn:
+                if engines is None:
+                    rows = conn.execute(
+                        "SELECT white_id, black_id, white_wins, draws, black_wins "
+                        "FROM head_to_head").fetchall()
+                else:
+                    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _xt_ids "
+                                 "(id INTEGER PRIMARY KEY)")
+                    conn.execute("DELETE FROM _xt_ids")
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO _xt_ids (id) "
+                        "SELECT id FROM engines WHERE name = ?",
+                        [(normalize_engine_name(e),) for e in engines])
+                    rows = conn.execute(
+                        "SELECT h.white_id, h.black_id, h.white_wins, h.draws, h.black_wins "
+                        "FROM _xt_ids w JOIN head_to_head h ON h.white_id = w.id "
+                        "WHERE h.black_id IN (SELECT id FROM _xt_ids)").fetchall()
+                    conn.execute("DELETE FROM _xt_ids")
+        except Exception as e:
+            print(f"[Database] get_crosstable error: {e}")
+            return {}
+        names = self.engine_names()
+        table = {}
+        empty = (0, 0, 0)
+        for white_id, black_id, ww, d, bw in rows:
+            if white_id == black_id or not (ww or d or bw):
+                continue
+            white, black = names[white_id], names[black_id]
+            cell = table.setdefault((white, black), {'w': empty, 'b': empty})
+            cell['w'] = (ww, d, bw)
+            cell = table.setdefault((black, white), {'w': empty, 'b': empty})
+            cell['b'] = (bw, d, ww)
+        return table
 
-            stats = []
-            for engine in engines:
-                cursor.execute(
-                    'SELECT COUNT(*) FROM games '
-                    'WHERE white_engine = ? OR black_engine = ?',
-                    (engine, engine))
-                matches = cursor.fetchone()[0]
+    def get_games_watermark(self):
+        """``(max game id, games revision)`` — both O(1) to read."""
+        with self._conn() as conn:
+            max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM games").fetchone()[0]
+            rev    = conn.execute("SELECT revision FROM games_revision").fetchone()
+        return max_id, rev[0] if rev else 0
 
-                cursor.execute(
-                    "SELECT COUNT(*) FROM games "
-                    "WHERE white_engine = ? AND result = '1-0'",
-                    (engine,))
-                wins_white = cursor.fetchone()[0]
+    def load_rating_snapshot(self, name):
+        """``(last_id, revision, data)`` saved under *name*, or None."""
+        try:
+            with self._conn() as conn:
+                row = conn.execute("SELECT last_id, revision, data FROM rating_snapshots "
+                                   "WHERE name = ?", (name,)).fetchone()
+            return (row[0], row[1], json.loads(row[2])) if row else None
+        except Exception as e:
+            print(f"[Database] load_rating_snapshot error: {e}")
+            return None
 
-                cursor.execute(
-                    "SELECT COUNT(*) FROM games "
-                    "WHERE black_engine = ? AND result = '0-1'",
-                    (engine,))
-                wins_black = cursor.fetchone()[0]
+    def save_rating_snapshot(self, name, last_id, revision, data):
+        """Persist a rating model's state (*data* must be JSON-serialisable)."""
+        try:
+            with self._conn() as conn:
+                conn.execute("INSERT OR REPLACE INTO rating_snapshots "
+                             "(name, last_id, revision, data) VALUES (?, ?, ?, ?)",
+                             (name, last_id, revision, json.dumps(data)))
+        except Exception as e:
+            print(f"[Database] save_rating_snapshot error: {e}")
 
-                wins  = wins_white + wins_black
-                cursor.execute(
-                    "SELECT COUNT(*) FROM games "
-                    "WHERE (white_engine = ? OR black_engine = ?) "
-                    "AND result = '1/2-1/2'",
-                    (engine, engine))
-                draws = cursor.fetchone()[0]
-                loses = matches - wins - draws
-                win_rate = (wins / matches * 100) if matches > 0 else 0
+    def load_rating_series(self, name):
+        """
+        ``(last_id, revision, {engine: (game_ids, ratings)})`` saved under
+        *name* — both packed array bytes — or None.
+        """
+        try:
+            with self._conn() as conn:
+                head = conn.execute("SELECT last_id, revision FROM rating_snapshots "
+                                    "WHERE name = ?", (name,)).fetchone()
+                if head is None:
+                    return None
+                rows = conn.execute("SELECT engine, game_ids, ratings FROM rating_series "
+                                    "WHERE name = ?", (name,)).fetchall()
+            return head[0], head[1], {e: (ids, vals) for e, ids, vals in rows}
+        except Exception as e:
+            print(f"[Database] load_rating_series error: {e}")
+            return None
+
+    def save_rating_series(self, name, last_id, revision, series, replace=False):
+        """
+        Persist the changed engines' series (see ``load_rating_series``)
+        and the watermark they are valid at, in one transaction.  With
+        *replace*, series of engines not in *series* are dropped.
+        """
+        try:
+            with self._conn() as conn:
+                if replace:
+                    conn.execute("DELETE FROM rating_series WHERE name = ?", (name,))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO rating_series (name, engine, game_ids, ratings) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(name, e, ids, vals) for e, (ids, vals) in series.items()])
+                conn.execute("INSERT OR REPLACE INTO rating_snapshots "
+                             "(name, last_id, revision, data) VALUES (?, ?, ?, '{}')",
+                             (name, last_id, revision))
+        except Exception as e:
+            print(f"[Database] save_rating_series error: {e}")
+
+    def get_pair_results(self, max_id=None):
+        """``(white_id, black_id, result, count)`` totals over the games with
+        ``id <= max_id`` (all games when None)."""
+        try:
+            with self._conn() as conn:
+                return conn.execute(
+                    "SELECT white_id, black_id, result, COUNT(*) "
+                    "FROM games WHERE ? IS NULL OR id <= ? "
+                    "GROUP BY white_id, black_id, result",
+                    (max_id, max_id)).fetchall()
+        except Exception as e:
+            print(f"[Database] get_pair_results error: {e}")
+            return []
+
+    def rating_service(self, model=None):
+        """
+        The shared cached ``RatingService`` for *model* (a RATING_MODELS
+        key; default: the selected ``rating_model``).
+        """
+        model = model or self.rating_model
+        with self._lock:
+            service = self._rating_services.get(model)
+            if service is None:
+                service = self._rating_services[model] = RATING_MODELS[model](self)
+            return service
+
+    @property
+    def ratings(self):
+        """The ``RatingService`` of the selected rating model."""
+        return self.rating_service()
+
+    @property
+    def elo_history(self):
+        """The shared ``EloHistory`` (per-engine Elo time series)."""
+        with self._lock:
+            if self._elo_history is None:
+                self._elo_history = EloHistory(self)
+            return self._elo_history
+
+    def bootstrap(self, model=None):
+        """
+        The shared ``BootstrapService`` for *model* (default: the selected
+        ``rating_model``).  Sequential Elo depends on game order, so it has
+        no bootstrap of its own and uses the Davidson model's.
+        """
+        model = model or self.rating_model
+        if model == 'elo':
+            model = 'davidson'
+        service = self.rating_service(model)
+        with self._lock:
+            boot = self._bootstraps.get(model)
+            if boot is None:
+                boot = self._bootstraps[model] = BootstrapService(self, service)
+            return boot
+
+    def iter_game_pgns(self, batch_size=500):
+        """
+        Stream ``(result, pgn)`` for every game, oldest first.
+
+        Rows are fetched *batch_size* at a time so callers such as the
+        learned-book builder never hold the whole table in memory.  Each
+        batch is a separate keyset query (``id > last``) on a short-lived
+        connection, so a long build neither pins a WAL snapshot (blocking
+        checkpoints) nor keeps a pool slot.
+        """
+        last_id = 0
+        while True:
+            with self._conn() as conn:
+                rows = conn.execute(
+                    "SELECT g.id, g.result, gp.pgn FROM games g "
+                    "JOIN game_pgn gp ON gp.game_id = g.id "
+                    "WHERE g.id > ? ORDER BY g.id LIMIT ?",
+                    (last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            for _, result, pgn in rows:
+                yield result, decompress_pgn(pgn)
+
+    _ENGINE_STATS_ORDER = {
+        'engine':   'engine',
+        'matches':  'matches',
+        'wins':     'wins',
+        'draws':    'draws',
+        'loses':    'matches - wins - draws',
+        'win_rate': 'CAST(wins AS REAL) / matches',
+    }
+
+    _ENGINE_STATS_SQL = '''
+        SELECT engine,
+               COUNT(*)  AS matches,
+               SUM(win)  AS wins,
+               SUM(draw) AS draws
+        FROM (
+            SELECT white_engine AS engine,
+                   CASE WHEN result = '1-0'
+                          OR (result = '0-1' AND black_engine = white_engine)
+                        THEN 1 ELSE 0 END AS win,
+                   CASE WHEN result = '1/2-1/2' THEN 1 ELSE 0 END AS draw
+            FROM games
+            UNION ALL
+            SELECT black_engine,
+                   CASE WHEN result = '0-1' THEN 1 ELSE 0 END,
+                   CASE WHEN result = '1/2-1/2' THEN 1 ELSE 0 END
+            FROM games
+            WHERE black_engine != white_engine
+        )
+        WHERE ? = '' OR instr(lower(engine), ?) > 0
+        GROUP BY engine
+        ORDER BY {order_expr} {direction}, engine ASC
+        LIMIT ? OFFSET ?
+    '''
+
+    def get_engine_stats(self, search_query='', order_by='engine',
+                         descending=False, limit=None, offset=0):
+        """
+        Per-engine match / win / draw / loss totals in a single query.
 
+        Both colours are folded into one grouped aggregate (UNION ALL over
+        the white and black perspectives), which SQLite answers from the
+        ``(engine, result)`` covering indexes without touching game rows.
+
+        Parameters
+        ----------
+        search_query : str        — case-insensitive substring filter on the name
+        order_by     : str        — one of engine, matches, wins, draws, loses, win_rate
+        descending   : bool
+        limit        : int | None — page size (None = all engines)
+        offset       : int        — rows to skip, for paging
+
+        Returns
+        -------
+        list of dicts: {engine, matches, wins, draws, loses, win_rate}
+        """
+        order_expr = self._ENGINE_STATS_ORDER.get(order_by, 'engine')
+        direction  = 'DESC' if descending else 'ASC'
+        query = self._ENGINE_STATS_SQL.format(order_expr=order_expr,
+                                              direction=direction)
+        q = (search_query or '').lower()
+        try:
+            with self._conn() as conn:
+                rows = conn.execute(
+                    query, (q, q, -1 if limit is None else limit, offset)
+                ).fetchall()
+
+            stats = []
+            for engine, matches, wins, draws in rows:
                 stats.append({
                     'engine':   engine,
                     'matches':  matches,
                     'wins':     wins,
                     'draws':    draws,
-                    'loses':    loses,
-                    'win_rate': win_rate,
+                    'loses':    matches - wins - draws,
+                    'win_rate': (wins / matches * 100) if matches > 0 else 0,
                 })
-
-            conn.close()
             return stats
         except Exception as e:
             print(f"[Database] get_engine_stats error: {e}")
             return []
 
+    def _games_page_where(self, filters):
+        """Build the WHERE clause and params for get_games_page filters."""
+        conditions, params = [], []
+        f = filters or {}
+
+        if f.get('engine'):
+            norm = normalize_engine_name(f['engine'])
+            conditions.append('(white_engine = ? OR black_engine = ?)')
+            params.extend([norm, norm])
+        if f.get('result'):
+            conditions.append('result = ?')
+            params.append(f['result'])
+        if f.get('source'):
+            conditions.append('source = ?')
+            params.append(f['source'])
+        if f.get('tournament'):
+            conditions.append('id IN (SELECT game_id FROM tournament_games '
+                              'WHERE tournament_id = ?)')
+            params.append(f['tournament'])
+        # Dates are stored as YYYY.MM.DD, so string comparison orders them
+        if f.get('date_from'):
+            conditions.append('date >= ?')
+            params.append(f['date_from'].replace('-', '.'))
+        if f.get('date_to'):
+            conditions.append('date <= ?')
+            params.append(f['date_to'].replace('-', '.'))
+        if f.get('opening'):
+            op = f['opening'].strip()
+            if re.fullmatch(r'[A-Ea-e]\d\d', op):
+                conditions.append('eco = ?')
+                params.append(op.upper())
+            else:
+                conditions.append("opening LIKE ? ESCAPE '\\'")
+                params.append(f"%{_like_escape(op)}%")
+        if f.get('search') and self._fts:
+            match = _fts_query(f['search'])
+            if match:
+                conditions.append(
+                    'id IN (SELECT rowid FROM games_fts WHERE games_fts MATCH ?)')
+                params.append(match)
+        elif f.get('search'):
+            like = f"%{_like_escape(f['search'].strip())}%"
+            conditions.append(
+                "(white_engine LIKE ? ESCAPE '\\' OR black_engine LIKE ? ESCAPE '\\' "
+                "OR reason LIKE ? ESCAPE '\\' OR result LIKE ? ESCAPE '\\' "
+                "OR date LIKE ? ESCAPE '\\' OR opening LIKE ? ESCAPE '\\')")
+            params.extend([like] * 6)
+        return conditions, params
+
+    def get_games_page(self, after_id=None, limit=100, filters=None):
+        """
+        Fetch one page of games, newest first, using keyset pagination.
+
+        Parameters
+        ----------
+        after_id : int | None — id of the last row of the previous page
+                                (None for the first page)
+        limit    : int        — page size
+        filters  : dict | None with any of
+                   engine, result, source, date_from, date_to (YYYY.MM.DD),
+                   opening (name substring or ECO code), search (words
+                   matched by prefix against engines, event, opening,
+                   reason and PGN tags via games_fts)
+
+        Returns
+        -------
+        list of row tuples in the get_all_games() layout; pass the id of
+        the last row as *after_id* to get the next page.
+        """
+        conditions, params = self._games_page_where(filters)
+        if after_id is not None:
+            conditions.append('id < ?')
+            params.append(after_id)
+        query = _GAMES_LIST_SQL
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit)
+        try:
+            with self._conn() as conn:
+                return conn.execute(query, params).fetchall()
+        except Exception as e:
+            print(f"[Database] get_games_page error: {e}")
+            return []
+
+    def count_games(self, filters=None):
+        """Number of games matching get_games_page *filters*."""
+        conditions, params = self._games_page_where(filters)
+        query = 'SELECT COUNT(*) FROM games'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        try:
+            with self._conn() as conn:
+                return conn.execute(query, params).fetchone()[0]
+        except Exception as e:
+            print(f"[Database] count_games error: {e}")
+            return 0
+
+    def iter_filtered_pgns(self, filters=None, batch_size=500):
+        """
+        Stream the PGN text of every game matching get_games_page
+        *filters*, oldest first.
+
+        Each batch is a separate keyset query (``id > last``), so no read
+        transaction stays open while the caller works through the rows.
+        """
+        conditions, params = self._games_page_where(filters)
+        query = ('SELECT g.id, gp.pgn FROM games g '
+                 'JOIN game_pgn gp ON gp.game_id = g.id WHERE g.id > ?')
+        if conditions:
+            query += ' AND ' + ' AND '.join(conditions)
+        query += ' ORDER BY g.id LIMIT ?'
+        last_id = 0
+        while True:
+            with self._conn() as conn:
+                rows = conn.execute(query, [last_id, *params, batch_size]).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            for _, pgn in rows:
+                yield decompress_pgn(pgn)
+
+    def export_pgn(self, path, filters=None, on_progress=None, **options):
+        """
+        Write every game matching get_games_page *filters* to *path*
+        (gzip when it ends in ``.gz``) in constant memory.
+
+        Parameters
+        ----------
+        path        : str
+        filters     : dict | None — engine, tournament, source, date_from, …
+        on_progress : callable(done, total) | None
+        options     : tags / evals / clocks / comments, see
+                      ``data.pgn_export.select_pgn``
+
+        Returns
+        -------
+        int — number of games written.
+        """
+        self.flush_writes(timeout=10)
+        return write_pgns(path, self.iter_filtered_pgns(filters),
+                          total=self.count_games(filters),
+                          on_progress=on_progress, **options)
+
     def get_all_games(self, filter_engine=None, search_query='',
                       source_filter=None):
         try:
-            conn   = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._conn() as conn:
+                cursor = conn.cursor()
 
-            base_query = '''
-                SELECT id, white_engine, black_engine, result, reason,
-                       date, time, move_count, duration_seconds,
-                       COALESCE(source, 'regular') as source
-                FROM games
-            '''
-            params = []
-            conditions = []
-
-            if filter_engine:
-                norm = normalize_engine_name(filter_engine)
-                conditions.append('(white_engine = ? OR black_engine = ?)')
-                params.extend([norm, norm])
-
-            if source_filter:
-                conditions.append('source = ?')
-                params.append(source_filter)
-
-            if conditions:
-                base_query += ' WHERE ' + ' AND '.join(conditions)
-
-            base_query += ' ORDER BY id DESC'
-            cursor.execute(base_query, params)
-            games = cursor.fetchall()
-            conn.close()
-
-            if search_query:
-                q = search_query.lower()
-                games = [g for g in games
-                         if q in ' '.join(str(v) for v in g).lower()]
+                base_query = _GAMES_LIST_SQL
+                params = []
+                conditions = []
+
+                if filter_engine:
+                    norm = normalize_engine_name(filter_engine)
+                    conditions.append('(white_engine = ? OR black_engine = ?)')
+                    params.extend([norm, norm])
+
+                if source_filter:
+                    conditions.append('source = ?')
+                    params.append(source_filter)
+
+                if search_query:
+                    conds, args = self._games_page_where({'search': search_query})
+                    conditions.extend(conds)
+                    params.extend(args)
+
+                if conditions:
+                    base_query += ' WHERE ' + ' AND '.join(conditions)
+
+                base_query += ' ORDER BY id DESC'
+                cursor.execute(base_query, params)
+                games = cursor.fetchall()
             return games
         except Exception as e:
             print(f"[Database] get_all_games error: {e}")
             return []
 
+    # search_games ranks the newest matches only: bm25 costs a few µs per
+    # row, so scoring every hit of a common word would blow the latency budget
+    SEARCH_RANK_WINDOW = 5000
+
+    def search_games(self, query, limit=50, offset=0):
+        """
+        Full-text search over every game, best match first.
+
+        Each word of *query* must match the start of a word in the engine
+        names, event / tournament name, opening, reason or PGN tags.
+        Engine-name hits rank highest (bm25 column weights); only the
+        newest ``SEARCH_RANK_WINDOW`` matches are ranked.
+
+        Returns
+        -------
+        list of row tuples in the get_all_games() layout.
+        """
+        if not self._fts:
+            return self.get_games_page(limit=limit, filters={'search': query})
+        match = _fts_query(query)
+        if not match:
+            return []
+        try:
+            with self._conn() as conn:
+                return conn.execute(f'''
+                    SELECT g.id, g.white_engine, g.black_engine, g.result,
+                           g.reason, g.date, g.time, g.move_count,
+                           g.duration_seconds, COALESCE(g.source, 'regular')
+                    FROM (SELECT rowid, {_FTS_RANK} AS score
+                          FROM games_fts
+                          WHERE games_fts MATCH ?
+                          ORDER BY rowid DESC
+                          LIMIT ?) hit
+                    JOIN games g ON g.id = hit.rowid
+                    ORDER BY hit.score, g.id DESC
+                    LIMIT ? OFFSET ?
+                ''', (match, self.SEARCH_RANK_WINDOW, limit, offset)).fetchall()
+        except Exception as e:
+            print(f"[Database] search_games error: {e}")
+            return []
+
     def get_game_pgn(self, game_id):
         """
         Fetch the PGN text for a specific game by its database id.
@@ -292,16 +1728,427 @@ class Database:
         str | None
         """
         try:
-            conn   = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('SELECT pgn FROM games WHERE id = ?', (game_id,))
-            result = cursor.fetchone()
-            conn.close()
-            return result[0] if result else None
+            with self._conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT pgn FROM game_pgn WHERE game_id = ?', (game_id,))
+                result = cursor.fetchone()
+            return decompress_pgn(result[0]) if result else None
         except Exception as e:
             print(f"[Database] get_game_pgn error: {e}")
             return None
 
+    def get_game_moves(self, game_id):
+        """
+        Fetch a game's moves as a list of UCI strings from its packed move
+        list, or None when the game is unknown or its moves cannot be
+        replayed (see ``positions.game_ucis``).
+
+        Games stored before move lists existed are replayed from their PGN
+        but not written back: packing them is left to backfill_positions.
+        """
+        try:
+            with self._conn() as conn:
+                row = conn.execute("SELECT pgn, moves FROM game_pgn "
+                                   "WHERE game_id = ?", (game_id,)).fetchone()
+            if row is None:
+                return None
+            pgn, moves = row
+            if moves is not None:
+                return unpack_moves(moves)
+            return game_ucis(pgn)
+        except Exception as e:
+            print(f"[Database] get_game_moves error: {e}")
+            return None
+
+    def save_move_lists(self, items):
+        """
+        Store packed move lists for existing games, indexing their
+        positions at the same time.
+
+        Parameters
+        ----------
+        items : iterable of (game_id, list of UCI strings)
+        """
+        try:
+            with self._conn() as conn:
+                for gid, ucis in items:
+                    row = conn.execute(
+                        "SELECT gp.positions_indexed, g.result FROM game_pgn gp "
+                        "JOIN games g ON g.id = gp.game_id WHERE gp.game_id = ?",
+                        (gid,)).fetchone()
+                    if row is None:
+                        continue
+                    conn.execute("UPDATE game_pgn SET moves = ?, positions_indexed = 1 "
+                                 "WHERE game_id = ?", (pack_moves(ucis), gid))
+                    if row[0] is None:
+                        self._index_positions(conn, position_rows(gid, ucis), row[1])
+            self._explorer_epoch += 1
+        except Exception as e:
+            print(f"[Database] save_move_lists error: {e}")
+
+    @property
+    def eval_cache(self):
+        """The shared ``EvalCache`` (analyzer results per position)."""
+        with self._lock:
+            if self._eval_cache is None:
+                self._eval_cache = EvalCache(self)
+            return self._eval_cache
+
+    def get_cached_eval(self, key, analyzer, search):
+        """``(cp, score_type, best_move code)`` from eval_cache, or None."""
+        try:
+            with self._conn() as conn:
+                return conn.execute(
+                    "SELECT cp, score_type, best_move FROM eval_cache "
+                    "WHERE hash = ? AND analyzer = ? AND search = ?",
+                    (key, analyzer, search)).fetchone()
+        except Exception as e:
+            print(f"[Database] get_cached_eval error: {e}")
+            return None
+
+    def save_cached_evals(self, rows):
+        """Store ``(hash, analyzer, search, cp, score_type, best_move)`` rows."""
+        try:
+            with self._conn() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO eval_cache "
+                    "(hash, analyzer, search, cp, score_type, best_move) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows)
+        except Exception as e:
+            print(f"[Database] save_cached_evals error: {e}")
+
+    def get_unanalyzed_games(self, after_id=0, limit=64):
+        """Ids of up to *limit* games above *after_id* with no game_analysis row."""
+        try:
+            with self._conn() as conn:
+                return [r[0] for r in conn.execute(
+                    "SELECT g.id FROM games g "
+                    "LEFT JOIN game_analysis a ON a.game_id = g.id "
+                    "WHERE g.id > ? AND a.game_id IS NULL "
+                    "ORDER BY g.id LIMIT ?", (after_id, limit))]
+        except Exception as e:
+            print(f"[Database] get_unanalyzed_games error: {e}")
+            return []
+
+    def count_unanalyzed(self):
+        """Number of games without a game_analysis row."""
+        try:
+            with self._conn() as conn:
+                return conn.execute(
+                    "SELECT (SELECT COUNT(*) FROM games) - "
+                    "(SELECT COUNT(*) FROM game_analysis)").fetchone()[0]
+        except Exception as e:
+            print(f"[Database] count_unanalyzed error: {e}")
+            return 0
+
+    def save_game_analysis(self, game_id, analyzer, search, evals, best_moves, quality):
+        """
+        Store a game's analysis (blobs from ``batch_analysis.pack_analysis``),
+        replacing any earlier one.  Ignored if the game was deleted meanwhile.
+        """
+        date_str, time_str = self._timestamp()
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO game_analysis "
+                    "(game_id, analyzer, search, evals, best_moves, quality, date) "
+                    "SELECT id, ?, ?, ?, ?, ?, ? FROM games WHERE id = ?",
+                    (analyzer, search, evals, best_moves, quality,
+                     f"{date_str} {time_str}", game_id))
+        except Exception as e:
+            print(f"[Database] save_game_analysis error: {e}")
+
+    def get_game_analysis(self, game_id):
+        """
+        A game's stored analysis, or None.
+
+        Returns
+        -------
+        dict with keys analyzer, search, date, evals (per position, White's
+        POV), best_moves (UCI per position) and quality (label per move).
+        """
+        try:
+            with self._conn() as conn:
+                row = conn.execute(
+                    "SELECT analyzer, search, date, evals, best_moves, quality "
+                    "FROM game_analysis WHERE game_id = ?", (game_id,)).fetchone()
+            if row is None:
+                return None
+            evals, best, quality = unpack_analysis(*row[3:])
+            return {'analyzer': row[0], 'search': row[1], 'date': row[2],
+                    'evals': evals, 'best_moves': best, 'quality': quality}
+        except Exception as e:
+            print(f"[Database] get_game_analysis error: {e}")
+            return None
+
+    def backfill_positions(self, batch_size=500, workers=None, on_progress=None):
+        """
+        Index the positions of every game saved before the positions table
+        existed.
+
+        Games are streamed *batch_size* at a time; each batch is hashed in
+        a process pool (legacy games without a packed move list also need
+        a SAN replay, which dominates) and written with ``executemany`` in
+        one transaction.  Finished games are flagged, so an interrupted
+        backfill resumes where it stopped.
+
+        Parameters
+        ----------
+        batch_size  : int
+        workers     : int | None — hashing processes (None = up to 4,
+                                   1 = hash in this thread)
+        on_progress : callable(done, total) | None
+
+        Returns
+        -------
+        int — number of games indexed.
+        """
+        with self._conn() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM game_pgn "
+                                 "WHERE positions_indexed IS NULL").fetchone()[0]
+        if not total:
+            return 0
+
+        workers = workers or min(4, os.cpu_count() or 1)
+        pool = None
+        if workers > 1:
+            # spawn: the caller usually has Tk and writer threads running
+            pool = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context('spawn'))
+        done, last_id = 0, 0
+        try:
+            while True:
+                with self._conn() as conn:
+                    batch = conn.execute(
+                        "SELECT gp.game_id, gp.pgn, gp.moves, g.result "
+                        "FROM game_pgn gp JOIN games g ON g.id = gp.game_id "
+                        "WHERE gp.positions_indexed IS NULL AND gp.game_id > ? "
+                        "ORDER BY gp.game_id LIMIT ?", (last_id, batch_size)).fetchall()
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+                results_of = {gid: res for gid, _, _, res in batch}
+                items = [(gid, pgn, moves) for gid, pgn, moves, _ in batch]
+                if pool is not None:
+                    chunk   = max(1, len(items) // (workers * 4))
+                    results = list(pool.map(index_game, items, chunksize=chunk))
+                else:
+                    results = [index_game(item) for item in items]
+
+                with self._conn() as conn:
+                    for game_id, parsed, rows in results:
+                        # Skip games indexed meanwhile (save_move_lists).
+                        # Games that cannot be replayed are flagged too, with
+                        # no move list and no rows, so they are not retried
+                        cur = conn.execute(
+                            "UPDATE game_pgn SET positions_indexed = 1, "
+                            "moves = COALESCE(moves, ?) "
+                            "WHERE game_id = ? AND positions_indexed IS NULL",
+                            (pack_moves(parsed) if parsed is not None else None,
+                             game_id))
+                        if cur.rowcount:
+                            self._index_positions(conn, rows, results_of[game_id])
+                self._explorer_epoch += 1
+                done += len(batch)
+                if on_progress:
+                    on_progress(done, total)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return done
+
+    def import_pgn(self, path, batch_size=2000, workers=None, validate=True,
+                   on_progress=None):
+        """
+        Import every finished game of a PGN file (e.g. a CCRL download).
+
+        The file is streamed through ``scan_games``; each batch of
+        *batch_size* games is parsed in a process pool while the previous
+        one is written in a single transaction, together with the file
+        offset reached.  Running the import again on the same file resumes
+        after the last committed game, so an interrupted import neither
+        loses nor duplicates games.
+
+        Parameters
+        ----------
+        path        : str
+        batch_size  : int        — games per transaction
+        workers     : int | None — parsing processes (None = one per CPU,
+                                   1 = parse in this thread)
+        validate    : bool       — check every move and store the move list
+                                   and positions; False only stores the PGN
+                                   (much faster; positions can be indexed
+                                   later with ``backfill_positions``)
+        on_progress : callable(bytes_done, bytes_total, games, skipped) | None
+                      — *skipped* maps a ``pgn_import.SKIP_`` reason to
+                      the games this call has skipped for it (e.g.
+                      games from a set-up position)
+
+        Returns
+        -------
+        int — number of games imported by this call.
+        """
+        path = os.path.abspath(path)
+        size = os.path.getsize(path)
+        fingerprint = file_fingerprint(path)
+        with self._conn() as conn:
+            row = conn.execute("SELECT fingerprint, offset, games, skipped "
+                               "FROM pgn_imports WHERE path = ?", (path,)).fetchone()
+        offset, games, skipped = 0, 0, 0
+        if row and row[0] == fingerprint and row[1] <= size:
+            offset, games, skipped = row[1:]
+        if offset >= size:
+            return 0
+
+        workers = workers or os.cpu_count() or 1
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context('spawn'))
+
+        def _parse(batch):
+            items = [(text, validate) for _, text in batch]
+            if pool is None:
+                return batch[-1][0], map(parse_game, items)
+            chunk = max(1, len(items) // (workers * 4))
+            return batch[-1][0], pool.map(parse_game, items, chunksize=chunk)
+
+        def _batches(f):
+            batch = []
+            for game in scan_games(f, offset):
+                batch.append(game)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        imported, skips = 0, {}
+        date_str, time_str = self._timestamp()
+        try:
+            with open(path, 'rb') as f:
+                batches = _batches(f)
+                first   = next(batches, None)
+                current = _parse(first) if first else None
+                while current is not None:
+                    # Queue the next batch before writing this one
+                    nxt     = next(batches, None)
+                    pending = _parse(nxt) if nxt else None
+                    end, results = current
+                    with self._conn() as conn:
+                        for g, reason in results:
+                            if g is None:
+                                skipped += 1
+                                skips[reason] = skips.get(reason, 0) + 1
+                                continue
+                            self._insert_game(
+                                conn, g['white'], g['black'], g['result'],
+                                g['reason'], g['pgn'], g['plies'], None, 'import',
+                                g['date'] or date_str, g['time'] or time_str,
+                                moves=g['moves'], keys=g['keys'])
+                            imported += 1
+                        conn.execute(
+                            "INSERT OR REPLACE INTO pgn_imports "
+                            "(path, fingerprint, offset, games, skipped) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (path, fingerprint, end, games + imported, skipped))
+                    self._explorer_epoch += 1
+                    if on_progress:
+                        on_progress(end, size, games + imported, dict(skips))
+                    current = pending
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        return imported
+
+    def find_games_by_position(self, fen, limit=200):
+        """
+        Games that reached the position of *fen* (move counters ignored),
+        newest first.
+
+        Only indexed games are found — see backfill_positions.
+
+        Returns
+        -------
+        list of row tuples in the get_all_games() layout.
+        """
+        try:
+            with self._conn() as conn:
+                return conn.execute(
+                    _GAMES_LIST_SQL + " WHERE id IN (SELECT game_id FROM positions "
+                    "WHERE hash = ?) ORDER BY id DESC LIMIT ?",
+                    (fen_key(fen), limit)).fetchall()
+        except Exception as e:
+            print(f"[Database] find_games_by_position error: {e}")
+            return []
+
+    EXPLORER_CACHE_SIZE    = 256   # positions kept by explore_position
+    EXPLORER_ENGINE_SAMPLE = 200   # recent games scanned per move for engine names
+
+    def explore_position(self, fen):
+        """
+        Opening-explorer node: every move played from the position of
+        *fen* in the database, most played first.
+
+        Totals come from explorer_moves (one primary-key range read); the
+        engine names are taken from the most recent
+        ``EXPLORER_ENGINE_SAMPLE`` games per move.  Results are kept in
+        an LRU cache that is invalidated by any new game.
+
+        Returns
+        -------
+        list of dicts: {uci, games, white_wins, draws, black_wins,
+                        score (0-1, for the side to move),
+                        engines (list of (name, games))}
+        """
+        key = fen_key(fen)
+        white_to_move = (fen.split() + ['w'])[1] == 'w'
+        try:
+            with self._conn() as conn:
+                last_id = conn.execute("SELECT MAX(id) FROM games").fetchone()[0]
+                stamp   = (key, last_id, self._explorer_epoch)
+                with self._lock:
+                    hit = self._explorer_cache.get(stamp)
+                    if hit is not None:
+                        self._explorer_cache.move_to_end(stamp)
+                        return hit
+
+                nodes = []
+                for move, games, ww, dd, bw in conn.execute(
+                        "SELECT move, games, white_wins, draws, black_wins "
+                        "FROM explorer_moves WHERE hash = ? ORDER BY games DESC",
+                        (key,)):
+                    wins = ww if white_to_move else bw
+                    engines = conn.execute('''
+                        SELECT CASE WHEN p.ply % 2 = 0 THEN g.white_engine
+                                    ELSE g.black_engine END AS engine,
+                               COUNT(*) AS n
+                        FROM (SELECT game_id, ply FROM positions
+                              WHERE hash = ? AND move = ?
+                              ORDER BY game_id DESC LIMIT ?) p
+                        JOIN games g ON g.id = p.game_id
+                        GROUP BY engine
+                        ORDER BY n DESC, engine
+                    ''', (key, move, self.EXPLORER_ENGINE_SAMPLE)).fetchall()
+                    nodes.append({
+                        'uci':        decode_move(move),
+                        'games':      games,
+                        'white_wins': ww,
+                        'draws':      dd,
+                        'black_wins': bw,
+                        'score':      (wins + 0.5 * dd) / games if games else 0.0,
+                        'engines':    engines,
+                    })
+
+            with self._lock:
+                self._explorer_cache[stamp] = nodes
+                while len(self._explorer_cache) > self.EXPLORER_CACHE_SIZE:
+                    self._explorer_cache.popitem(last=False)
+            return nodes
+        except Exception as e:
+            print(f"[Database] explore_position error: {e}")
+            return []
+
     def get_tournament_games(self, tournament_id=None, tournament_name=None):
         """
         Fetch tournament game rows with metadata.
@@ -313,36 +2160,63 @@ class Database:
 
         Returns
         -------
-        list of dicts with all tournament_games columns
+        list of dicts with all tournament_games columns, plus ``moves``:
+        the game's packed move list (bytes, see unpack_moves) or None
         """
         try:
-            conn   = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            with self._conn() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
 
-            query  = 'SELECT * FROM tournament_games'
-            params = []
-            conditions = []
+                query  = _TOURNAMENT_GAMES_SQL
+                params = []
+                conditions = []
 
-            if tournament_id:
-                conditions.append('tournament_id = ?')
-                params.append(tournament_id)
-            if tournament_name:
-                conditions.append('tournament_name LIKE ?')
-                params.append(f'%{tournament_name}%')
+                if tournament_id:
+                    conditions.append('tg.tournament_id = ?')
+                    params.append(tournament_id)
+                if tournament_name:
+                    conditions.append('tg.tournament_name LIKE ?')
+                    params.append(f'%{tournament_name}%')
 
-            if conditions:
-                query += ' WHERE ' + ' AND '.join(conditions)
-            query += ' ORDER BY id ASC'
+                if conditions:
+                    query += ' WHERE ' + ' AND '.join(conditions)
+                query += ' ORDER BY tg.id ASC'
 
-            cursor.execute(query, params)
-            rows = [dict(r) for r in cursor.fetchall()]
-            conn.close()
+                cursor.execute(query, params)
+                rows = [dict(r) for r in cursor.fetchall()]
+            for row in rows:
+                row['pgn'] = decompress_pgn(row['pgn'])
             return rows
         except Exception as e:
             print(f"[Database] get_tournament_games error: {e}")
             return []
 
+    def _read_opening_stats(self, engine, top_n):
+        result = {'as_white': [], 'as_black': []}
+        with self._conn() as conn:
+            for key, color in (('as_white', 'w'), ('as_black', 'b')):
+                rows = conn.execute('''
+                    SELECT opening, games, wins, draws
+                    FROM opening_stats
+                    WHERE engine = ? AND color = ?
+                    ORDER BY games DESC, opening
+                    LIMIT ?
+                ''', (engine, color, top_n)).fetchall()
+                result[key] = [
+                    {
+                        'opening':  opening,
+                        'games':    games,
+                        'wins':     wins,
+                        'draws':    draws,
+                        'losses':   games - wins - draws,
+                        'win_rate': round(wins / games * 100, 1)
+                                    if games > 0 else 0.0,
+                    }
+                    for opening, games, wins, draws in rows
+                ]
+        return result
+
     def get_opening_stats(self, engine_name, top_n=10):
         """
         Return the most common openings used by an engine as White and as Black.
@@ -356,66 +2230,15 @@ class Database:
         -------
         dict with keys 'as_white' and 'as_black', each a list of dicts:
             {opening, games, wins, draws, losses, win_rate}
-        Opening name is extracted from the PGN [Opening "..."] tag.
-        Games without an Opening tag are grouped as "Unknown / No Opening".
+        Opening name is the PGN [Opening "..."] tag, kept pre-aggregated in
+        the opening_stats table.  Games without an Opening tag are grouped
+        as "Unknown / No Opening".
         """
-        import re
-        norm = normalize_engine_name(engine_name)
-        result = {'as_white': [], 'as_black': []}
-
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            for color, col_self, col_opp, win_result in [
-                ('as_white', 'white_engine', 'black_engine', '1-0'),
-                ('as_black',  'black_engine', 'white_engine', '0-1'),
-            ]:
-                cursor.execute(
-                    f"SELECT pgn, result FROM games WHERE {col_self} = ?",
-                    (norm,))
-                rows = cursor.fetchall()
-
-                opening_counts = {}
-                for pgn, res in rows:
-                    # Extract [Opening "..."] tag from PGN header
-                    m = re.search(r'\[Opening\s+"([^"]+)"\]', pgn or '')
-                    opening = m.group(1).strip() if m else "Unknown / No Opening"
-                    if opening not in opening_counts:
-                        opening_counts[opening] = {'games': 0, 'wins': 0,
-                                                   'draws': 0, 'losses': 0}
-                    d = opening_counts[opening]
-                    d['games'] += 1
-                    if res == win_result:
-                        d['wins'] += 1
-                    elif res == '1/2-1/2':
-                        d['draws'] += 1
-                    else:
-                        d['losses'] += 1
-
-                sorted_openings = sorted(
-                    opening_counts.items(),
-                    key=lambda x: x[1]['games'],
-                    reverse=True)[:top_n]
-
-                result[color] = [
-                    {
-                        'opening':  name,
-                        'games':    d['games'],
-                        'wins':     d['wins'],
-                        'draws':    d['draws'],
-                        'losses':   d['losses'],
-                        'win_rate': round(d['wins'] / d['games'] * 100, 1)
-                                    if d['games'] > 0 else 0.0,
-                    }
-                    for name, d in sorted_openings
-                ]
-
-            conn.close()
+            return self._read_opening_stats(normalize_engine_name(engine_name), top_n)
         except Exception as e:
             print(f"[Database] get_opening_stats error: {e}")
-
-        return result
+            return {'as_white': [], 'as_black': []}
 
     def get_opening_stats_all(self, top_n=10):
         """
@@ -425,53 +2248,11 @@ class Database:
         -------
         dict with keys 'as_white' and 'as_black', same format as get_opening_stats.
         """
-        import re
-        result = {'as_white': [], 'as_black': []}
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            for color, win_result in [('as_white', '1-0'), ('as_black', '0-1')]:
-                cursor.execute("SELECT pgn, result FROM games")
-                rows = cursor.fetchall()
-
-                opening_counts = {}
-                for pgn, res in rows:
-                    m = re.search(r'\[Opening\s+"([^"]+)"\]', pgn or '')
-                    opening = m.group(1).strip() if m else "Unknown / No Opening"
-                    if opening not in opening_counts:
-                        opening_counts[opening] = {'games': 0, 'wins': 0,
-                                                   'draws': 0, 'losses': 0}
-                    d = opening_counts[opening]
-                    d['games'] += 1
-                    if res == win_result:
-                        d['wins'] += 1
-                    elif res == '1/2-1/2':
-                        d['draws'] += 1
-                    else:
-                        d['losses'] += 1
-
-                sorted_openings = sorted(
-                    opening_counts.items(),
-                    key=lambda x: x[1]['games'],
-                    reverse=True)[:top_n]
-
-                result[color] = [
-                    {
-                        'opening':  name,
-                        'games':    d['games'],
-                        'wins':     d['wins'],
-                        'draws':    d['draws'],
-                        'losses':   d['losses'],
-                        'win_rate': round(d['wins'] / d['games'] * 100, 1)
-                                    if d['games'] > 0 else 0.0,
-                    }
-                    for name, d in sorted_openings
-                ]
-            conn.close()
+            return self._read_opening_stats('', top_n)
         except Exception as e:
             print(f"[Database] get_opening_stats_all error: {e}")
-        return result
+            return {'as_white': [], 'as_black': []}
 
     def get_tournament_list(self):
         """
@@ -487,21 +2268,11 @@ class Database:
              even when rowid ordering differs from date ordering.
         """
         try:
-            conn   = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT tournament_id,
-                       tournament_name,
-                       format,
-                       COUNT(*)  AS game_count,
-                       MIN(date) AS date
-                FROM tournament_games
-                GROUP BY tournament_id
-                ORDER BY MAX(id) DESC
-            ''')
-            rows = [dict(r) for r in cursor.fetchall()]
-            conn.close()
+            with self._conn() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                cursor.execute(_TOURNAMENT_LIST_SQL)
+                rows = [dict(r) for r in cursor.fetchall()]
             return rows
         except Exception as e:
             print(f"[Database] get_tournament_list error: {e}")
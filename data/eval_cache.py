@@ -0,0 +1,117 @@
+# ═══════════════════════════════════════════════════════════
+#  eval_cache.py — Persistent cache of analyzer evaluations
+# ═══════════════════════════════════════════════════════════
+
+import threading
+from collections import OrderedDict
+
+from core.board import Board
+from core.movecodec import decode_move, encode_move
+from core.zobrist import board_hash
+from data.positions import signed_key
+
+
+def _apply(board, uci):
+    fc = ord(uci[0]) - ord('a'); fr = 8 - int(uci[1])
+    tc = ord(uci[2]) - ord('a'); tr = 8 - int(uci[3])
+    promo = uci[4].lower() if len(uci) > 4 else None
+    return board._apply_raw(fr, fc, tr, tc, promo)
+
+
+class EvalCache:
+    """
+    Analyzer results keyed by position, analyzer and search limit.
+
+    A position is identified by its Zobrist hash (as in the positions
+    table), so transpositions and the same opening line in different
+    games share one entry.  The analyzer is its ``id name`` (e.g.
+    "Stockfish 16") and the limit a UCI ``go`` argument ("movetime 200",
+    "depth 12"), so results of different engines or strengths never mix.
+
+    Lookups go to an in-memory LRU first, then to the eval_cache table;
+    new results are written back in batches of *flush_every*.
+
+    Parameters
+    ----------
+    db          : database.Database
+    size        : int — entries kept in memory
+    flush_every : int — pending results per database write
+    """
+
+    def __init__(self, db, size=100000, flush_every=32):
+        self.db          = db
+        self.size        = size
+        self.flush_every = flush_every
+        self.hits        = 0
+        self.misses      = 0
+        self._lock       = threading.Lock()
+        self._lru        = OrderedDict()    # (hash, analyzer, limit) -> (cp, type, best)
+        self._pending    = []
+        # The last position hashed: most lookups extend it by one move
+        self._last_moves = ''
+        self._last_board = Board()
+
+    @property
+    def hit_rate(self):
+        """Share of lookups answered without searching (0.0 when none yet)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def position_key(self, moves_str):
+        """Signed Zobrist key of the position after *moves_str* (UCI)."""
+        with self._lock:
+            prev = self._last_moves
+            if prev and moves_str.startswith(prev + ' '):
+                board, todo = self._last_board, moves_str[len(prev):].split()
+            else:
+                board, todo = Board(), moves_str.split()
+            for uci in todo:
+                board = _apply(board, uci)
+            self._last_moves, self._last_board = moves_str, board
+            return signed_key(board_hash(board))
+
+    def get(self, key, analyzer, limit):
+        """``(cp, score_type, best_move)`` cached for a position, or None."""
+        k = (key, analyzer, limit)
+        with self._lock:
+            hit = self._lru.get(k)
+            if hit is not None:
+                self._lru.move_to_end(k)
+                self.hits += 1
+                return hit
+        row = self.db.get_cached_eval(key, analyzer, limit)
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            cp, score_type, best = row
+            hit = (cp, score_type, decode_move(best) if best else None)
+            self._remember(k, hit)
+            self.hits += 1
+            return hit
+
+    def put(self, key, analyzer, limit, cp, score_type, best_move):
+        """Store a search result (results without a score are not kept)."""
+        if cp is None:
+            return
+        with self._lock:
+            self._remember((key, analyzer, limit), (cp, score_type, best_move))
+            self._pending.append((key, analyzer, limit, cp, score_type,
+                                  encode_move(best_move) if best_move else 0))
+            if len(self._pending) < self.flush_every:
+                return
+            rows, self._pending = self._pending, []
+        self.db.save_cached_evals(rows)
+
+    def flush(self):
+        """Write pending results to the database."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+        if rows:
+            self.db.save_cached_evals(rows)
+
+    def _remember(self, k, value):
+        self._lru[k] = value
+        self._lru.move_to_end(k)
+        if len(self._lru) > self.size:
+            self._lru.popitem(last=False)
@@ -0,0 +1,114 @@
+# ═══════════════════════════════════════════════════════════
+#  pgn_export.py — Streaming PGN writer with tag / comment selection
+# ═══════════════════════════════════════════════════════════
+
+import gzip
+import os
+import re
+
+from core.pgn import split_pgn
+
+# The Seven Tag Roster, in the order the PGN standard requires
+STR_TAGS = ('Event', 'Site', 'Date', 'Round', 'White', 'Black', 'Result')
+
+_TAG_NAME_RE  = re.compile(r'^\s*\[(\w+)\s')
+_COMMENT_RE   = re.compile(r'\s*\{([^}]*)\}')
+_EVAL_CMD_RE  = re.compile(r'\[%eval\s[^\]]*\]')
+_CLOCK_CMD_RE = re.compile(r'\[%(?:clk|emt)\s[^\]]*\]')
+# cutechess-style "+0.35/18 1.2s" at the start of a comment
+_CUTE_RE      = re.compile(r'^\s*([+-]?M?\d+(?:\.\d+)?/\d+)(?:\s+(\d+(?:\.\d+)?s))?')
+_SPACES_RE    = re.compile(r'[ \t]{2,}')
+
+
+def _filter_comment(text, evals, clocks, comments):
+    kept = []
+    m = _CUTE_RE.match(text)
+    if m:
+        if evals:
+            kept.append(m.group(1))
+        if clocks and m.group(2):
+            kept.append(m.group(2))
+        text = text[m.end():]
+    for cmd in _EVAL_CMD_RE.findall(text):
+        if evals:
+            kept.append(cmd)
+    for cmd in _CLOCK_CMD_RE.findall(text):
+        if clocks:
+            kept.append(cmd)
+    if comments:
+        rest = _CLOCK_CMD_RE.sub('', _EVAL_CMD_RE.sub('', text)).strip()
+        if rest:
+            kept.append(rest)
+    return ' '.join(kept)
+
+
+def select_pgn(pgn, tags=None, evals=True, clocks=True, comments=True):
+    """
+    Return *pgn* with only the requested tags and move comments.
+
+    Parameters
+    ----------
+    tags     : iterable of str | None — tag names to keep (None = all)
+    evals    : bool — keep engine evals (``[%eval]``, cutechess ``+0.35/18``)
+    clocks   : bool — keep clock / move times (``[%clk]``, ``[%emt]``, ``1.2s``)
+    comments : bool — keep any other comment text
+    """
+    if tags is None and evals and clocks and comments:
+        return pgn.strip()
+    head, body = split_pgn(pgn)
+    if tags is not None:
+        keep = set(tags)
+        head = '\n'.join(line for line in head.split('\n')
+                         if (m := _TAG_NAME_RE.match(line)) and m.group(1) in keep)
+    if not (evals and clocks and comments):
+        def _sub(m):
+            text = _filter_comment(m.group(1), evals, clocks, comments)
+            return f" {{{text}}}" if text else ''
+        body = _SPACES_RE.sub(' ', _COMMENT_RE.sub(_sub, body))
+    head, body = head.strip(), body.strip()
+    return f"{head}\n\n{body}" if head else body
+
+
+def write_pgns(path, pgns, total=None, on_progress=None, progress_every=500,
+               **options):
+    """
+    Stream PGN texts to *path*, one game at a time.
+
+    A path ending in ``.gz`` is gzip-compressed.  The output is written to
+    a ``.part`` file and moved into place when complete, so a failed
+    export never leaves a truncated file behind.
+
+    Parameters
+    ----------
+    path        : str
+    pgns        : iterable of str
+    total       : int | None — expected game count, passed to on_progress
+    on_progress : callable(done, total) | None
+    options     : tags / evals / clocks / comments, see ``select_pgn``
+
+    Returns
+    -------
+    int — number of games written.
+    """
+    tmp = path + '.part'
+    if path.lower().endswith('.gz'):
+        out = gzip.open(tmp, 'wt', encoding='utf-8', newline='\n')
+    else:
+        out = open(tmp, 'w', encoding='utf-8', newline='\n')
+    count = 0
+    try:
+        with out:
+            for pgn in pgns:
+                if not pgn:
+                    continue
+                out.write(select_pgn(pgn, **options) + "\n\n")
+                count += 1
+                if on_progress and count % progress_every == 0:
+                    on_progress(count, total)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    if on_progress:
+        on_progress(count, total)
+    return count
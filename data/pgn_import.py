@@ -0,0 +1,126 @@
+# ═══════════════════════════════════════════════════════════
+#  pgn_import.py — Streaming scanner and parser for PGN imports
+# ═══════════════════════════════════════════════════════════
+
+import zlib
+
+from core.board import Board
+from core.pgn import parse_headers, san_moves, split_pgn
+from core.utils import normalize_engine_name
+from data.positions import position_keys, set_up_start
+
+_BOM          = b'\xef\xbb\xbf'
+_DATE_UNKNOWN = '????.??.??'
+# Bytes hashed to recognise a file again when an import is resumed
+FINGERPRINT_BYTES = 65536
+
+# Why parse_game skips a game
+SKIP_UNFINISHED = 'unfinished'    # no result, or no moves
+SKIP_SET_UP     = 'set-up'        # starts from a [FEN] position
+SKIP_ILLEGAL    = 'illegal'       # a move does not parse
+
+
+def file_fingerprint(path):
+    """CRC-32 of the first FINGERPRINT_BYTES of *path*."""
+    with open(path, 'rb') as f:
+        return zlib.crc32(f.read(FINGERPRINT_BYTES))
+
+
+def scan_games(f, offset=0):
+    """
+    Split a PGN stream into games without loading it whole.
+
+    A new game starts at a tag line (``[...``) that follows movetext,
+    unless the line is inside a ``{…}`` comment, so comments spanning
+    lines never split a game.  Lines are read as bytes so the offsets are
+    exact file positions, usable to resume a scan.
+
+    Parameters
+    ----------
+    f      : binary file object
+    offset : int — position to start from (a game boundary)
+
+    Yields
+    ------
+    (end_offset, text) — *end_offset* is the file position just past the game.
+    """
+    f.seek(offset)
+    pos      = offset
+    lines    = []
+    in_moves = False
+    depth    = 0
+    for line in f:
+        if pos == 0 and line.startswith(_BOM):
+            pos  += len(_BOM)
+            line  = line[len(_BOM):]
+        s = line.lstrip()
+        if s.startswith(b'[') and in_moves and depth == 0:
+            yield pos, b''.join(lines).decode('utf-8', 'replace').strip()
+            lines, in_moves = [], False
+        if lines or s.strip():
+            lines.append(line)
+            if depth or not s.startswith(b'['):
+                if s.strip() and not s.startswith(b'%'):
+                    in_moves = True
+                depth = max(0, depth + line.count(b'{') - line.count(b'}'))
+        pos += len(line)
+    if lines:
+        yield pos, b''.join(lines).decode('utf-8', 'replace').strip()
+
+
+def parse_game(item):
+    """
+    Worker for the PGN importer (runs in a process pool).
+
+    Parameters
+    ----------
+    item : (text, validate) — one game from ``scan_games``; with *validate*
+           every SAN move is checked against the legal moves and converted
+           to UCI (needed for the move list and position index)
+
+    Returns
+    -------
+    (game, None) — a dict of games-table fields — or (None, reason) when
+    the game is skipped, *reason* being a SKIP_ value.  Games from a set-up
+    position are always skipped: move lists, the position index and the
+    analyzers all replay from the standard start.
+    """
+    text, validate = item
+    head, body = split_pgn(text)
+    tags   = parse_headers(head)
+    result = tags.get('Result', '').strip()
+    if result not in ('1-0', '0-1', '1/2-1/2'):
+        return None, SKIP_UNFINISHED
+    if set_up_start(tags):
+        return None, SKIP_SET_UP
+    sans = san_moves(body)
+    if not sans:
+        return None, SKIP_UNFINISHED
+
+    ucis = keys = None
+    if validate:
+        board = Board()
+        ucis  = []
+        try:
+            for san in sans:
+                fr, fc, tr, tc, promo = board.san_to_move(san)
+                uci = f"{chr(ord('a') + fc)}{8 - fr}{chr(ord('a') + tc)}{8 - tr}"
+                ucis.append(uci + promo if promo else uci)
+                board = board._apply_raw(fr, fc, tr, tc, promo)
+        except ValueError:
+            return None, SKIP_ILLEGAL
+        keys = position_keys(ucis)
+
+    date = tags.get('Date', '')
+    return {
+        'white':  normalize_engine_name(tags.get('White') or '?'),
+        'black':  normalize_engine_name(tags.get('Black') or '?'),
+        'result': result,
+        'reason': tags.get('Termination') or 'Imported',
+        'date':   date if date and date != _DATE_UNKNOWN else None,
+        'time':   tags.get('Time') or None,
+        'pgn':    text,
+        'plies':  len(sans),
+        'moves':  ucis,
+        'keys':   keys,
+    }, None
@@ -0,0 +1,108 @@
+# ═══════════════════════════════════════════════════════════
+#  positions.py — Position-index rows for the positions table
+# ═══════════════════════════════════════════════════════════
+
+from core.board import Board
+from core.movecodec import encode_move, unpack_moves
+from core.pgn import parse_headers, san_moves, split_pgn
+from core.zobrist import board_hash, fen_hash
+from data.pgn_codec import decompress_pgn
+
+# The move column holds the 16-bit code of the move played from the
+# position; 0 (a1a1, never a legal move) marks the game's final position.
+NO_MOVE = 0
+
+
+def signed_key(key):
+    """Map an unsigned 64-bit Zobrist key onto SQLite's signed INTEGER range."""
+    return key - (1 << 64) if key >= (1 << 63) else key
+
+
+def fen_key(fen):
+    """The positions.hash value for a FEN string."""
+    return signed_key(fen_hash(fen))
+
+
+def position_keys(ucis):
+    """
+    Build the ``(hash, move, ply)`` triples for one game: one per position
+    reached, from the start position (ply 0) to the final one.
+
+    Moves are trusted (they come from a finished game), so the board is
+    advanced with ``_apply_raw`` and no legal-move generation is done.
+    """
+    board = Board()
+    keys  = []
+    for ply, uci in enumerate(ucis):
+        keys.append((signed_key(board_hash(board)), encode_move(uci), ply))
+        fc = ord(uci[0]) - ord('a'); fr = 8 - int(uci[1])
+        tc = ord(uci[2]) - ord('a'); tr = 8 - int(uci[3])
+        promo = uci[4].lower() if len(uci) > 4 else None
+        board = board._apply_raw(fr, fc, tr, tc, promo)
+    keys.append((signed_key(board_hash(board)), NO_MOVE, len(ucis)))
+    return keys
+
+
+def set_up_start(tags):
+    """True if a game's tags start it from a set-up position, not the standard one."""
+    return tags.get('SetUp', '').strip() == '1' or 'FEN' in tags
+
+
+def game_ucis(pgn):
+    """
+    Replay a stored PGN (blob or text) into its UCI move list.
+
+    Returns None when the moves cannot be replayed from the standard start
+    position: the game starts from a set-up position (``[SetUp]`` /
+    ``[FEN]`` tags) or a move does not parse.  A partial list is never
+    returned — it would be stored and indexed as if it were the whole game.
+    """
+    text = decompress_pgn(pgn)
+    if set_up_start(parse_headers(split_pgn(text)[0])):
+        return None
+    board = Board()
+    ucis  = []
+    try:
+        for san in san_moves(text):
+            fr, fc, tr, tc, promo = board.san_to_move(san)
+            uci = f"{chr(ord('a') + fc)}{8 - fr}{chr(ord('a') + tc)}{8 - tr}"
+            ucis.append(uci + promo if promo else uci)
+            board = board._apply_raw(fr, fc, tr, tc, promo)
+    except ValueError:
+        return None
+    return ucis
+
+
+def position_rows(game_id, ucis, keys=None):
+    """
+    The positions-table ``(hash, move, game_id, ply)`` rows for one game;
+    *keys* are its ``position_keys``, when already computed.
+    """
+    if keys is None:
+        keys = position_keys(ucis)
+    return [(h, m, game_id, ply) for h, m, ply in keys]
+
+
+def index_game(item):
+    """
+    Worker for the positions backfill (runs in a process pool).
+
+    Parameters
+    ----------
+    item : (game_id, pgn, moves) — pgn as stored, moves the packed move
+           list or None
+
+    Returns
+    -------
+    (game_id, ucis | None, rows) — *ucis* is set when the moves had to be
+    parsed from the PGN, so the caller can store the packed list too.  A
+    game ``game_ucis`` cannot replay gets neither a list nor any rows.
+    """
+    game_id, pgn, moves = item
+    if moves is not None:
+        ucis = unpack_moves(moves)
+        return game_id, None, position_rows(game_id, ucis)
+    parsed = game_ucis(pgn)
+    if parsed is None:
+        return game_id, None, []
+    return game_id, parsed, position_rows(game_id, parsed)
@@ -0,0 +1,199 @@
+# ═══════════════════════════════════════════════════════════
+#  writer.py — Write-behind queue for game persistence
+# ═══════════════════════════════════════════════════════════
+
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+_STOP = object()
+
+
+class _Job:
+    """One queued unit of work: a write (*apply* set) or a flush barrier."""
+
+    __slots__ = ('apply', 'future', 'date_str', 'time_str')
+
+    def __init__(self, apply, future, date_str=None, time_str=None):
+        self.apply    = apply
+        self.future   = future
+        self.date_str = date_str
+        self.time_str = time_str
+
+
+class GameWriter:
+    """
+    Background writer that owns a single SQLite connection and commits
+    queued games in grouped transactions.
+
+    A batch is committed when it reaches *batch_size* writes or
+    *flush_interval* seconds after its first write, whichever comes first.
+    ``flush()`` and ``close()`` commit everything queued before them, and
+    ``close()`` also runs at interpreter exit so queued games survive a
+    normal shutdown.
+
+    Every ``submit_*`` call returns a ``concurrent.futures.Future`` that
+    resolves to the ids the database assigned.
+
+    Parameters
+    ----------
+    db             : Database — supplies the connection and insert helpers
+    batch_size     : int      — max writes per transaction
+    flush_interval : float    — max seconds a write waits for company
+    """
+
+    def __init__(self, db, batch_size=64, flush_interval=0.25):
+        self.db             = db
+        self.batch_size     = batch_size
+        self.flush_interval = flush_interval
+        self._queue   = queue.Queue()
+        self._closed  = False
+        self._lock    = threading.Lock()
+        self._thread  = threading.Thread(target=self._run, name="GameWriter",
+                                         daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ── Public API ────────────────────────────────────────
+
+    def submit_game(self, white_name, black_name, result, reason,
+                    pgn, move_count, duration_sec, source='regular',
+                    moves=None):
+        """Queue a game for the games table.  Future → game_id."""
+        def apply(conn, date_str, time_str):
+            return self.db._insert_game(
+                conn, white_name, black_name, result, reason,
+                pgn, move_count, duration_sec, source, date_str, time_str,
+                moves=moves)
+        return self._submit(apply)
+
+    def submit_tournament_game(self, tournament_id, tournament_name, fmt,
+                               round_num, white_name, black_name, result,
+                               reason, pgn, move_count, duration_sec,
+                               opening=None, moves=None):
+        """Queue a tournament game.  Future → (game_id, tournament_game_id)."""
+        def apply(conn, date_str, time_str):
+            return self.db._insert_tournament_game(
+                conn, tournament_id, tournament_name, fmt, round_num,
+                white_name, black_name, result, reason, pgn,
+                move_count, duration_sec, opening, date_str, time_str,
+                moves=moves)
+        return self._submit(apply)
+
+    def flush(self, timeout=None):
+        """
+        Block until every write queued before this call is committed.
+
+        Returns True when flushed, False on timeout.
+        """
+        if not self._thread.is_alive():
+            return self._queue.empty()
+        fut = Future()
+        self._queue.put(_Job(None, fut))
+        try:
+            fut.result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self, timeout=10):
+        """Commit all queued writes and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+
+    @property
+    def pending(self):
+        """Approximate number of queued jobs not yet committed."""
+        return self._queue.qsize()
+
+    # ── Internals ─────────────────────────────────────────
+
+    def _submit(self, apply):
+        fut = Future()
+        with self._lock:
+            if self._closed:
+                fut.set_exception(RuntimeError("GameWriter is closed"))
+                return fut
+            # Timestamp at submit time, not commit time
+            date_str, time_str = self.db._timestamp()
+            self._queue.put(_Job(apply, fut, date_str, time_str))
+        return fut
+
+    def _run(self):
+        conn = self.db._open_connection()
+        try:
+            while True:
+                first = self._queue.get()
+                if first is _STOP:
+                    break
+                batch, stop = self._collect(first)
+                self._commit(conn, batch)
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _collect(self, first):
+        """Gather jobs after *first* until the batch is full, a barrier or
+        stop arrives, or the flush interval runs out."""
+        batch = [first]
+        if first.apply is None:
+            return batch, False
+        deadline = time.monotonic() + self.flush_interval
+        writes   = 1
+        while writes < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is _STOP:
+                return batch, True
+            batch.append(job)
+            if job.apply is None:
+                break
+            writes += 1
+        return batch, False
+
+    def _commit(self, conn, batch):
+        writes = [j for j in batch if j.apply is not None]
+        if writes:
+            try:
+                conn.execute("BEGIN")
+                results = [j.apply(conn, j.date_str, j.time_str) for j in writes]
+                conn.commit()
+                for job, res in zip(writes, results):
+                    job.future.set_result(res)
+            except Exception as e:
+                conn.rollback()
+                self.db._forget_engine_ids()
+                print(f"[GameWriter] batch of {len(writes)} failed ({e}); "
+                      f"retrying one by one")
+                # Isolate the bad row so the rest of the batch still lands
+                for job in writes:
+                    try:
+                        conn.execute("BEGIN")
+                        res = job.apply(conn, job.date_str, job.time_str)
+                        conn.commit()
+                        job.future.set_result(res)
+                    except Exception as e2:
+                        conn.rollback()
+                        self.db._forget_engine_ids()
+                        print(f"[GameWriter] write error: {e2}")
+                        job.future.set_exception(e2)
+        for job in batch:
+            if job.apply is None:
+                job.future.set_result(True)
@@ -4,6 +4,7 @@
 #  Run:  python main.py
 # ═══════════════════════════════════════════════════════════
 
+import multiprocessing
 import tkinter as tk
 from ui.loading_screen import LoadingScreen
 
@@ -19,4 +20,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()   # process pools in frozen builds
     main()
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# Make the top-level packages (core, data, …) importable under plain `pytest`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.database import Database    # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh Database in a temporary directory, closed after the test."""
+    database = Database(str(tmp_path / "arena.db"))
+    yield database
+    database.close()
@@ -0,0 +1,59 @@
+# ═══════════════════════════════════════════════════════════
+#  test_codecs.py — PGN blob and packed move-list round trips
+# ═══════════════════════════════════════════════════════════
+
+import pytest
+
+from core.movecodec import decode_move, encode_move, pack_moves, unpack_moves
+from data.pgn_codec import FORMAT_V1, compress_pgn, decompress_pgn
+
+PGN = ('[Event "Engine Match"]\n[Site "Chess Engine Arena"]\n'
+       '[White "Stockfish"]\n[Black "Komodo"]\n[Result "1/2-1/2"]\n\n'
+       '1. e4 {+0.30/20 0.5s} c5 2. Nf3 d6 3. d4 cxd4 4. Nxd4 Nf6 '
+       '5. Nc3 a6 6. Be3 e5 7. Nb3 Be6 8. f3 Be7 9. Qd2 O-O 10. O-O-O 1/2-1/2')
+
+
+def test_pgn_round_trip():
+    blob = compress_pgn(PGN)
+    assert blob[0] == FORMAT_V1
+    assert len(blob) < len(PGN.encode('utf-8'))
+    assert decompress_pgn(blob) == PGN
+
+
+def test_pgn_non_ascii_round_trip():
+    text = '[White "Stockfish ♞"]\n[Black "Léa"]\n\n1. e4 1-0'
+    assert decompress_pgn(compress_pgn(text)) == text
+
+
+def test_decompress_accepts_legacy_values():
+    assert decompress_pgn(PGN) == PGN          # plain text rows
+    assert decompress_pgn(None) == ''
+    assert decompress_pgn(b'') == ''
+    assert decompress_pgn(compress_pgn('')) == ''
+
+
+def test_decompress_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        decompress_pgn(bytes((FORMAT_V1 + 1,)) + b'\x00')
+
+
+def test_move_codes():
+    for uci in ('a1a1', 'e2e4', 'h8a1', 'e1g1', 'e7e8q', 'b2a1n', 'g7g8r', 'c2c1b'):
+        assert decode_move(encode_move(uci)) == uci
+    assert encode_move('a1a1') == 0                  # the "no move" code
+    assert encode_move('e7e8Q') == encode_move('e7e8q')
+
+
+def test_pack_round_trip():
+    ucis = ['e2e4', 'e7e5', 'g1f3', 'b8c6', 'e1g1', 'a7a8q', 'h2h1n']
+    blob = pack_moves(ucis)
+    assert len(blob) == 2 * len(ucis)
+    assert blob[:2] == encode_move('e2e4').to_bytes(2, 'little')
+    assert unpack_moves(blob) == ucis
+    assert unpack_moves(memoryview(blob)) == ucis
+
+
+def test_pack_empty():
+    assert pack_moves([]) == b''
+    assert unpack_moves(b'') == []
+    assert unpack_moves(None) == []
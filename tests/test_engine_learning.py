@@ -0,0 +1,53 @@
+# ═══════════════════════════════════════════════════════════
+#  test_engine_learning.py — Stockfish keys and learning-file probes
+# ═══════════════════════════════════════════════════════════
+
+import os
+import shutil
+
+from core.board import Board
+from core.engine_learning import EngineLearningFile, stockfish_key
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Rio Gambit line of the bundled Artemis.learn: (moves played, learned reply)
+RIO_GAMBIT = [
+    ('e2e4',                                         'e7e5'),
+    ('e2e4 e7e5 g1f3',                               'b8c6'),
+    ('e2e4 e7e5 g1f3 b8c6 f1b5',                     'g8f6'),
+    ('e2e4 e7e5 g1f3 b8c6 f1b5 g8f6 e1g1',           'f6e4'),
+    ('e2e4 e7e5 g1f3 b8c6 f1b5 g8f6 e1g1 f6e4 f1e1', 'e4d6'),
+]
+
+
+def _fen(moves):
+    board = Board()
+    for uci in moves.split():
+        board.apply_uci(uci)
+    return board.to_fen()
+
+
+def test_stockfish_start_key():
+    # "Key: 8F8F01D4562F59FB" in Stockfish's `d` output for startpos
+    assert stockfish_key(Board().to_fen()) == 0x8F8F01D4562F59FB
+
+
+def test_en_passant_only_counts_when_capturable():
+    # After 1.e4 no black pawn can take on e3: same key as without the ep square
+    fen = _fen('e2e4')
+    assert ' e3 ' in fen
+    assert stockfish_key(fen) == stockfish_key(fen.replace(' e3 ', ' - '))
+    fen = _fen('e2e4 g8f6 e4e5 d7d5')
+    assert stockfish_key(fen) != stockfish_key(fen.replace(' d6 ', ' - '))
+
+
+def test_probe_bundled_learn_file(tmp_path):
+    path = str(tmp_path / 'Artemis.learn')
+    shutil.copy(os.path.join(ROOT, 'Artemis.learn'), path)
+    learn = EngineLearningFile(path)
+    try:
+        for moves, reply in RIO_GAMBIT:
+            assert learn.probe(_fen(moves)) == reply
+        assert learn.probe(Board().to_fen()) is None
+    finally:
+        learn.close()
@@ -0,0 +1,23 @@
+# ═══════════════════════════════════════════════════════════
+#  test_query_plans.py — Public queries must be served by an index
+# ═══════════════════════════════════════════════════════════
+
+import re
+
+# "SCAN <table>" with no index; subquery, co-routine and FTS virtual-table
+# steps are not table scans
+_BARE_SCAN = re.compile(r"^SCAN (?!\(|CONSTANT ROW)(\w+)(?!.*\b(INDEX|VIRTUAL TABLE)\b)")
+
+
+def test_no_unindexed_queries(db):
+    plans = db.explain_query_plans()
+    assert plans.pop('_unindexed') == []
+    assert plans
+
+
+def test_no_bare_table_scans(db):
+    plans = db.explain_query_plans()
+    plans.pop('_unindexed')
+    scans = {name: step for name, detail in plans.items()
+             for step in detail if _BARE_SCAN.match(step)}
+    assert scans == {}
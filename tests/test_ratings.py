@@ -0,0 +1,67 @@
+# ═══════════════════════════════════════════════════════════
+#  test_ratings.py — Elo service and maximum-likelihood ratings
+# ═══════════════════════════════════════════════════════════
+
+import math
+import random
+
+import pytest
+
+from core.elo import EloService, compute_elo_ratings
+from core.ml_ratings import compute_ml_ratings, pair_results
+
+ENGINES = ['Stockfish', 'Komodo', 'Berserk', 'Ethereal (White)']
+
+
+def _save_games(db, n, seed):
+    rng = random.Random(seed)
+    for _ in range(n):
+        white, black = rng.sample(ENGINES, 2)
+        result = rng.choice(['1-0', '0-1', '1/2-1/2', '1-0', '*'])
+        db.save_game(white, black, result, 'Test', '1. e4 e5', 2, 1.0)
+
+
+def test_elo_service_matches_full_recompute(db):
+    _save_games(db, 40, seed=1)
+    service = EloService(db)
+    assert service.ratings() == compute_elo_ratings(db.get_all_games_for_elo())
+
+    # Incremental update with the games saved since
+    _save_games(db, 25, seed=2)
+    expected = compute_elo_ratings(db.get_all_games_for_elo())
+    assert service.ratings() == expected
+    # A new session resumes from the stored snapshot
+    assert EloService(db).ratings() == expected
+    assert 'Ethereal' in expected
+
+
+def test_bradley_terry_two_engines():
+    # 3 wins out of 4: the rating gap is 400·log10(3)
+    fit = compute_ml_ratings({('a', 'b'): [3, 0, 1]}, draws=False, prior=0.0)
+    gap = 400 * math.log10(3)
+    assert fit['ratings']['a'] == pytest.approx(1500 + gap / 2, abs=0.01)
+    assert fit['ratings']['b'] == pytest.approx(1500 - gap / 2, abs=0.01)
+    assert fit['draw_param'] == 0.0
+
+
+def test_davidson_fits_the_draw_rate():
+    # Equal engines, a third of the games drawn: ν / (2 + ν) = 1/3
+    fit = compute_ml_ratings({('a', 'b'): [2, 2, 2]}, draws=True, prior=0.0)
+    assert fit['ratings']['a'] == pytest.approx(1500, abs=0.01)
+    assert fit['ratings']['b'] == pytest.approx(1500, abs=0.01)
+    assert fit['draw_param'] == pytest.approx(1.0, abs=1e-4)
+    assert fit['errors']['a'] > 0
+
+
+def test_ml_ratings_ignore_game_order_and_colour():
+    games = [('a', 'b', '1-0'), ('b', 'c', '1/2-1/2'), ('c', 'a', '0-1'),
+             ('b', 'a', '1-0'), ('c', 'b', '0-1'), ('a', 'c', '1/2-1/2')]
+    table = pair_results(games)
+    assert table[('a', 'b')] == [1, 0, 1]
+    assert table[('a', 'c')] == [1, 1, 0]
+    first = compute_ml_ratings(table)['ratings']
+    again = compute_ml_ratings(pair_results(reversed(games)))['ratings']
+    for name in first:
+        assert again[name] == pytest.approx(first[name], abs=1e-6)
+    assert sum(first.values()) / len(first) == pytest.approx(1500)
+    assert first['a'] > first['c']
@@ -0,0 +1,76 @@
+# ═══════════════════════════════════════════════════════════
+#  test_writer.py — Write-behind GameWriter
+# ═══════════════════════════════════════════════════════════
+
+import os
+import subprocess
+import sys
+import textwrap
+
+from data.database import Database
+from data.writer import GameWriter
+
+PGN = '[White "A"]\n[Black "B"]\n[Result "1-0"]\n\n1. e4 e5 1-0'
+
+
+def _submit(writer, white='A', black='B', result='1-0'):
+    return writer.submit_game(white, black, result, 'Checkmate', PGN, 2, 1.0)
+
+
+def test_futures_resolve_to_assigned_ids(db):
+    writer = GameWriter(db)
+    futures = [_submit(writer, white=f"E{i}") for i in range(5)]
+    tfut = writer.submit_tournament_game('t1', 'Cup', 'round_robin', 1,
+                                         'A', 'B', '0-1', 'Resign', PGN, 2, 1.0)
+    assert writer.flush(timeout=10)
+    with db._conn() as conn:
+        ids = [r[0] for r in conn.execute("SELECT id FROM games ORDER BY id")]
+        tg  = conn.execute("SELECT game_id, id FROM tournament_games").fetchone()
+    assert [f.result() for f in futures] + [tg[0]] == ids
+    assert tfut.result() == tuple(tg)
+    writer.close()
+
+
+def test_flush_is_a_barrier(db):
+    # Without the barrier these writes would wait a minute for company
+    writer = GameWriter(db, batch_size=1000, flush_interval=60)
+    futures = [_submit(writer) for _ in range(3)]
+    assert not any(f.done() for f in futures)
+    assert writer.flush(timeout=10)
+    assert all(f.done() for f in futures)
+    assert db.count_games() == 3
+    writer.close()
+
+
+def test_failed_batch_is_retried_row_by_row(db):
+    writer = GameWriter(db, batch_size=1000, flush_interval=60)
+    good1 = _submit(writer)
+    bad   = _submit(writer, result=None)    # games.result is NOT NULL
+    good2 = _submit(writer)
+    assert writer.flush(timeout=10)
+    assert isinstance(bad.exception(), Exception)
+    assert good1.result() and good2.result() and good1.result() != good2.result()
+    assert db.count_games() == 2
+    writer.close()
+
+
+def test_exit_drains_the_queue(tmp_path):
+    path = str(tmp_path / "arena.db")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {root!r})
+        from data.database import Database
+        from data.writer import GameWriter
+        writer = GameWriter(Database({path!r}), batch_size=1000, flush_interval=60)
+        for _ in range(20):
+            writer.submit_game('A', 'B', '1-0', 'Checkmate', {PGN!r}, 2, 1.0)
+        # no flush / close: the atexit hook must commit the queue
+    """)
+    subprocess.run([sys.executable, "-c", script], check=True, timeout=60,
+                   capture_output=True)
+    db = Database(path)
+    try:
+        assert db.count_games() == 20
+    finally:
+        db.close()
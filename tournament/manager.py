@@ -7,7 +7,6 @@ from tkinter import ttk, messagebox, filedialog, scrolledtext
 import threading
 import time
 import random
-import sqlite3
 import os
 import math
 from datetime import datetime
@@ -21,9 +20,14 @@ from core.constants import (
 )
 from core.utils import normalize_engine_name, build_pgn, get_tier
 from core.board import Board
+from core.movecodec import unpack_moves
+from core.pgn import san_moves
 from core.engine import UCIEngine, AnalyzerEngine
-from core.elo import compute_elo_ratings
+from core.engine_learning import EngineLearningFile
+from core.live_analysis import ANALYSIS_MODES, AnalysisPipeline
 from data.database import Database
+from data.pgn_export import write_pgns
+from ui.dialogs import ask_pgn_export_options
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -122,6 +126,35 @@ class LoadingOverlay:
             pass
 
 
+_PGN_FILETYPES = [("PGN files", "*.pgn"), ("Gzipped PGN", "*.pgn.gz"),
+                  ("All", "*.*")]
+
+
+def export_pgn_async(parent: tk.Widget, path: str, export_fn):
+    """
+    Run a streaming PGN export off-thread behind a LoadingOverlay.
+
+    *export_fn(on_progress)* does the work (``Database.export_pgn`` or
+    ``write_pgns``) and returns the number of games written.
+    """
+    overlay = LoadingOverlay(parent, "Exporting games…")
+    overlay.show()
+
+    def _progress(done, total):
+        msg = f"Exporting games… {done} / {total}" if total else f"Exporting games… {done}"
+        parent.after(0, overlay.update_message, msg)
+
+    fetch_async(
+        parent   = parent,
+        work_fn  = lambda: export_fn(_progress),
+        done_fn  = lambda n: messagebox.showinfo(
+            "Export PGN", f"Exported {n} games to:\n{path}", parent=parent),
+        overlay  = overlay,
+        error_fn = lambda e: messagebox.showerror("Export failed", str(e),
+                                                  parent=parent),
+    )
+
+
 def fetch_async(parent: tk.Widget,
                 work_fn,
                 done_fn,
@@ -177,8 +210,7 @@ def _get_elo_map(db) -> dict:
     if db is None:
         return {}
     try:
-        games_raw = db.get_all_games_for_elo()
-        return compute_elo_ratings(games_raw)
+        return db.ratings.ratings()
     except Exception as e:
         print(f"[Elo] Could not load ratings: {e}")
         return {}
@@ -276,8 +308,13 @@ def _parse_db_rows(tournament_id: str, rows: list):
         g.duration   = row.get("duration_sec") or 0
         g.opening    = row.get("opening", "")
         g.status     = "done"
+        g.game_id    = row.get("game_id")
 
-        if g.pgn and _Board is not None:
+        if row.get("moves") is not None:
+            # Packed move list: replayed lazily by TournamentGame.move_history
+            g.packed_moves  = row["moves"]
+            g._move_history = None
+        elif g.pgn and _Board is not None:
             try:
                 b     = _Board()
                 body  = _re.sub(r'\[.*?\]\s*', '', g.pgn, flags=_re.DOTALL)
@@ -445,11 +482,30 @@ class TournamentGame:
         self.duration     = 0
         self.opening      = ""
         self.status       = "pending"
-        self.move_history = []
+        self.game_id      = None    # games.id once loaded from / saved to the DB
+        self.packed_moves = None    # stored move list, replayed on first access
+        self._move_history = []
         self.eval_history = []
         self.move_qualities = []  # Store move quality classifications
         self.id           = id(self)
 
+    @property
+    def move_history(self):
+        # Games reopened from the database keep only their packed move list
+        # until someone actually looks at the moves
+        if self._move_history is None:
+            try:
+                board = Board().replay_moves(unpack_moves(self.packed_moves),
+                                             san_moves(self.pgn))
+                self._move_history = board.move_history
+            except Exception:
+                self._move_history = []
+        return self._move_history
+
+    @move_history.setter
+    def move_history(self, value):
+        self._move_history = value
+
     @property
     def white_score(self):
         if self.result == '1-0':      return 1.0
@@ -597,7 +653,8 @@ class Tournament:
 
     def __init__(self, name, fmt, players, rounds, movetime_ms=1000,
                 double_rr=False, delay=0.3, analyzer_path=None,
-                opening_book=None):
+                opening_book=None, analysis_mode='live', analysis_budget=0.25,
+                learning_file=None):
         self.name          = name
         self.format        = fmt
         self.players       = {p.name: p for p in players}
@@ -608,6 +665,9 @@ class Tournament:
         self.delay         = delay
         self.analyzer_path = analyzer_path
         self.opening_book  = opening_book
+        self.analysis_mode   = analysis_mode      # ANALYSIS_MODES key
+        self.analysis_budget = analysis_budget    # CPU share in 'budget' mode
+        self.learning_file   = learning_file      # .learn / .exp path, probed before the book
 
         self.current_round = 0
         self.all_games     = []
@@ -699,8 +759,10 @@ class Tournament:
         game.duration     = duration
         game.opening      = opening or ""
         game.move_history = move_history
-        game.eval_history = eval_history or []
-        game.move_qualities = move_qualities or []
+        # May be the game's own lists, still being filled by the analysis
+        # pipeline, so they are kept rather than copied
+        game.eval_history = eval_history if eval_history is not None else []
+        game.move_qualities = move_qualities if move_qualities is not None else []
         game.status       = "done"
 
         pair_key = frozenset({game.white.name, game.black.name})
@@ -985,6 +1047,7 @@ class MiniBoardWidget(tk.Frame):
         self._last_move    = None
         self._in_replay    = False
         self._replay_moves = []
+        self._replay_history = []
         self._replay_idx   = 0
         self._replay_board = None
         self._replay_evals = []
@@ -1047,6 +1110,9 @@ class MiniBoardWidget(tk.Frame):
                 self.eval_bar.set_eval(eval_cp, eval_mate)
 
     def set_replay(self, move_history, eval_history=None, move_qualities=None):
+        # (uci, san, fen_after) per ply: every step is drawn from its stored
+        # FEN instead of replaying the game up to it
+        self._replay_history = list(move_history)
         self._replay_moves = [m[0] for m in move_history]
         self._replay_evals = eval_history or []
         self._replay_qualities = move_qualities or []
@@ -1073,9 +1139,13 @@ class MiniBoardWidget(tk.Frame):
                 return
         b = _Board()
         moves = self._replay_moves[:self._replay_idx]
-        for uci in moves:
-            try: b.apply_uci(uci)
-            except: break
+        if moves:
+            try: b._load_fen(self._replay_history[len(moves) - 1][2])
+            except Exception:
+                b = _Board()
+                for uci in moves:
+                    try: b.apply_uci(uci)
+                    except: break
         last = moves[-1] if moves else None
         self._draw_from_board(b, last)
         if self.eval_bar is not None:
@@ -1102,16 +1172,7 @@ class MiniBoardWidget(tk.Frame):
         
         if n > 0:
             san = ""
-            try:
-                tmp = _Board()
-                for uci in self._replay_moves[:n-1]:
-                    tmp.apply_uci(uci)
-                legal = tmp.legal_moves()
-                uci_now = self._replay_moves[n-1]
-                fc = ord(uci_now[0])-ord('a'); fr = 8-int(uci_now[1])
-                tc = ord(uci_now[2])-ord('a'); tr = 8-int(uci_now[3])
-                promo = uci_now[4].lower() if len(uci_now)>4 else None
-                san = tmp._build_san(fr,fc,tr,tc,promo,legal)
+            try: san = self._replay_history[n-1][1].rstrip('+#')
             except: pass
             side = "White" if n%2==1 else "Black"
             self.move_lbl.config(
@@ -1162,7 +1223,7 @@ class MiniBoardWidget(tk.Frame):
 class TournamentRunner:
     def __init__(self, tournament: Tournament, on_game_start,
                 on_board_update, on_game_end, on_round_end,
-                on_tournament_end, on_status):
+                on_tournament_end, on_status, on_eval=None, eval_cache=None):
         self.t               = tournament
         self.on_game_start   = on_game_start
         self.on_board_update = on_board_update
@@ -1170,12 +1231,14 @@ class TournamentRunner:
         self.on_round_end    = on_round_end
         self.on_tournament_end = on_tournament_end
         self.on_status       = on_status
+        self.on_eval         = on_eval    # (game, ply, cp, mate, quality)
+        self.eval_cache      = eval_cache
         self._stop_flag      = False
         self._pause_flag     = False
         self._thread         = None
         self.current_engines = []
-        self._analyzer       = None
-        self._analyzer_is_external = False
+        self._analysis       = None    # AnalysisPipeline
+        self._learning       = None    # EngineLearningFile
 
     def start(self):
         self._stop_flag  = False
@@ -1187,6 +1250,12 @@ class TournamentRunner:
     def resume(self): self._pause_flag = False
     def stop(self):   self._stop_flag = True; self._pause_flag = False
 
+    @property
+    def running(self):
+        """True while games are being played (not paused, stopped or done)."""
+        return (self._thread is not None and self._thread.is_alive()
+                and not self._pause_flag and not self._stop_flag)
+
     def _run(self):
         analyzer_ref = self.t.analyzer_path
         if analyzer_ref is not None and AnalyzerEngine is not None:
@@ -1202,13 +1271,18 @@ class TournamentRunner:
             if analyzer_path and os.path.isfile(analyzer_path):
                 try:
                     # Always create a NEW analyzer instance for the tournament
-                    # This prevents conflicts with the main GUI's analyzer
-                    self._analyzer = AnalyzerEngine(analyzer_path, "TournamentAnalyzer")
-                    self._analyzer.start()
-                    self._analyzer_is_external = False
-                    self.on_status(f"🔍 Analyzer ready: {os.path.basename(analyzer_path)}")
+                    # This prevents conflicts with the main GUI's analyzer.
+                    # It runs beside the move loop, which never waits for it.
+                    mode = getattr(self.t, 'analysis_mode', 'live')
+                    self._analysis = AnalysisPipeline(
+                        analyzer_path, mode=mode,
+                        cpu_budget=getattr(self.t, 'analysis_budget', 0.25),
+                        on_eval=self._on_eval, cache=self.eval_cache)
+                    self._analysis.start()
+                    self.on_status(f"🔍 Analyzer ready: {os.path.basename(analyzer_path)}"
+                                   f"  ·  {ANALYSIS_MODES[mode]}")
                 except Exception as e:
-                    self._analyzer = None
+                    self._analysis = None
                     self.on_status(f"⚠ Analyzer failed to start: {e}")
             elif analyzer_path:
                 self.on_status(f"⚠ Analyzer path not found: {analyzer_path}")
@@ -1218,6 +1292,16 @@ class TournamentRunner:
             # No analyzer attached
             self.on_status("ℹ️ No analyzer attached — eval data will not be recorded")
 
+        learning_path = getattr(self.t, 'learning_file', None)
+        if learning_path:
+            try:
+                self._learning = EngineLearningFile(learning_path)
+                self.on_status(f"🧠 Learning file: {os.path.basename(learning_path)}"
+                               f"  ·  {len(self._learning)} records")
+            except Exception as e:
+                self._learning = None
+                self.on_status(f"⚠ Learning file unavailable: {e}")
+
         if not self.t.started:
             self.t.start()
 
@@ -1242,9 +1326,12 @@ class TournamentRunner:
             if self._stop_flag:
                 break
 
-        if self._analyzer and not self._analyzer_is_external:
-            try: self._analyzer.stop()
+        if self._analysis:
+            # A finished tournament still gets its last games analysed
+            try: self._analysis.close(drain=self.t.finished)
             except: pass
+        if self._learning:
+            self._learning.close()
 
         if self.t.finished:
             self.on_tournament_end(self.t)
@@ -1310,13 +1397,18 @@ class TournamentRunner:
         board        = _Board()
         last_move    = None
         start_t      = time.time()
-        eval_history = []
-        move_qualities = []  # Track move quality classifications
+        # Filled in by _on_eval as the analysis pipeline catches up
+        game.eval_history   = eval_history   = []
+        game.move_qualities = move_qualities = []
+        analysis     = self._analysis
+        if analysis:
+            analysis.submit(game, 0, "")
         opening_name = None
         result       = None
         reason       = ""
 
         book = self.t.opening_book
+        learning = self._learning
         book_moves_used = 0
         MAX_BOOK_MOVES  = 20
 
@@ -1348,8 +1440,12 @@ class TournamentRunner:
             except Exception:
                 legal_ucis = None
 
-            if book is not None and book_moves_used < MAX_BOOK_MOVES:
-                raw = self._book_probe(book, board)
+            if book_moves_used < MAX_BOOK_MOVES:
+                # The engine's learned moves come before the shared book
+                raw = None
+                for source in (learning, book):
+                    if source is not None and not raw:
+                        raw = self._book_probe(source, board)
                 if raw:
                     raw_norm = raw.strip().lower()
                     if legal_ucis is None or raw_norm in legal_ucis:
@@ -1395,55 +1491,15 @@ class TournamentRunner:
                 if found_name:
                     opening_name = found_name
 
-            cp_val   = None
-            mate_val = None
-            quality  = None
-            if self._analyzer:
-                try:
-                    mvs_for_eval = board.uci_moves_str() if hasattr(board, 'uci_moves_str') else ""
-                    if hasattr(self._analyzer, 'eval_position'):
-                        cp_val, score_type = self._analyzer.eval_position(
-                            mvs_for_eval, movetime_ms=150)
-                        if cp_val is not None:
-                            if score_type == 'mate':
-                                mate_val = cp_val // 30000 if cp_val != 0 else 0
-                            eval_history.append(cp_val)
-                            # Classify move quality based on eval change
-                            if len(eval_history) >= 2:
-                                cp_before = eval_history[-2]
-                                cp_after  = eval_history[-1]
-                                is_white  = not is_white_turn  # Previous move was opposite color
-                                try:
-                                    from core.utils import classify_move_quality
-                                    quality = classify_move_quality(cp_before, cp_after, is_white)
-                                except ImportError:
-                                    pass
-                            move_qualities.append(quality)
-                    elif hasattr(self._analyzer, 'get_eval'):
-                        cp_val = self._analyzer.get_eval(mvs_for_eval, movetime_ms=150)
-                        if cp_val is not None:
-                            eval_history.append(cp_val)
-                            # Classify move quality based on eval change
-                            if len(eval_history) >= 2:
-                                cp_before = eval_history[-2]
-                                cp_after  = eval_history[-1]
-                                is_white  = not is_white_turn
-                                try:
-                                    from core.utils import classify_move_quality
-                                    quality = classify_move_quality(cp_before, cp_after, is_white)
-                                except ImportError:
-                                    pass
-                            move_qualities.append(quality)
-                except Exception:
-                    pass
-            
-            # If no analyzer or no quality computed, add None placeholder
-            if quality is None and len(move_qualities) < len(board.move_history):
-                move_qualities.append(None)
+            if analysis:
+                analysis.submit(game, len(board.move_history), board.uci_moves_str())
 
-            self.on_board_update(game, board, last_move, cp_val, mate_val, opening_name)
+            self.on_board_update(game, board, last_move, None, None, opening_name)
             time.sleep(max(0.02, self.t.delay))
 
+        if analysis:
+            analysis.end_game(game)
+
         if not result:
             over, result, reason, winner_color = board.game_result()
             if not result:
@@ -1464,6 +1520,21 @@ class TournamentRunner:
         self._kill(e_white, e_black)
         self.on_game_end(game)
 
+    def _on_eval(self, game, ply, cp, score_type, quality):
+        """AnalysisPipeline callback (analyzer thread): store and forward."""
+        if ply == 0:
+            return    # start position: only the baseline for move 1's quality
+        if cp is not None:
+            game.eval_history.append(cp)
+        while len(game.move_qualities) < ply:
+            game.move_qualities.append(None)
+        game.move_qualities[ply - 1] = quality
+        mate = None
+        if cp is not None and score_type == 'mate':
+            mate = 1 if cp > 0 else -1
+        if self.on_eval:
+            self.on_eval(game, ply, cp, mate, quality)
+
     def _book_probe(self, book, board):
         import re
         _UCI_RE = re.compile(r'^[a-h][1-8][a-h][1-8][qrbnQRBN]?$')
@@ -1823,22 +1894,19 @@ class TournamentHistoryWindow:
             messagebox.showinfo("Export PGN", "No completed games to export.",
                                 parent=self.win)
             return
+        _, options = ask_pgn_export_options(self.win, show_filters=False)
+        if options is None:
+            return
         path = filedialog.asksaveasfilename(
             parent=self.win,
             title="Save PGN",
             defaultextension=".pgn",
-            filetypes=[("PGN files","*.pgn"),("All","*.*")],
+            filetypes=_PGN_FILETYPES,
             initialfile=f"{self.t.name.replace(' ','_')}.pgn")
         if not path: return
-        try:
-            with open(path, 'w', encoding='utf-8') as f:
-                for g in games:
-                    if g.pgn:
-                        f.write(g.pgn + "\n\n")
-            messagebox.showinfo("Export PGN",
-                f"Exported {len(games)} games to:\n{path}", parent=self.win)
-        except Exception as e:
-            messagebox.showerror("Export failed", str(e), parent=self.win)
+        export_pgn_async(self.win, path, lambda cb: write_pgns(
+            path, (g.pgn for g in games), total=len(games),
+            on_progress=cb, **options))
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -1880,7 +1948,8 @@ class TournamentSetupDialog:
             return f"✓  {os.path.basename(b._path)}"
         n = getattr(b, '_entries', None)
         count = f" ({len(n)} openings)" if n is not None else ""
-        return f"✓  Opening book loaded{count}"
+        learned = " + learned book" if getattr(b, 'learned', None) else ""
+        return f"✓  Opening book loaded{count}{learned}"
 
     def _build(self):
         self.dialog = tk.Toplevel(self.root)
@@ -2026,6 +2095,48 @@ class TournamentSetupDialog:
                 bg=PANEL_BG, fg=book_color,
                 font=('Consolas', 8), anchor='w').pack(side='left')
 
+        learn_row = tk.Frame(res_frame, bg=PANEL_BG)
+        learn_row.pack(fill='x', padx=10, pady=(0,6))
+        tk.Label(learn_row, text="🧠 Learning File:",
+                bg=PANEL_BG, fg="#888",
+                font=('Segoe UI',8), width=16, anchor='w').pack(side='left')
+        self.learning_var = tk.StringVar()
+        tk.Entry(learn_row, textvariable=self.learning_var,
+                bg=LOG_BG, fg="#888", font=('Consolas',8),
+                width=28, relief='flat',
+                insertbackground=TEXT).pack(side='left', padx=4, ipady=2)
+        def _browse_learning():
+            p = filedialog.askopenfilename(
+                parent=self.dialog, title="Select Engine Learning File",
+                filetypes=[("Engine learning", "*.learn *.exp"), ("All","*.*")])
+            if p:
+                self.learning_var.set(p)
+        tk.Button(learn_row, text="...", command=_browse_learning,
+                bg=BTN_BG, fg=TEXT, relief='flat',
+                font=('Segoe UI',8), padx=5, pady=1,
+                cursor='hand2').pack(side='left', padx=2)
+
+        mode_row = tk.Frame(res_frame, bg=PANEL_BG)
+        mode_row.pack(fill='x', padx=10, pady=(0,6))
+        tk.Label(mode_row, text="⏱ Analysis:",
+                bg=PANEL_BG, fg="#888",
+                font=('Segoe UI',8), width=16, anchor='w').pack(side='left')
+        self._analysis_modes = {label: mode for mode, label in ANALYSIS_MODES.items()}
+        self.analysis_var = tk.StringVar(value=ANALYSIS_MODES['live'])
+        ttk.Combobox(mode_row, textvariable=self.analysis_var,
+                    values=list(self._analysis_modes),
+                    state='readonly', width=20,
+                    font=('Segoe UI',8)).pack(side='left')
+        tk.Label(mode_row, text="  CPU budget (%):",
+                bg=PANEL_BG, fg="#888",
+                font=('Segoe UI',8)).pack(side='left')
+        self.analysis_budget_var = tk.IntVar(value=25)
+        tk.Spinbox(mode_row, from_=5, to=100, increment=5,
+                textvariable=self.analysis_budget_var,
+                width=4, bg=LOG_BG, fg=TEXT,
+                buttonbackground=BTN_BG,
+                font=('Consolas',8), relief='flat').pack(side='left', padx=4)
+
         tk.Frame(self.dialog, bg='#2a2a4a', height=1).pack(fill='x', padx=20, pady=4)
 
         tk.Label(self.dialog, text="Engine Participants:",
@@ -2175,6 +2286,12 @@ class TournamentSetupDialog:
                 "Please add at least 2 valid engines.", parent=self.dialog)
             return
 
+        learning_file = self.learning_var.get().strip() or None
+        if learning_file and not os.path.isfile(learning_file):
+            messagebox.showerror("Error",
+                f"Learning file not found:\n{learning_file}", parent=self.dialog)
+            return
+
         fmt    = self.fmt_var.get()
         rounds = self.rounds_var.get()
         if fmt == Tournament.FORMAT_KNOCKOUT:
@@ -2190,6 +2307,9 @@ class TournamentSetupDialog:
             delay         = self.delay_var.get(),
             analyzer_path = self._resolve_analyzer(),
             opening_book  = self._attached_book,
+            analysis_mode   = self._analysis_modes[self.analysis_var.get()],
+            analysis_budget = self.analysis_budget_var.get() / 100,
+            learning_file   = learning_file,
         )
         self.dialog.destroy()
 
@@ -2991,6 +3111,19 @@ class TournamentWindow:
                 self._last_opening_in_log = opening_name
                 self._update_opening_in_log(opening_name)
 
+    def _cb_eval(self, game, ply, eval_cp, eval_mate, quality):
+        self.win.after(0, self._on_eval_ui, game, eval_cp, eval_mate)
+
+    def _on_eval_ui(self, game, eval_cp, eval_mate):
+        # Evals arrive after their moves (post-game mode: after the game);
+        # only the game on the live board is drawn
+        if game is not self.current_game or eval_cp is None:
+            return
+        if self.mini_board.eval_bar is not None and not self.mini_board._in_replay:
+            self.mini_board.eval_bar.set_eval(eval_cp, eval_mate)
+        self._live_evals.append(eval_cp)
+        self.live_eval_graph.set_evals(self._live_evals)
+
     def _append_move(self, ply, san):
         self.move_log.config(state='normal')
         if ply % 2 == 1:
@@ -3018,7 +3151,17 @@ class TournamentWindow:
         self._refresh_history()
         if self.t.format == Tournament.FORMAT_KNOCKOUT:
             self.win.after(0, self._draw_bracket)
-        self._save_game_db(game)
+        future = self._save_game_db(game)
+        if future is None:
+            self._on_game_saved_ui()
+        else:
+            # Resolved on the writer thread; hop back to Tk before touching widgets
+            future.add_done_callback(
+                lambda f: self.win.after(0, self._on_game_saved_ui))
+
+    def _on_game_saved_ui(self):
+        if not self.win.winfo_exists():
+            return
         if self._history_win and self._history_win.win.winfo_exists():
             self._history_win._populate_game_list()
         # Refresh Elo off-thread (updates standings + badges when done)
@@ -3048,7 +3191,7 @@ class TournamentWindow:
         # Refresh final Elo off-thread, then show results
         fetch_async(
             parent  = self.win,
-            work_fn = lambda: _get_elo_map(self.db),
+            work_fn = self._load_elo_map,
             done_fn = lambda em: (
                 self.__dict__.update(_elo_map=em),
                 self._refresh_standings(),
@@ -3082,10 +3225,16 @@ class TournamentWindow:
         """Re-fetch Elo ratings in background and refresh standings when done."""
         fetch_async(
             parent  = self.win,
-            work_fn = lambda: _get_elo_map(self.db),
+            work_fn = self._load_elo_map,
             done_fn = self._on_elo_loaded,
         )
 
+    def _load_elo_map(self):
+        """Off-thread: wait for queued game writes, then compute ratings."""
+        if self.db is not None:
+            self.db.flush_writes(timeout=10)
+        return _get_elo_map(self.db)
+
     # ── Control buttons ───────────────────────────────────────────────────────
 
     def _start(self):
@@ -3100,8 +3249,17 @@ class TournamentWindow:
             on_round_end      = self._cb_round_end,
             on_tournament_end = self._cb_tournament_end,
             on_status         = self._cb_status,
+            on_eval           = self._cb_eval,
+            eval_cache        = self.db.eval_cache if self.db is not None else None,
         )
         self.runner.start()
+        if self.db is not None:
+            # Record each player's binary (hashing can take a moment)
+            players = [(p.name, p.engine_path) for p in self.t.player_list]
+            threading.Thread(
+                target=lambda: [self.db.register_engine(name, path=path)
+                                for name, path in players],
+                daemon=True).start()
         self._status(f"▶ Tournament started — {self.t.format}")
 
     def _pause(self):
@@ -3326,119 +3484,48 @@ class TournamentWindow:
     # ── DB persistence ────────────────────────────────────────────────────────
 
     def _save_game_db(self, game: TournamentGame):
+        """
+        Queue *game* on the database's write-behind writer.
+
+        Returns the writer's Future (→ (game_id, t_game_id)), or None when
+        there is nothing to save.  Never blocks the Tk thread.
+        """
         if not game.pgn:
-            return
+            return None
 
-        if self.db is not None:
-            game_id, t_game_id = self.db.save_tournament_game(
-                tournament_id   = self.t.tournament_id,
-                tournament_name = self.t.name,
-                fmt             = self.t.format,
-                round_num       = game.round_num,
-                white_name      = game.white.name,
-                black_name      = game.black.name,
-                result          = game.result or '*',
-                reason          = game.reason,
-                pgn             = game.pgn,
-                move_count      = game.move_count,
-                duration_sec    = game.duration,
-                opening         = game.opening or None,
-            )
-            if game_id:
+        if self.db is None:
+            if not self.db_path:
+                return None
+            self.db = Database(self.db_path)
+
+        future = self.db.writer.submit_tournament_game(
+            tournament_id   = self.t.tournament_id,
+            tournament_name = self.t.name,
+            fmt             = self.t.format,
+            round_num       = game.round_num,
+            white_name      = game.white.name,
+            black_name      = game.black.name,
+            result          = game.result or '*',
+            reason          = game.reason,
+            pgn             = game.pgn,
+            move_count      = game.move_count,
+            duration_sec    = game.duration,
+            opening         = game.opening or None,
+            moves           = [m[0] for m in game.move_history],
+        )
+
+        def _logged(f):
+            if f.exception() is None:
+                game_id, t_game_id = f.result()
+                game.game_id = game_id
                 print(f"[DB] Saved tournament game #{game_id} "
                       f"(t_game #{t_game_id}): "
                       f"{game.white.name} vs {game.black.name} → {game.result}")
             else:
                 print(f"[DB] Failed to save: "
-                      f"{game.white.name} vs {game.black.name}")
-            return
-
-        if not self.db_path:
-            return
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.execute("PRAGMA journal_mode=WAL")
-            cur = conn.cursor()
-
-            cur.execute('''
-                CREATE TABLE IF NOT EXISTS games (
-                    id                INTEGER PRIMARY KEY AUTOINCREMENT,
-                    white_engine      TEXT    NOT NULL,
-                    black_engine      TEXT    NOT NULL,
-                    result            TEXT    NOT NULL,
-                    reason            TEXT    NOT NULL,
-                    date              TEXT    NOT NULL,
-                    time              TEXT    NOT NULL,
-                    pgn               TEXT    NOT NULL,
-                    move_count        INTEGER,
-                    duration_seconds  INTEGER,
-                    source            TEXT    DEFAULT 'regular'
-                )
-            ''')
-            cur.execute('''
-                CREATE TABLE IF NOT EXISTS tournament_games (
-                    id              INTEGER PRIMARY KEY AUTOINCREMENT,
-                    game_id         INTEGER REFERENCES games(id) ON DELETE CASCADE,
-                    tournament_id   TEXT    NOT NULL,
-                    tournament_name TEXT    NOT NULL,
-                    format          TEXT    NOT NULL,
-                    round_num       INTEGER NOT NULL,
-                    white_engine    TEXT    NOT NULL,
-                    black_engine    TEXT    NOT NULL,
-                    result          TEXT    NOT NULL,
-                    reason          TEXT    NOT NULL,
-                    pgn             TEXT    NOT NULL,
-                    move_count      INTEGER,
-                    duration_sec    INTEGER,
-                    opening         TEXT,
-                    date            TEXT    NOT NULL,
-                    time            TEXT    NOT NULL
-                )
-            ''')
-            try:
-                cur.execute("ALTER TABLE games ADD COLUMN source TEXT DEFAULT 'regular'")
-            except sqlite3.OperationalError:
-                pass
-
-            now      = datetime.now()
-            date_str = now.strftime("%Y.%m.%d")
-            time_str = now.strftime("%H:%M:%S")
-
-            cur.execute('''
-                INSERT INTO games
-                    (white_engine, black_engine, result, reason,
-                     date, time, pgn, move_count, duration_seconds, source)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                normalize_engine_name(game.white.name),
-                normalize_engine_name(game.black.name),
-                game.result or '*', game.reason,
-                date_str, time_str,
-                game.pgn, game.move_count, game.duration,
-                'tournament',
-            ))
-            game_id = cur.lastrowid
-
-            cur.execute('''
-                INSERT INTO tournament_games
-                    (game_id, tournament_id, tournament_name, format,
-                     round_num, white_engine, black_engine, result, reason,
-                     pgn, move_count, duration_sec, opening, date, time)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                game_id,
-                self.t.tournament_id, self.t.name, self.t.format, game.round_num,
-                normalize_engine_name(game.white.name),
-                normalize_engine_name(game.black.name),
-                game.result or '*', game.reason,
-                game.pgn, game.move_count, game.duration,
-                game.opening or '',
-                date_str, time_str,
-            ))
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            print(f"[TournamentWindow._save_game_db fallback] {e}")
+                      f"{game.white.name} vs {game.black.name}: {f.exception()}")
+        future.add_done_callback(_logged)
+        return future
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -3474,6 +3561,11 @@ class TournamentManager:
     def get_window(self, tid: str) -> "TournamentWindow | None":
         return self._windows.get(tid)
 
+    def is_playing(self) -> bool:
+        """True while any open tournament window is playing games."""
+        return any(getattr(w, "runner", None) is not None and w.runner.running
+                   for w in list(self._windows.values()))
+
     @staticmethod
     def _make_entry(t: Tournament) -> dict:
         return {
@@ -3879,7 +3971,17 @@ class TournamentListWindow:
         overlay.show()
 
         def _work():
-            return _parse_db_rows(tournament_id, rows)
+            t = _parse_db_rows(tournament_id, rows)
+            # Games saved before move lists existed were just replayed from
+            # SAN; pack them so the next reopen skips that.  A replay that
+            # stopped early is not stored as if it were the whole game
+            unpacked = [(g.game_id, [m[0] for m in g.move_history])
+                        for g in t.all_games
+                        if g.game_id and g.packed_moves is None and g.move_history
+                        and len(g.move_history) == len(san_moves(g.pgn))]
+            if unpacked and self.db is not None:
+                self.db.save_move_lists(unpacked)
+            return t
 
         def _done(t):
             win = TournamentWindow(self.root, t, db=self.db, db_path=self.db_path)
@@ -3952,36 +4054,35 @@ class TournamentListWindow:
         self._refresh()
 
     def _export_all_pgn(self):
-        all_games = []
-        for entry in self.manager.get_all():
-            all_games.extend(entry["obj"].get_all_completed_games())
-
-        if not all_games:
-            messagebox.showinfo("Export PGN",
-                                "No completed games found across all tournaments.",
-                                parent=self.win)
+        if self.db is None:
+            games = [g for entry in self.manager.get_all()
+                     for g in entry["obj"].get_all_completed_games()]
+            if not games:
+                messagebox.showinfo("Export PGN",
+                                    "No completed games found across all tournaments.",
+                                    parent=self.win)
+                return
+        filters, options = ask_pgn_export_options(
+            self.win, show_filters=self.db is not None, source='tournament')
+        if options is None:
             return
 
         path = filedialog.asksaveasfilename(
             parent=self.win,
             title="Export All Games",
             defaultextension=".pgn",
-            filetypes=[("PGN files", "*.pgn"), ("All", "*.*")],
+            filetypes=_PGN_FILETYPES,
             initialfile=f"all_tournaments_{datetime.now().strftime('%Y%m%d_%H%M')}.pgn")
         if not path:
             return
-        try:
-            with open(path, 'w', encoding='utf-8') as f:
-                for g in all_games:
-                    if g.pgn:
-                        f.write(g.pgn + "\n\n")
-            n_t = len(self.manager.get_all())
-            messagebox.showinfo(
-                "Export PGN",
-                f"Exported {len(all_games)} games from {n_t} tournament(s):\n{path}",
-                parent=self.win)
-        except Exception as e:
-            messagebox.showerror("Export failed", str(e), parent=self.win)
+        if self.db is not None:
+            # Streamed from the database in chunks: constant memory
+            export_pgn_async(self.win, path, lambda cb: self.db.export_pgn(
+                path, filters, on_progress=cb, **options))
+        else:
+            export_pgn_async(self.win, path, lambda cb: write_pgns(
+                path, (g.pgn for g in games), total=len(games),
+                on_progress=cb, **options))
 
     def _poll(self):
         if not self.win.winfo_exists():
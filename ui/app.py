@@ -19,18 +19,22 @@ from core.constants import (
 )
 from core.utils import (
     normalize_engine_name, get_db_path, get_tier,
-    classify_move_quality, build_pgn, get_resource_path,
+    build_pgn, get_resource_path,
+    get_learned_book_path,
 )
-from core.elo import compute_elo_ratings
 from core.board import Board
 from core.engine import UCIEngine, AnalyzerEngine
+from core.batch_analysis import BatchAnalyzer
+from core.live_analysis import EvalChain
 from core.opening_book import OpeningBook
+from core.learned_book import LearnedBook, LearnedBookBuilder
 from data.database import Database
+from data.pgn_import import SKIP_SET_UP
 from ui.dialogs import ask_promotion, ask_stop_result, make_search_bar, ask_opening_choice
 from ui.views import (
     show_rankings, show_elo_history,
     show_statistics, show_game_history, show_pgn_viewer,
-    show_opening_stats,
+    show_opening_stats, show_learning_file, show_opening_explorer,
 )
 from ui.theme import (
     FONT_FAMILY, FONT_MONO, FONT_HEADING, FONT_BODY, FONT_SMALL,
@@ -76,7 +80,6 @@ class ChessGUI:
         self.engine1 = None
         self.engine2 = None
 
-        self._analyzer_lock = threading.Lock()
         self._last_eval_cp  = None
         self._last_quality  = None
         self._move_qualities = []
@@ -95,6 +98,9 @@ class ChessGUI:
             self.analyzer = preloaded_analyzer
         else:
             self.analyzer = None
+        # One worker evaluates the played moves on the analyzer, in order
+        self._eval_chain = EvalChain(on_eval=self._on_chain_eval,
+                                     on_quality=self._on_move_quality)
 
         # ── Tk variables ──────────────────────────────────
         self.e1_path   = tk.StringVar()
@@ -134,8 +140,16 @@ class ChessGUI:
 
         # ── Database / Tournament ─────────────────────────
         self.db = Database()
+        if self.analyzer:
+            self.analyzer.cache = self.db.eval_cache
         from tournament.manager import TournamentManager
         self._tournament_manager = TournamentManager()
+        self._learned_book_path  = get_learned_book_path(self.db.db_path)
+        self._book_building      = False
+        self._positions_indexing = False
+        self._pgn_importing      = False
+        self._batch_analyzer     = None
+        self.opening_book.attach_learned(LearnedBook(self._learned_book_path))
 
         # ── Build UI ──────────────────────────────────────
         self._build_ui()
@@ -167,12 +181,17 @@ class ChessGUI:
         self.game_paused      = False
         self._engine_thinking = False
 
+        self._eval_chain.close()
+
         def _shutdown():
             try: self._kill_engines()
             except: pass
+            if self._batch_analyzer:
+                self._batch_analyzer.stop()
             if self.analyzer:
                 try: self.analyzer.stop()
                 except: pass
+            self.db.close()
 
         threading.Thread(target=_shutdown, daemon=True).start()
         self.root.after(300, self.root.destroy)
@@ -220,24 +239,25 @@ class ChessGUI:
     #  Move quality analysis
     # ═══════════════════════════════════════════════════════
 
-    def _analyze_move_quality(self, uci_before, uci_after, was_white_moving, san):
-        if not self.analyzer or not self.analyzer.alive:
-            return
-        with self._analyzer_lock:
-            cp_before, _ = self.analyzer.eval_position(uci_before, movetime_ms=200)
-            cp_after,  _ = self.analyzer.eval_position(uci_after,  movetime_ms=200)
-        if cp_before is None or cp_after is None:
+    def _on_chain_eval(self, ply, cp):
+        # EvalChain thread: the refining eval of the newest position
+        self._last_eval_cp = cp
+        self.root.after(0, self._draw_eval_bar, cp)
+
+    def _on_move_quality(self, ply, san, quality, cp_after):
+        # EvalChain thread: a move has been judged
+        self._last_eval_cp = cp_after
+        if quality is None:
+            self.root.after(0, self._draw_eval_bar, cp_after)
             return
-        quality = classify_move_quality(cp_before, cp_after, was_white_moving)
-        ply = len(self.board.move_history)
         self._last_quality = quality
-        self._last_eval_cp = cp_after
         self._move_qualities.append((ply, san, quality))
         self.root.after(0, lambda: self._on_quality_result(quality, cp_after, san))
 
     def _on_quality_result(self, quality, cp_after, san):
         self._draw_eval_bar(cp_after)
         self._update_quality_display(quality, san)
+        self._update_analyzer_lbl()
 
     def _update_quality_display(self, quality, san):
         if quality is None:
@@ -249,11 +269,8 @@ class ChessGUI:
     def _trigger_quality_analysis(self, moves_before, moves_after, was_white, san):
         if not self.analyzer or not self.analyzer.alive:
             return
-        threading.Thread(
-            target=self._analyze_move_quality,
-            args=(moves_before, moves_after, was_white, san),
-            daemon=True,
-        ).start()
+        self._eval_chain.engine = self.analyzer
+        self._eval_chain.push(moves_before, moves_after, was_white, san)
 
     # ═══════════════════════════════════════════════════════
     #  Opening book helpers
@@ -280,13 +297,134 @@ class ChessGUI:
     def _update_book_lbl(self):
         if not hasattr(self, "book_lbl"):
             return
+        learned = self.opening_book.learned if self.opening_book else None
+        learned_txt = f"\n🧠 Learned book: {len(learned)} positions" if learned else ""
         if self.opening_book and self.opening_book.loaded:
             name = os.path.basename(self._opening_csv_path) if self._opening_csv_path else "loaded"
             self.book_lbl.config(
-                text=f"✓ {len(self.opening_book._entries)} openings  ({name})",
+                text=f"✓ {len(self.opening_book._entries)} openings  ({name}){learned_txt}",
                 fg="#00BFFF")
         else:
-            self.book_lbl.config(text="⚠ No CSV loaded", fg="#FF8800")
+            self.book_lbl.config(text=f"⚠ No CSV loaded{learned_txt}", fg="#FF8800")
+
+    def _run_background(self, flag_name, work, on_done, busy_msg, fail_msg):
+        """
+        Run *work* on a daemon thread, one at a time per *flag_name*.
+
+        Parameters
+        ----------
+        flag_name : str — attribute that is True while the job runs
+        work      : callable() -> result — runs off the Tk thread
+        on_done   : callable(result) — called on the Tk thread on success
+        busy_msg  : str — status shown when the job is already running
+        fail_msg  : str — status prefix when *work* raises
+
+        Returns
+        -------
+        bool — False if the job was already running.
+        """
+        if getattr(self, flag_name):
+            self._status(busy_msg)
+            return False
+        setattr(self, flag_name, True)
+
+        def _work():
+            try:
+                result = work()
+                self.root.after(0, on_done, result)
+            except Exception as e:
+                print(f"[App] {fail_msg}: {e}")
+                msg = f"⚠ {fail_msg}: {e}"    # e is unbound after the block
+                self.root.after(0, self._status, msg)
+            finally:
+                setattr(self, flag_name, False)
+
+        threading.Thread(target=_work, daemon=True).start()
+        return True
+
+    def _build_learned_book(self):
+        """Rebuild the learned opening book from the game database off-thread."""
+        def _progress(n):
+            self.root.after(0, self._status, f"🧠 Building opening book… {n} games read")
+
+        def _work():
+            builder = LearnedBookBuilder()
+            tmp     = self._learned_book_path + ".new"
+            count   = builder.build(self.db.iter_game_pgns(), tmp, on_progress=_progress)
+            return tmp, count, builder.games_read
+
+        if self._run_background("_book_building", _work,
+                                lambda r: self._on_learned_book_built(*r),
+                                "🧠 Book build already running…", "Book build failed"):
+            self._status("🧠 Building opening book from game database…")
+
+    def _index_positions(self):
+        """Index the positions of older games off-thread (resumable)."""
+        def _progress(done, total):
+            self.root.after(0, self._status,
+                            f"🗂 Indexing positions… {done}/{total} games")
+
+        def _done(n):
+            self._status(f"🗂 Indexed positions of {n} games" if n
+                         else "🗂 All games are already indexed")
+
+        if self._run_background("_positions_indexing",
+                                lambda: self.db.backfill_positions(on_progress=_progress),
+                                _done, "🗂 Position indexing already running…",
+                                "Position indexing failed"):
+            self._status("🗂 Indexing game positions…")
+
+    def _import_pgn(self):
+        """Bulk-import an external PGN collection off-thread (resumable)."""
+        busy_msg = "📥 A PGN import is already running…"
+        if self._pgn_importing:
+            self._status(busy_msg)    # before asking for a file
+            return
+        path = filedialog.askopenfilename(
+            title="Import PGN games",
+            filetypes=[("PGN files", "*.pgn"), ("All files", "*.*")])
+        if not path:
+            return
+        name  = os.path.basename(path)
+        skips = {}
+
+        def _skipped_txt():
+            n = skips.get(SKIP_SET_UP)
+            return f" · {n} set-up positions skipped" if n else ""
+
+        def _progress(done, total, games, skipped):
+            skips.update(skipped)
+            pct = done * 100 // total if total else 100
+            self.root.after(0, self._status,
+                            f"📥 Importing {name}… {pct}% · {games} games{_skipped_txt()}")
+
+        def _done(n):
+            self._status((f"📥 Imported {n} games from {name}" if n
+                          else f"📥 {name} is already imported") + _skipped_txt())
+
+        if self._run_background("_pgn_importing",
+                                lambda: self.db.import_pgn(path, on_progress=_progress),
+                                _done, busy_msg, "PGN import failed"):
+            self._status(f"📥 Importing {name}…")
+
+    def _browse_learning_file(self):
+        path = filedialog.askopenfilename(
+            title="Select engine learning file",
+            filetypes=[("Engine learning", "*.learn *.exp"), ("All files", "*.*")])
+        if path:
+            show_learning_file(self.root, path)
+
+    def _on_learned_book_built(self, tmp_path, count, games):
+        # Release the old mapping before replacing the file (required on Windows)
+        self.opening_book.attach_learned(None)
+        try:
+            os.replace(tmp_path, self._learned_book_path)
+        except OSError as e:
+            self._status(f"⚠ Could not install learned book: {e}")
+            return
+        self.opening_book.attach_learned(LearnedBook(self._learned_book_path))
+        self._update_book_lbl()
+        self._status(f"🧠 Learned book ready: {count} positions from {games} games")
 
     def _browse_csv(self):
         path = filedialog.askopenfilename(
@@ -299,6 +437,8 @@ class ChessGUI:
             if not book.loaded:
                 messagebox.showerror("Error", f"No valid openings found in:\n{path}")
                 return
+            book.attach_learned(self.opening_book.learned)
+            self.opening_book.learned = None
             self.opening_book      = book
             self._opening_csv_path = path
             self._update_book_lbl()
@@ -337,6 +477,7 @@ class ChessGUI:
         try:
             eng = AnalyzerEngine(self._analyzer_path, "Analyzer")
             eng.start()
+            eng.cache = self.db.eval_cache
             self.analyzer = eng
             self._update_analyzer_lbl()
         except Exception as e:
@@ -344,11 +485,47 @@ class ChessGUI:
             self.analyzer = None
             self._update_analyzer_lbl()
 
+    def _toggle_batch_analysis(self):
+        """Start or stop the background analysis of un-analysed games."""
+        job = self._batch_analyzer
+        if job and job.running:
+            job.stop()
+            self._status(f"🔬 Stopping game analysis… ({job.done} games done)")
+            return
+        if not self._analyzer_path:
+            messagebox.showinfo("Analyze Games", "Load an analyzer engine first.")
+            return
+
+        def _progress(done, total):
+            rate = self.db.eval_cache.hit_rate
+            self.root.after(0, self._status,
+                            f"🔬 Analyzing stored games… {done}/{total}"
+                            f"  ·  cache hits {rate:.0%}")
+
+        def _done(done):
+            self.root.after(0, self._status,
+                            f"🔬 Game analysis stopped — {done} games analyzed")
+
+        # Live games and tournaments come first: the workers wait while
+        # either is being played
+        self._batch_analyzer = BatchAnalyzer(
+            self.db, self._analyzer_path,
+            workers=max(1, min(4, (os.cpu_count() or 2) // 2)),
+            is_busy=lambda: (self.game_running and not self.game_paused)
+                            or self._tournament_manager.is_playing(),
+            on_progress=_progress, on_done=_done)
+        self._batch_analyzer.start()
+        self._status(f"🔬 Analyzing {self._batch_analyzer.total} stored games "
+                     f"in the background…")
+
     def _update_analyzer_lbl(self):
         if not hasattr(self, "analyzer_lbl"):
             return
         if self.analyzer and self.analyzer.alive:
             name = os.path.basename(self._analyzer_path) if self._analyzer_path else "?"
+            cache = self.db.eval_cache
+            if cache.hits + cache.misses:
+                name += f"  ·  cache {cache.hit_rate:.0%} hits"
             self.analyzer_lbl.config(text=f"🔍 {name}", fg="#1BECA0")
         else:
             self.analyzer_lbl.config(text="⚠ No analyzer", fg="#FF8800")
@@ -369,8 +546,11 @@ class ChessGUI:
     def _show_opening_stats(self):
         show_opening_stats(self.root, self.db, engine_name=None)
 
+    def _show_opening_explorer(self):
+        show_opening_explorer(self.root, self.db, self.board)
+
     def _pick_opening(self):
-        if not self.opening_book or not self.opening_book.loaded:
+        if not self.opening_book or not (self.opening_book.loaded or self.opening_book.learned):
             messagebox.showwarning(
                 "No Openings",
                 "Opening book not loaded.\nLoad an Openings CSV first.",
@@ -495,6 +675,7 @@ class ChessGUI:
             ("🏆 Rankings",    self._show_rankings),
             ("📊 Statistics",  self._show_statistics),
             ("📖 Openings",    self._show_opening_stats),
+            ("🌳 Explorer",    self._show_opening_explorer),
             ("📋 Tournaments", self._tournament_list),
             ("🕘 History",     self._show_game_history),
         ]:
@@ -605,6 +786,14 @@ class ChessGUI:
         self.book_lbl.pack(fill="x", padx=10)
         button(p, "📂  Load Openings CSV", self._browse_csv, small=True).pack(
             fill="x", padx=10, pady=2)
+        button(p, "🧠  Build Book from DB", self._build_learned_book, small=True).pack(
+            fill="x", padx=10, pady=2)
+        button(p, "🔎  Inspect Learn File", self._browse_learning_file, small=True).pack(
+            fill="x", padx=10, pady=2)
+        button(p, "🗂  Index Positions", self._index_positions, small=True).pack(
+            fill="x", padx=10, pady=2)
+        button(p, "📥  Import PGN", self._import_pgn, small=True).pack(
+            fill="x", padx=10, pady=2)
 
         # Analyzer
         separator(p)
@@ -614,7 +803,9 @@ class ChessGUI:
             font=FONT_TINY, anchor="w", wraplength=230)
         self.analyzer_lbl.pack(fill="x", padx=10)
         button(p, "📂  Load Analyzer", self._browse_analyzer, small=True).pack(
-            fill="x", padx=10, pady=(2, 12))
+            fill="x", padx=10, pady=2)
+        button(p, "🔬  Analyze Stored Games", self._toggle_batch_analysis,
+               small=True).pack(fill="x", padx=10, pady=(2, 12))
 
     def _build_config_ui(self):
         for widget in self.config_frame.winfo_children():
@@ -987,11 +1178,9 @@ class ChessGUI:
 
     def _refresh_banners(self):
         try:
-            games_raw   = self.db.get_all_games_for_elo()
-            elo_ratings = compute_elo_ratings(games_raw)
-            sorted_engines = sorted(elo_ratings.items(), key=lambda x: x[1], reverse=True)
-            rank_map = {name: i + 1 for i, (name, _) in enumerate(sorted_engines)}
-            total    = len(sorted_engines)
+            # Cached and updated incrementally — cheap enough for every move
+            elo_ratings, rank_map = self.db.ratings.ranking()
+            total = len(rank_map)
 
             mode = self.play_mode.get()
             if mode == "human_vs_engine":
@@ -1237,6 +1426,7 @@ class ChessGUI:
                 self.root.after(0, self._status, f"Loading {name_var.get()}…")
                 eng = UCIEngine(path, name_var.get())
                 eng.start()
+                self.db.register_engine(name_var.get(), path=path, version=eng.id_name)
                 if n == 1:
                     self.engine1 = eng
                 else:
@@ -1256,6 +1446,7 @@ class ChessGUI:
             self.root.after(0, self._status, f"Loading {self.e2_name.get()}…")
             eng = UCIEngine(path, self.e2_name.get())
             eng.start()
+            self.db.register_engine(self.e2_name.get(), path=path, version=eng.id_name)
             self.engine2 = eng
             self.root.after(0, self._log_eng, f"✓ {self.e2_name.get()} ready", "W")
             return True
@@ -1498,7 +1689,8 @@ class ChessGUI:
             opening_name=self.current_opening_name)
         self.db.save_game(
             white_name, black_name, result, reason, pgn,
-            len(self.board.move_history), duration)
+            len(self.board.move_history), duration,
+            moves=self.board.uci_moves_list())
 
         status_msg = (f"🏁 {normalize_engine_name(winner_name)} wins by {reason}"
                       if winner_name else f"🏁 {result} — {reason}")
@@ -1544,6 +1736,7 @@ class ChessGUI:
         self._last_eval_cp    = None
         self._last_quality    = None
         self._move_qualities  = []
+        self._eval_chain.reset()
         self._eval_bar_cp     = 0
 
         # Apply preset opening
@@ -1655,7 +1848,8 @@ class ChessGUI:
                 opening_name=self.current_opening_name)
             self.db.save_game(
                 white_name, black_name, result, reason, pgn,
-                len(self.board.move_history), duration)
+                len(self.board.move_history), duration,
+                moves=self.board.uci_moves_list())
             self._log_result(f"{result}  —  {reason}")
 
         if result == "*":
@@ -1681,6 +1875,7 @@ class ChessGUI:
         self._last_eval_cp    = None
         self._last_quality    = None
         self._move_qualities  = []
+        self._eval_chain.reset()
         self._eval_bar_cp     = 0
         self.board_lock       = threading.Lock()
         self._reset_opening()
@@ -1760,9 +1955,7 @@ class ChessGUI:
 
         if winner_name:
             clean_name = normalize_engine_name(winner_name)
-            games_raw  = self.db.get_all_games_for_elo()
-            elo_ratings = compute_elo_ratings(games_raw)
-            winner_elo  = elo_ratings.get(clean_name)
+            winner_elo = self.db.ratings.ratings().get(clean_name)
             tier_lbl, tier_col = get_tier(winner_elo) if winner_elo else ("", TEXT)
             tk.Label(main_frame, text=clean_name, bg=BG, fg=TEXT,
                      font=(FONT_FAMILY, 20, "bold")).pack(pady=5)
@@ -8,6 +8,7 @@ from core.constants import (
     BG, PANEL_BG, ACCENT, TEXT, BTN_BG, BTN_HOV, LOG_BG,
 )
 from core.utils import normalize_engine_name
+from data.pgn_export import STR_TAGS
 
 
 # ═══════════════════════════════════════════════════════════
@@ -326,6 +327,10 @@ def ask_opening_choice(root, opening_book):
             all_entries.append((eco, name, list(seq)))
     # Sort alphabetically by name for easier browsing
     all_entries.sort(key=lambda x: x[1])
+    # Lines learned from our own games go first, most played on top
+    learned_entries = [(eco, name, list(seq))
+                       for seq, eco, name in opening_book.learned_lines()]
+    all_entries = learned_entries + all_entries
 
     # ── Header ────────────────────────────────────────────
     hdr = tk.Frame(dialog, bg=BG)
@@ -352,7 +357,7 @@ def ask_opening_choice(root, opening_book):
             b.config(bg=ACCENT if l == letter else BTN_BG)
         _filter(search_var.get() if 'search_var' in dir() else '')
 
-    for letter in ['All', 'A', 'B', 'C', 'D', 'E']:
+    for letter in ['All', 'A', 'B', 'C', 'D', 'E'] + (['DB'] if learned_entries else []):
         lbl = letter
         btn = tk.Button(
             eco_bar, text=lbl,
@@ -442,6 +447,8 @@ def ask_opening_choice(root, opening_book):
         for eco, name, seq in all_entries:
             if eco_f and not eco.startswith(eco_f):
                 continue
+            if eco_f == 'D' and eco == 'DB':
+                continue
             if q and q not in name.lower() and q not in eco.lower():
                 continue
             filtered.append((eco, name, seq))
@@ -528,4 +535,139 @@ def ask_opening_choice(root, opening_book):
     search_entry.focus_set()
 
     root.wait_window(dialog)
-    return result_moves[0], result_name[0]
\ No newline at end of file
+    return result_moves[0], result_name[0]
+
+# ═══════════════════════════════════════════════════════════
+#  PGN export options
+# ═══════════════════════════════════════════════════════════
+
+_EXPORT_SOURCES = [("All games", None), ("Regular", 'regular'),
+                   ("Tournament", 'tournament'), ("Imported", 'import')]
+
+
+def ask_pgn_export_options(root, show_filters=True, source=None):
+    """
+    Show a modal dialog choosing which games and which PGN content to export.
+
+    Parameters
+    ----------
+    root         : tk.Tk | tk.Toplevel
+    show_filters : bool      — offer the engine / source / date filters
+    source       : str | None — initial source filter
+
+    Returns
+    -------
+    (filters: dict, options: dict) | (None, None) if cancelled.
+    *filters* uses Database.get_games_page keys; *options* holds the
+    ``tags`` / ``evals`` / ``clocks`` / ``comments`` arguments of
+    ``data.pgn_export.select_pgn``.
+    """
+    chosen = [None, None]
+
+    dialog = tk.Toplevel(root)
+    dialog.title("📤  Export PGN")
+    dialog.configure(bg=BG)
+    dialog.resizable(False, False)
+    dialog.transient(root)
+    dialog.grab_set()
+
+    hdr = tk.Frame(dialog, bg=BG)
+    hdr.pack(fill='x', padx=24, pady=(18, 0))
+    tk.Label(hdr, text="📤  EXPORT PGN", bg=BG, fg=ACCENT,
+             font=('Segoe UI', 15, 'bold')).pack(anchor='w')
+    tk.Frame(dialog, bg=ACCENT, height=2).pack(fill='x', padx=24, pady=(8, 10))
+
+    lbl = dict(bg=BG, fg="#AAA", font=('Segoe UI', 10))
+    ent = dict(bg=LOG_BG, fg=TEXT, insertbackground=TEXT, relief='flat',
+               font=('Segoe UI', 10), highlightthickness=1,
+               highlightcolor=ACCENT, highlightbackground='#333')
+
+    engine_var = tk.StringVar()
+    from_var   = tk.StringVar()
+    to_var     = tk.StringVar()
+    source_var = tk.StringVar(value=next(
+        (name for name, val in _EXPORT_SOURCES if val == source), "All games"))
+
+    if show_filters:
+        grid = tk.Frame(dialog, bg=BG)
+        grid.pack(fill='x', padx=24)
+        tk.Label(grid, text="Engine:", **lbl).grid(row=0, column=0, sticky='w', pady=3)
+        tk.Entry(grid, textvariable=engine_var, width=28, **ent).grid(
+            row=0, column=1, columnspan=3, sticky='we', pady=3, ipady=3)
+        tk.Label(grid, text="Source:", **lbl).grid(row=1, column=0, sticky='w', pady=3)
+        ttk.Combobox(grid, textvariable=source_var, state='readonly', width=14,
+                     values=[name for name, _ in _EXPORT_SOURCES]).grid(
+            row=1, column=1, columnspan=3, sticky='w', pady=3)
+        tk.Label(grid, text="Date from:", **lbl).grid(row=2, column=0, sticky='w', pady=3)
+        tk.Entry(grid, textvariable=from_var, width=11, **ent).grid(
+            row=2, column=1, sticky='w', pady=3, ipady=3)
+        tk.Label(grid, text="to:", **lbl).grid(row=2, column=2, sticky='w', padx=6)
+        tk.Entry(grid, textvariable=to_var, width=11, **ent).grid(
+            row=2, column=3, sticky='w', pady=3, ipady=3)
+        tk.Label(grid, text="Dates as YYYY.MM.DD; leave blank for all",
+                 bg=BG, fg="#555", font=('Segoe UI', 8)).grid(
+            row=3, column=1, columnspan=3, sticky='w')
+        tk.Frame(dialog, bg="#333", height=1).pack(fill='x', padx=24, pady=10)
+
+    tags_var     = tk.StringVar(value='all')
+    evals_var    = tk.BooleanVar(value=True)
+    clocks_var   = tk.BooleanVar(value=True)
+    comments_var = tk.BooleanVar(value=True)
+
+    opts = tk.Frame(dialog, bg=BG)
+    opts.pack(fill='x', padx=24)
+    chk = dict(bg=BG, fg=TEXT, selectcolor=BTN_BG, activebackground=BG,
+               activeforeground=TEXT, font=('Segoe UI', 10))
+    tk.Label(opts, text="Tags:", **lbl).pack(anchor='w')
+    tk.Radiobutton(opts, text="All tags", variable=tags_var, value='all',
+                   **chk).pack(anchor='w', padx=12)
+    tk.Radiobutton(opts, text="Seven Tag Roster only", variable=tags_var,
+                   value='str', **chk).pack(anchor='w', padx=12)
+    tk.Label(opts, text="Move comments:", **lbl).pack(anchor='w', pady=(8, 0))
+    tk.Checkbutton(opts, text="Engine evaluations", variable=evals_var,
+                   **chk).pack(anchor='w', padx=12)
+    tk.Checkbutton(opts, text="Clock / move times", variable=clocks_var,
+                   **chk).pack(anchor='w', padx=12)
+    tk.Checkbutton(opts, text="Other comments", variable=comments_var,
+                   **chk).pack(anchor='w', padx=12)
+
+    foot = tk.Frame(dialog, bg=BG)
+    foot.pack(fill='x', padx=24, pady=18)
+
+    def _confirm():
+        filters = {}
+        if show_filters:
+            if engine_var.get().strip():
+                filters['engine'] = engine_var.get().strip()
+            src = dict(_EXPORT_SOURCES).get(source_var.get())
+            if src:
+                filters['source'] = src
+            if from_var.get().strip():
+                filters['date_from'] = from_var.get().strip()
+            if to_var.get().strip():
+                filters['date_to'] = to_var.get().strip()
+        elif source:
+            filters['source'] = source
+        chosen[0] = filters
+        chosen[1] = {
+            'tags':     None if tags_var.get() == 'all' else STR_TAGS,
+            'evals':    evals_var.get(),
+            'clocks':   clocks_var.get(),
+            'comments': comments_var.get(),
+        }
+        dialog.destroy()
+
+    tk.Button(foot, text="✔  Export…", command=_confirm,
+              bg=ACCENT, fg='white', activebackground=BTN_HOV,
+              relief='flat', font=('Segoe UI', 11, 'bold'),
+              padx=16, pady=8, cursor='hand2').pack(side='left', expand=True,
+                                                    fill='x', padx=(0, 8))
+    tk.Button(foot, text="✕  Cancel", command=dialog.destroy,
+              bg=BTN_BG, fg=TEXT, activebackground=BTN_HOV,
+              relief='flat', font=('Segoe UI', 11),
+              padx=16, pady=8, cursor='hand2').pack(side='left', expand=True, fill='x')
+
+    dialog.bind('<Escape>', lambda e: dialog.destroy())
+    dialog.bind('<Return>', lambda e: _confirm())
+    root.wait_window(dialog)
+    return chosen[0], chosen[1]
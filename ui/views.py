@@ -2,6 +2,7 @@
 #  views.py — Statistics, Rankings, Game History, PGN viewer
 # ═══════════════════════════════════════════════════════════
 
+import threading
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 from core.constants import (
@@ -9,9 +10,10 @@ from core.constants import (
     LOG_BG, RANK_TIERS, QUALITY_COLORS,
 )
 from core.utils import normalize_engine_name, get_tier
-from core.elo import compute_elo_ratings, compute_elo_history
 from core.board import Board
-from ui.dialogs import make_search_bar
+from core.pgn import san_moves
+from ui.dialogs import make_search_bar, ask_pgn_export_options
+from data.database import RATING_MODELS
 
 
 # ─── Shared ttk styling ───────────────────────────────────
@@ -63,7 +65,7 @@ def show_rankings(root, db):
     win = tk.Toplevel(root)
     win.title("🏆 Engine Rankings")
     win.configure(bg=BG)
-    win.geometry("860x680")
+    win.geometry("960x680")
     win.resizable(True, True)
 
     # ── Header ────────────────────────────────────────────
@@ -75,8 +77,20 @@ def show_rankings(root, db):
     title_f.pack(side='left')
     tk.Label(title_f, text="ENGINE RANKINGS", bg=BG, fg=ACCENT,
              font=('Segoe UI', 18, 'bold')).pack(anchor='w')
-    tk.Label(title_f, text="Elo ratings calculated from all recorded games",
-             bg=BG, fg="#666", font=('Segoe UI', 9)).pack(anchor='w')
+    subtitle_lbl = tk.Label(title_f, text="", bg=BG, fg="#666", font=('Segoe UI', 9))
+    subtitle_lbl.pack(anchor='w')
+
+    # Rating model selector — also used by tournaments sharing this db
+    model_keys   = list(RATING_MODELS)
+    model_labels = [db.rating_service(k).label for k in model_keys]
+    model_f = tk.Frame(hdr_frame, bg=BG)
+    model_f.pack(side='right')
+    tk.Label(model_f, text="Rating model:", bg=BG, fg="#AAA",
+             font=('Segoe UI', 9)).pack(side='left', padx=(0, 6))
+    model_var = tk.StringVar(value=db.ratings.label)
+    model_cb  = ttk.Combobox(model_f, textvariable=model_var, state='readonly',
+                             width=30, values=model_labels)
+    model_cb.pack(side='left')
     tk.Frame(win, bg=ACCENT, height=2).pack(fill='x', padx=20, pady=(10, 8))
 
     # ── Tier legend ───────────────────────────────────────
@@ -93,10 +107,13 @@ def show_rankings(root, db):
     all_data_ref = [None]
     tree_ref     = [None]
     count_lbl    = [None]
+    ranked_ref   = [None]    # full ranking, computed once per window
+    ci_ref       = [None]    # {engine: (low, high)} bootstrap 95% intervals
+    ci_gen       = [0]       # bumped on reload so stale results are dropped
 
-    def refresh(query=''):
-        games_raw   = db.get_all_games_for_elo()
-        elo_ratings = compute_elo_ratings(games_raw)
+    def _build_rows():
+        elo_ratings = db.ratings.ratings()
+        errors      = db.ratings.errors()
         stats_list  = db.get_engine_stats()
         stats_map   = {s['engine']: s for s in stats_list}
 
@@ -107,6 +124,7 @@ def show_rankings(root, db):
             rows.append({
                 'engine':   engine,
                 'elo':      elo,
+                'err':      errors.get(engine),
                 'tier':     tier_lbl,
                 'tier_col': tier_col,
                 'matches':  s.get('matches',  0),
@@ -119,6 +137,14 @@ def show_rankings(root, db):
         rows.sort(key=lambda x: x['elo'], reverse=True)
         for i, row in enumerate(rows, 1):
             row['rank'] = i
+        return rows
+
+    def refresh(query=''):
+        # Typing in the filter only narrows the cached ranking; ratings are
+        # read once when the window opens or the model changes
+        if ranked_ref[0] is None:
+            ranked_ref[0] = _build_rows()
+        rows  = ranked_ref[0]
         total = len(rows)
 
         if query:
@@ -128,14 +154,79 @@ def show_rankings(root, db):
         all_data_ref[0] = rows
         _render(rows, total)
 
+    def reload():
+        ranked_ref[0] = None
+        refresh('')
+        _load_intervals()
+
+    def _load_intervals():
+        # Resampling takes seconds on a large history, so it runs off the
+        # Tk thread; the cached result is returned at once when current
+        ci_ref[0] = None
+        ci_gen[0] += 1
+        gen, model = ci_gen[0], db.rating_model
+
+        def _work():
+            try:
+                intervals = db.bootstrap(model).intervals()
+                if model == 'elo':
+                    # Davidson's spread, centred on each engine's Elo
+                    centre = db.rating_service('davidson').ratings()
+                    elo    = db.rating_service('elo').ratings()
+                    intervals = {e: (elo[e] + lo - centre[e], elo[e] + hi - centre[e])
+                                 for e, (lo, hi) in intervals.items()
+                                 if e in elo and e in centre}
+            except Exception as e:
+                print(f"[Rankings] bootstrap error: {e}")
+                intervals = {}
+            win.after(0, _set_intervals, gen, intervals)
+
+        threading.Thread(target=_work, daemon=True).start()
+
+    def _set_intervals(gen, intervals):
+        if gen != ci_gen[0] or not win.winfo_exists():
+            return
+        ci_ref[0] = intervals
+        _render(all_data_ref[0] or [], len(ranked_ref[0] or []))
+
+    def _update_model_text():
+        if db.rating_model == 'elo':
+            subtitle_lbl.config(text="Elo ratings calculated from all recorded games")
+            hint_lbl.config(text="💡 Double-click a row to see Elo history  ·  "
+                                 "Elo starts at 1500, K=32  ·  95% CI from a "
+                                 "Davidson bootstrap")
+        else:
+            subtitle_lbl.config(text=f"{db.ratings.label} ratings from all recorded "
+                                     f"games — independent of game order")
+            hint_lbl.config(text="💡 Double-click a row to see Elo history  ·  "
+                                 "average engine = 1500  ·  ± analytic, CI "
+                                 "bootstrap (both 95%)")
+
+    def on_model_change(_event=None):
+        db.rating_model = model_keys[model_labels.index(model_var.get())]
+        _update_model_text()
+        reload()
+
+    model_cb.bind('<<ComboboxSelected>>', on_model_change)
+
     def _render(rows, total=None):
         tree = tree_ref[0]
         if not tree: return
         for item in tree.get_children():
             tree.delete(item)
+        intervals = ci_ref[0]
         for row in rows:
+            if intervals is None:
+                ci = "…"
+            elif row['engine'] in intervals:
+                lo, hi = intervals[row['engine']]
+                ci = f"{lo:.0f} – {hi:.0f}"
+            else:
+                ci = ""
             tree.insert('', 'end', values=(
-                f"#{row['rank']}", row['engine'], row['elo'], row['tier'],
+                f"#{row['rank']}", row['engine'], row['elo'],
+                f"±{row['err']:.0f}" if row['err'] is not None else "",
+                ci, row['tier'],
                 row['matches'], row['wins'], row['draws'], row['loses'],
                 f"{row['win_rate']:.1f}%",
             ), tags=(row['tier_col'],))
@@ -159,7 +250,8 @@ def show_rankings(root, db):
     scrollbar = tk.Scrollbar(tree_frame)
     scrollbar.pack(side='right', fill='y')
 
-    columns = ('Rank', 'Engine', 'Elo', 'Tier', 'Games', 'W', 'D', 'L', 'WR%')
+    columns = ('Rank', 'Engine', 'Elo', '±', '95% CI', 'Tier',
+               'Games', 'W', 'D', 'L', 'WR%')
     tree = ttk.Treeview(tree_frame, columns=columns, show='headings',
                         yscrollcommand=scrollbar.set)
     scrollbar.config(command=tree.yview)
@@ -168,7 +260,8 @@ def show_rankings(root, db):
 
     for col, w, anch in [
         ('Rank',   55, 'center'), ('Engine', 230, 'w'),
-        ('Elo',    70, 'center'), ('Tier',  140, 'w'),
+        ('Elo',    70, 'center'), ('±',      50, 'center'),
+        ('95% CI', 95, 'center'), ('Tier',  140, 'w'),
         ('Games',  55, 'center'), ('W',      45, 'center'),
         ('D',      45, 'center'), ('L',      45, 'center'),
         ('WR%',    65, 'center'),
@@ -183,8 +276,9 @@ def show_rankings(root, db):
 
     count_lbl[0] = tk.Label(win, text="", bg=BG, fg="#555", font=('Segoe UI', 9))
     count_lbl[0].pack(pady=(2, 0))
-    tk.Label(win, text="💡 Double-click a row to see Elo history  ·  Elo starts at 1500, K=32",
-             bg=BG, fg="#444", font=('Segoe UI', 8)).pack(pady=(0, 4))
+    hint_lbl = tk.Label(win, text="", bg=BG, fg="#444", font=('Segoe UI', 8))
+    hint_lbl.pack(pady=(0, 4))
+    _update_model_text()
 
     def on_double_click(event):
         sel = tree.selection()
@@ -194,10 +288,28 @@ def show_rankings(root, db):
 
     tree.bind('<Double-1>', on_double_click)
 
+    def open_los():
+        # Selected engines, else the top of the (filtered) ranking
+        picked = [tree.item(i)['values'][1] for i in tree.selection()]
+        if len(picked) < 2:
+            picked = [r['engine'] for r in (all_data_ref[0] or [])[:LOS_MAX_ENGINES]]
+        if len(picked) < 2:
+            return
+        show_los_matrix(root, db, [str(e) for e in picked[:LOS_MAX_ENGINES]])
+
     # ── Footer ────────────────────────────────────────────
     btn_frame = tk.Frame(win, bg=BG)
     btn_frame.pack(fill='x', padx=20, pady=(0, 14))
-    tk.Button(btn_frame, text="🔄 Refresh", command=lambda: refresh(''),
+    tk.Button(btn_frame, text="🔄 Refresh", command=reload,
+              bg=BTN_BG, fg=TEXT, font=('Segoe UI', 10),
+              padx=15, pady=8, cursor='hand2', relief='flat').pack(side='left', padx=5)
+    tk.Button(btn_frame, text="⚖ LOS Matrix", command=open_los,
+              bg=BTN_BG, fg=TEXT, font=('Segoe UI', 10),
+              padx=15, pady=8, cursor='hand2', relief='flat').pack(side='left', padx=5)
+    # Every engine shown, in ranking order
+    tk.Button(btn_frame, text="▦ Crosstable",
+              command=lambda: show_crosstable(
+                  root, db, [r['engine'] for r in (all_data_ref[0] or [])]),
               bg=BTN_BG, fg=TEXT, font=('Segoe UI', 10),
               padx=15, pady=8, cursor='hand2', relief='flat').pack(side='left', padx=5)
     tk.Button(btn_frame, text="📊 Statistics",
@@ -208,16 +320,277 @@ def show_rankings(root, db):
               bg=BTN_BG, fg=TEXT, font=('Segoe UI', 10),
               padx=15, pady=8, cursor='hand2', relief='flat').pack(side='right', padx=5)
     refresh('')
+    _load_intervals()
+
+
+# ═══════════════════════════════════════════════════════════
+#  Likelihood-of-superiority window
+# ═══════════════════════════════════════════════════════════
+
+LOS_MAX_ENGINES = 16
+
+
+def show_los_matrix(root, db, engines):
+    """
+    Show P(row engine is stronger than column engine) for *engines*, from
+    the bootstrap of the selected rating model.
+
+    Parameters
+    ----------
+    root    : tk.Tk | tk.Toplevel
+    db      : database.Database  instance
+    engines : list of str — in display order
+    """
+    win = tk.Toplevel(root)
+    win.title("⚖ Likelihood of Superiority")
+    win.configure(bg=BG)
+    win.geometry(f"{min(1400, 230 + 70 * len(engines))}x{min(700, 200 + 26 * len(engines))}")
+
+    tk.Label(win, text="LIKELIHOOD OF SUPERIORITY", bg=BG, fg=ACCENT,
+             font=('Segoe UI', 14, 'bold')).pack(anchor='w', padx=20, pady=(14, 0))
+    status = tk.Label(win, text="⏳ Resampling games…", bg=BG, fg="#666",
+                      font=('Segoe UI', 9))
+    status.pack(anchor='w', padx=20)
+    tk.Frame(win, bg=ACCENT, height=2).pack(fill='x', padx=20, pady=(8, 8))
+
+    frame = tk.Frame(win, bg=BG)
+    frame.pack(fill='both', expand=True, padx=20, pady=(0, 4))
+    xscroll = tk.Scrollbar(frame, orient='horizontal')
+    xscroll.pack(side='bottom', fill='x')
+    columns = ['Engine'] + [f"c{i}" for i in range(len(engines))]
+    tree = ttk.Treeview(frame, columns=columns, show='headings',
+                        xscrollcommand=xscroll.set)
+    xscroll.config(command=tree.xview)
+    _apply_tree_style()
+    tree.column('Engine', width=200, anchor='w', stretch=False)
+    tree.heading('Engine', text="P(row > column)")
+    for i, engine in enumerate(engines):
+        tree.column(f"c{i}", width=70, anchor='center', stretch=False)
+        tree.heading(f"c{i}", text=engine if len(engine) <= 10 else engine[:9] + "…")
+    tree.pack(fill='both', expand=True)
+
+    def _work():
+        try:
+            los = db.bootstrap().los(engines)
+            win.after(0, lambda: _show(los))
+        except Exception as e:
+            msg = f"⚠ Could not compute: {e}"    # e is unbound after the block
+            win.after(0, lambda m=msg: status.winfo_exists() and
+                      status.config(text=m, fg="#FF6B6B"))
+
+    def _show(los):
+        if not win.winfo_exists():
+            return
+        boot = db.bootstrap()
+        status.config(text=f"{boot.replicates} bootstrap replicates of the "
+                           f"{boot.service.label} model")
+        for a in engines:
+            cells = []
+            for b in engines:
+                p = los.get((a, b))
+                cells.append("—" if a == b else "" if p is None else f"{p * 100:.0f}%")
+            tree.insert('', 'end', values=[a] + cells)
+
+    threading.Thread(target=_work, daemon=True).start()
+
+    tk.Button(win, text="✕ Close", command=win.destroy,
+              bg=BTN_BG, fg=TEXT, font=('Segoe UI', 10),
+              padx=15, pady=8, cursor='hand2', relief='flat').pack(pady=(4, 14))
+
+
+# ═══════════════════════════════════════════════════════════
+#  Crosstable window
+# ═══════════════════════════════════════════════════════════
+
+XT_CELL_W, XT_CELL_H, XT_NAME_W = 64, 22, 200
+
+
+def _half_points(x):
+    whole, half = divmod(round(x * 2), 2)
+    return f"{whole or ''}½" if half else str(whole)
+
+
+def show_crosstable(root, db, engines):
+    """
+    Head-to-head crosstable of *engines* (row engine's score against the
+    column engine).
+
+    Only the cells in view are drawn, so hundreds of engines (tens of
+    thousands of cells) scroll as fast as a handful.
+
+    Parameters
+    ----------
+    root    : tk.Tk | tk.Toplevel
+    db      : database.Database  instance
+    engines : list of str — rows / columns, in display order
+    """
+    if len(engines) < 2:
+        return
+    win = tk.Toplevel(root)
+    win.title("▦ Crosstable")
+    win.configure(bg=BG)
+    win.geometry("1000x680")
+
+    tk.Label(win, text="CROSSTABLE", bg=BG, fg=ACCENT,
+             font=('Segoe UI', 14, 'bold')).pack(anchor='w', padx=20, pady=(14, 0))
+    status = tk.Label(win, text="⏳ Loading head-to-head results…", bg=BG, fg="#666",
+                      font=('Segoe UI', 9), anchor='w')
+    status.pack(fill='x', padx=20)
+    tk.Frame(win, bg=ACCENT, height=2).pack(fill='x', padx=20, pady=(8, 8))
+
+    n        = len(engines)
+    table    = {}
+    frame    = tk.Frame(win, bg=BG)
+    frame.pack(fill='both', expand=True, padx=20, pady=(0, 4))
+    frame.grid_rowconfigure(1, weight=1)
+    frame.grid_columnconfigure(1, weight=1)
+
+    canvas_kw = dict(bg=LOG_BG, highlightthickness=0)
+    corner = tk.Canvas(frame, width=XT_NAME_W, height=XT_CELL_H, **canvas_kw)
+    top    = tk.Canvas(frame, height=XT_CELL_H, **canvas_kw)
+    left   = tk.Canvas(frame, width=XT_NAME_W, **canvas_kw)
+    grid   = tk.Canvas(frame, **canvas_kw)
+    xbar   = tk.Scrollbar(frame, orient='horizontal')
+    ybar   = tk.Scrollbar(frame)
+    corner.grid(row=0, column=0, sticky='nsew')
+    top.grid(row=0, column=1, sticky='ew')
+    left.grid(row=1, column=0, sticky='ns')
+    grid.grid(row=1, column=1, sticky='nsew')
+    ybar.grid(row=1, column=2, sticky='ns')
+    xbar.grid(row=2, column=1, sticky='ew')
+    corner.create_text(6, XT_CELL_H // 2, text="row vs column", anchor='w',
+                       fill="#666", font=('Segoe UI', 8))
+
+    width, height = n * XT_CELL_W, n * XT_CELL_H
+    grid.config(scrollregion=(0, 0, width, height))
+    top.config(scrollregion=(0, 0, width, XT_CELL_H))
+    left.config(scrollregion=(0, 0, XT_NAME_W, height))
+
+    def _xview(*args):
+        grid.xview(*args)
+        top.xview_moveto(grid.xview()[0])
+        _draw()
+
+    def _yview(*args):
+        grid.yview(*args)
+        left.yview_moveto(grid.yview()[0])
+        _draw()
+
+    xbar.config(command=_xview)
+    ybar.config(command=_yview)
+    grid.config(xscrollcommand=xbar.set, yscrollcommand=ybar.set)
+
+    def _cell_colour(score, games):
+        if not games:
+            return LOG_BG
+        pct = score / games
+        if pct > 0.55: return "#143D2A"
+        if pct < 0.45: return "#4A1A1A"
+        return "#2A2A3A"
+
+    def _draw(event=None):
+        # Only the rows / columns inside the viewport
+        x0, y0 = grid.canvasx(0), grid.canvasy(0)
+        c0 = max(0, int(x0 // XT_CELL_W))
+        c1 = min(n, int((x0 + grid.winfo_width()) // XT_CELL_W) + 1)
+        r0 = max(0, int(y0 // XT_CELL_H))
+        r1 = min(n, int((y0 + grid.winfo_height()) // XT_CELL_H) + 1)
+        for c in (grid, top, left):
+            c.delete('all')
+        for col in range(c0, c1):
+            name = engines[col]
+            top.create_text(col * XT_CELL_W + XT_CELL_W // 2, XT_CELL_H // 2,
+                            text=name if len(name) <= 9 else name[:8] + "…",
+                            fill=ACCENT, font=('Segoe UI', 8))
+        for row in range(r0, r1):
+            y = row * XT_CELL_H
+            left.create_text(6, y + XT_CELL_H // 2, text=f"{row + 1}. {engines[row]}",
+                             anchor='w', fill=TEXT, font=('Segoe UI', 8))
+            for col in range(c0, c1):
+                x = col * XT_CELL_W
+                if row == col:
+                    grid.create_rectangle(x, y, x + XT_CELL_W, y + XT_CELL_H,
+                                          fill="#222", outline="#333")
+                    continue
+                cell = table.get((engines[row], engines[col]))
+                if cell is None:
+                    grid.create_rectangle(x, y, x + XT_CELL_W, y + XT_CELL_H,
+                                          fill=LOG_BG, outline="#222")
+                    continue
+                w = cell['w'][0] + cell['b'][0]
+                d = cell['w'][1] + cell['b'][1]
+                games = w + d + cell['w'][2] + cell['b'][2]
+                score = w + d / 2
+                grid.create_rectangle(x, y, x + XT_CELL_W, y + XT_CELL_H,
+                                      fill=_cell_colour(score, games), outline="#222")
+                grid.create_text(x + XT_CELL_W // 2, y + XT_CELL_H // 2,
+                                 text=f"{_half_points(score)}/{games}",
+                                 fill=TEXT, font=('Consolas', 8))
+
+    def _hover(event):
+        col = int(grid.canvasx(event.x) // XT_CELL_W)
+        row = int(grid.canvasy(event.y) // XT_CELL_H)
+        if not (0 <= row < n and 0 <= col < n) or row == col or not table:
+            return
+        a, b = engines[row], engines[col]
+        cell = table.get((a, b))
+        if cell is None:
+            status.config(text=f"{a} vs {b}: no games")
+            return
+        (ww, wd, wl), (bw, bd, bl) = cell['w'], cell['b']
+        status.config(text=f"{a} vs {b}:  as White +{ww} ={wd} −{wl}  ·  "
+                           f"as Black +{bw} ={bd} −{bl}")
+
+    def _wheel(event):
+        units = -1 if (event.num == 4 or event.delta > 0) else 1
+        if event.state & 0x1:    # Shift: scroll sideways
+            _xview('scroll', units * 3, 'units')
+        else:
+            _yview('scroll', units * 3, 'units')
+
+    grid.config(xscrollincrement=XT_CELL_W, yscrollincrement=XT_CELL_H)
+    grid.bind('<Configure>', _draw)
+    grid.bind('<Motion>', _hover)
+    for seq in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+        grid.bind(seq, _wheel)
+        left.bind(seq, _wheel)
+
+    def _work():
+        try:
+            result = db.get_crosstable(engines)
+        except Exception as e:
+            result = {}
+            print(f"[Crosstable] error: {e}")
+        win.after(0, lambda: _show(result))
+
+    def _show(result):
+        if not win.winfo_exists():
+            return
+        table.update(result)
+        pairs = len(result) // 2
+        status.config(text=f"{n} engines · {pairs:,} pairings played · "
+                           f"hover a cell for results by colour")
+        _draw()
+
+    threading.Thread(target=_work, daemon=True).start()
+
+    tk.Button(win, text="✕ Close", command=win.destroy,
+              bg=BTN_BG, fg=TEXT, font=('Segoe UI', 10),
+              padx=15, pady=8, cursor='hand2', relief='flat').pack(pady=(4, 14))
 
 
 # ═══════════════════════════════════════════════════════════
 #  Elo history chart window
 # ═══════════════════════════════════════════════════════════
 
+# Points drawn on the history chart; longer histories are downsampled
+ELO_CHART_POINTS = 300
+
+
 def show_elo_history(root, db, engine_name):
     """Draw a canvas Elo-history chart for one engine."""
-    games_raw = db.get_all_games_for_elo()
-    history   = compute_elo_history(games_raw, engine_name)
+    summary = db.elo_history.summary(engine_name)
+    history = db.elo_history.history(engine_name, max_points=ELO_CHART_POINTS)
 
     if not history:
         messagebox.showinfo("No Data", f"No games found for:\n{engine_name}")
@@ -232,7 +605,7 @@ def show_elo_history(root, db, engine_name):
     tk.Label(win, text=f"📈 Elo History: {engine_name}",
              bg=BG, fg=ACCENT, font=('Segoe UI', 14, 'bold')).pack(pady=(14, 4))
 
-    final_elo         = history[-1][1]
+    final_elo         = summary['last']
     tier_lbl, tier_col = get_tier(final_elo)
     tk.Label(win, text=f"Current Rating: {final_elo}  ·  {tier_lbl}",
              bg=BG, fg=tier_col, font=('Segoe UI', 11, 'bold')).pack(pady=(0, 8))
@@ -245,8 +618,10 @@ def show_elo_history(root, db, engine_name):
                        highlightbackground='#333')
     canvas.pack(fill='both', expand=True)
 
-    elos = [h[1] for h in history]
-    n    = len(history)
+    elos  = [h[2] for h in history]
+    n     = len(history)
+    first = history[0][0]
+    span  = history[-1][0] - first
 
     def draw_chart(event=None):
         canvas.delete('all')
@@ -275,7 +650,9 @@ def show_elo_history(root, db, engine_name):
             return pad_t + int(plot_h * (1 - (e - min_elo) / elo_range))
 
         def game_x(i):
-            return pad_l + (int(plot_w * i / (n - 1)) if n > 1 else plot_w // 2)
+            # By game number: downsampled points are not evenly spaced
+            return pad_l + (int(plot_w * (history[i][0] - first) / span)
+                            if span else plot_w // 2)
 
         # Tier zone backgrounds
         for k, (threshold, _, color) in enumerate(RANK_TIERS):
@@ -287,16 +664,16 @@ def show_elo_history(root, db, engine_name):
                                         fill=color, stipple='gray12', outline='')
 
         # Line segments
-        points = [(game_x(i), elo_y(e)) for i, (_, e) in enumerate(history)]
+        points = [(game_x(i), elo_y(e)) for i, e in enumerate(elos)]
         if len(points) > 1:
             for i in range(len(points) - 1):
-                _, seg_col = get_tier(int((history[i][1] + history[i + 1][1]) / 2))
+                _, seg_col = get_tier(int((elos[i] + elos[i + 1]) / 2))
                 canvas.create_line(points[i][0], points[i][1],
                                    points[i+1][0], points[i+1][1],
                                    fill=seg_col, width=2, smooth=True)
 
         # Data points
-        for i, (_, e) in enumerate(history):
+        for i, e in enumerate(elos):
             x, y       = game_x(i), elo_y(e)
             _, pt_col  = get_tier(e)
             canvas.create_oval(x - 4, y - 4, x + 4, y + 4,
@@ -312,21 +689,21 @@ def show_elo_history(root, db, engine_name):
 
         # Start / end annotations
         if history:
-            canvas.create_text(game_x(0), elo_y(history[0][1]) - 12,
-                               text=str(history[0][1]),
+            canvas.create_text(game_x(0), elo_y(elos[0]) - 12,
+                               text=str(elos[0]),
                                fill="#AAA", font=('Consolas', 8))
-            canvas.create_text(game_x(n - 1), elo_y(history[-1][1]) - 12,
-                               text=str(history[-1][1]),
+            canvas.create_text(game_x(n - 1), elo_y(elos[-1]) - 12,
+                               text=str(elos[-1]),
                                fill=tier_col, font=('Consolas', 9, 'bold'))
 
     canvas.bind('<Configure>', draw_chart)
     win.after(100, draw_chart)
 
     # Summary row
-    if len(elos) > 1:
-        peak    = max(elos)
-        lowest  = min(elos)
-        change  = elos[-1] - elos[0]
+    if summary['games'] > 1:
+        peak    = summary['peak']
+        lowest  = summary['lowest']
+        change  = summary['last'] - summary['first']
         chg_str = f"+{change}" if change >= 0 else str(change)
         chg_col = "#00FF80" if change >= 0 else "#FF4444"
         summary_f = tk.Frame(win, bg=PANEL_BG)
@@ -335,7 +712,7 @@ def show_elo_history(root, db, engine_name):
             ("Peak",   str(peak),   "#FFD700"),
             ("Lowest", str(lowest), "#FF6B6B"),
             ("Change", chg_str,     chg_col),
-            ("Games",  str(n),      TEXT),
+            ("Games",  str(summary['games']), TEXT),
         ]:
             sf = tk.Frame(summary_f, bg=PANEL_BG)
             sf.pack(side='left', expand=True)
@@ -411,11 +788,12 @@ def show_statistics(root, db):
         count_lbl.config(text=f"{len(all_stats[0])} engine(s) shown")
 
     def refresh_stats(query=''):
-        stats = db.get_engine_stats(search_query=query)
         if sort_state['col']:
             key_name, _ = COL_META[sort_state['col']]
-            stats = sorted(stats, key=lambda x: x[key_name],
-                           reverse=sort_state['reverse'])
+            stats = db.get_engine_stats(search_query=query, order_by=key_name,
+                                        descending=sort_state['reverse'])
+        else:
+            stats = db.get_engine_stats(search_query=query)
         all_stats[0] = stats
         _render_rows(stats)
         _update_headings()
@@ -653,6 +1031,288 @@ def show_opening_stats(root, db, engine_name=None):
               padx=20, pady=8, cursor='hand2', relief='flat').pack(pady=(0, 12))
 
 
+# ═══════════════════════════════════════════════════════════
+#  Opening explorer
+# ═══════════════════════════════════════════════════════════
+
+_EXPLORER_COLUMNS = [('Move', 70, 'center'), ('Games', 70, 'center'),
+                     ('W / D / L', 110, 'center'), ('Score', 70, 'center'),
+                     ('Engines', 320, 'w')]
+
+
+def _explorer_nodes(db, board):
+    """Explorer continuations for *board*, each with its SAN added."""
+    if db is None or not hasattr(db, 'explore_position'):
+        return []
+    nodes = db.explore_position(board.to_fen())
+    if nodes:
+        legal = board.legal_moves()
+        for n in nodes:
+            uci = n['uci']
+            mv  = (8 - int(uci[1]), ord(uci[0]) - ord('a'),
+                   8 - int(uci[3]), ord(uci[2]) - ord('a'),
+                   uci[4] if len(uci) > 4 else None)
+            n['san'] = board._build_san(*mv, legal) if mv in legal else uci
+    return nodes
+
+
+def _make_explorer_tree(parent, height=10):
+    """Create the explorer Treeview (with scrollbar) inside *parent*."""
+    _apply_tree_style()
+    scroll = tk.Scrollbar(parent)
+    scroll.pack(side='right', fill='y')
+    tree = ttk.Treeview(parent, columns=[c[0] for c in _EXPLORER_COLUMNS],
+                        show='headings', height=height,
+                        yscrollcommand=scroll.set)
+    scroll.config(command=tree.yview)
+    for col, w, anch in _EXPLORER_COLUMNS:
+        tree.column(col, width=w, anchor=anch)
+        tree.heading(col, text=col)
+    tree.pack(side='left', fill='both', expand=True)
+    return tree
+
+
+def _fill_explorer_tree(tree, nodes):
+    tree.delete(*tree.get_children())
+    for n in nodes:
+        g = n['games'] or 1
+        wdl = (f"{n['white_wins'] / g * 100:.0f} / {n['draws'] / g * 100:.0f}"
+               f" / {n['black_wins'] / g * 100:.0f}")
+        engines = ", ".join(f"{name} ({cnt})" for name, cnt in n['engines'][:3])
+        tree.insert('', 'end', iid=n['uci'], values=(
+            n['san'], n['games'], wdl, f"{n['score'] * 100:.1f}%", engines))
+
+
+def show_opening_explorer(root, db, board=None):
+    """
+    Browse every continuation played in the database, move by move.
+
+    Each node lists the moves played from the current position with game
+    counts, White / draw / Black percentages, the score for the side to
+    move and the engines that played it.  Double-click a move to follow it.
+
+    Parameters
+    ----------
+    root  : tk.Tk | tk.Toplevel
+    db    : database.Database
+    board : core.board.Board | None — start position (default: initial)
+    """
+    start = Board()
+    if board is not None:
+        start._load_fen(board.to_fen())
+
+    win = tk.Toplevel(root)
+    win.title("📚 Opening Explorer")
+    win.configure(bg=BG)
+    win.geometry("760x560")
+    win.resizable(True, True)
+
+    tk.Label(win, text="📚 OPENING EXPLORER", bg=BG, fg=ACCENT,
+             font=('Segoe UI', 15, 'bold')).pack(pady=(14, 2))
+    tk.Label(win, text="Continuations played in the game database "
+                       "(index positions first for older games)",
+             bg=BG, fg="#666", font=('Segoe UI', 9)).pack()
+    tk.Frame(win, bg=ACCENT, height=2).pack(fill='x', padx=20, pady=(8, 6))
+
+    path_var = tk.StringVar()
+    tk.Label(win, textvariable=path_var, bg=PANEL_BG, fg="#00BFFF",
+             font=('Consolas', 10), anchor='w', padx=10, pady=6,
+             wraplength=700, justify='left').pack(fill='x', padx=20, pady=(0, 6))
+
+    body = tk.Frame(win, bg=BG)
+    body.pack(fill='both', expand=True, padx=20)
+    tree = _make_explorer_tree(body, height=14)
+
+    count_lbl = tk.Label(win, text="", bg=BG, fg="#666", font=('Segoe UI', 8))
+    count_lbl.pack(anchor='w', padx=20, pady=(4, 0))
+
+    # Stack of (board, san) from the start position to the current node
+    path = [(start, None)]
+
+    def _render():
+        board = path[-1][0]
+        sans  = [san for _, san in path[1:]]
+        if sans:
+            ply0 = (start.fullmove - 1) * 2 + (start.turn == 'b')
+            parts = []
+            for i, san in enumerate(sans):
+                ply = ply0 + i
+                if ply % 2 == 0:
+                    parts.append(f"{ply // 2 + 1}. {san}")
+                elif i == 0:
+                    parts.append(f"{ply // 2 + 1}... {san}")
+                else:
+                    parts.append(san)
+            path_var.set(" ".join(parts))
+        else:
+            path_var.set("Start position")
+        nodes = _explorer_nodes(db, board)
+        _fill_explorer_tree(tree, nodes)
+        total = sum(n['games'] for n in nodes)
+        count_lbl.config(text=f"{len(nodes)} move(s) · {total} game(s)"
+                         if nodes else "No games reached this position")
+
+    def _follow(event=None):
+        sel = tree.selection()
+        if not sel:
+            return
+        uci   = sel[0]
+        board = path[-1][0]
+        fc = ord(uci[0]) - ord('a'); fr = 8 - int(uci[1])
+        tc = ord(uci[2]) - ord('a'); tr = 8 - int(uci[3])
+        san = tree.item(sel[0])['values'][0]
+        path.append((board._apply_raw(fr, fc, tr, tc,
+                                      uci[4] if len(uci) > 4 else None), san))
+        _render()
+
+    def _back():
+        if len(path) > 1:
+            path.pop()
+            _render()
+
+    def _to_start():
+        del path[1:]
+        _render()
+
+    tree.bind('<Double-1>', _follow)
+    tree.bind('<Return>', _follow)
+    win.bind('<BackSpace>', lambda e: _back())
+
+    btn_frame = tk.Frame(win, bg=BG)
+    btn_frame.pack(fill='x', padx=20, pady=(6, 12))
+    for text, cmd in [("⏮ Start", _to_start), ("◀ Back", _back)]:
+        tk.Button(btn_frame, text=text, command=cmd,
+                  bg=BTN_BG, fg=TEXT, font=('Segoe UI', 10),
+                  padx=15, pady=8, cursor='hand2', relief='flat').pack(side='left', padx=5)
+    tk.Button(btn_frame, text="✕ Close", command=win.destroy,
+              bg=BTN_BG, fg=TEXT, font=('Segoe UI', 10),
+              padx=15, pady=8, cursor='hand2', relief='flat').pack(side='right', padx=5)
+    _render()
+
+
+# ═══════════════════════════════════════════════════════════
+#  Engine learning file viewer
+# ═══════════════════════════════════════════════════════════
+
+def show_learning_file(root, path):
+    """
+    Show coverage and depth statistics for an engine .learn / .exp file.
+
+    Indexing runs in a background thread; the window fills in when the
+    (cached) index is ready.
+
+    Parameters
+    ----------
+    root : tk.Tk | tk.Toplevel
+    path : str — learning file to inspect
+    """
+    import os
+    import threading
+    from core.engine_learning import EngineLearningFile
+
+    learn = EngineLearningFile(path)
+    title = f"🧠 Learning File — {os.path.basename(path)}"
+
+    win = tk.Toplevel(root)
+    win.title(title)
+    win.configure(bg=BG)
+    win.geometry("860x600")
+    win.resizable(True, True)
+
+    def _on_close():
+        learn.close()
+        win.destroy()
+    win.protocol("WM_DELETE_WINDOW", _on_close)
+
+    tk.Label(win, text=title, bg=BG, fg=ACCENT,
+             font=('Segoe UI', 15, 'bold')).pack(pady=(14, 2))
+    tk.Frame(win, bg=ACCENT, height=2).pack(fill='x', padx=20, pady=(4, 8))
+
+    status = tk.Label(win, text="⏳ Indexing…", bg=BG, fg="#888",
+                      font=('Segoe UI', 9))
+    status.pack(anchor='w', padx=20)
+
+    summary_frame = tk.Frame(win, bg=PANEL_BG)
+    summary_frame.pack(fill='x', padx=16, pady=(4, 6))
+
+    body = tk.Frame(win, bg=BG)
+    body.pack(fill='both', expand=True, padx=16, pady=(0, 8))
+
+    _apply_tree_style()
+    depth_tree = ttk.Treeview(body, columns=('Depth', 'Records', 'Bar'),
+                              show='headings', height=12)
+    for col, w, anch in [('Depth', 60, 'center'), ('Records', 80, 'center'),
+                         ('Bar', 180, 'w')]:
+        depth_tree.column(col, width=w, anchor=anch)
+        depth_tree.heading(col, text=col)
+    depth_tree.pack(side='left', fill='y', padx=(0, 8))
+
+    columns = ('Key', 'Move', 'Kind', 'Depth', 'Score', 'Count')
+    scroll  = tk.Scrollbar(body)
+    scroll.pack(side='right', fill='y')
+    top_tree = ttk.Treeview(body, columns=columns, show='headings',
+                            yscrollcommand=scroll.set)
+    scroll.config(command=top_tree.yview)
+    for col, w, anch in [('Key', 170, 'w'), ('Move', 60, 'center'),
+                         ('Kind', 50, 'center'), ('Depth', 50, 'center'),
+                         ('Score', 60, 'center'), ('Count', 55, 'center')]:
+        top_tree.column(col, width=w, anchor=anch)
+        top_tree.heading(col, text=col)
+    top_tree.pack(side='left', fill='both', expand=True)
+
+    def _progress(n):
+        win.after(0, lambda: status.winfo_exists() and
+                  status.config(text=f"⏳ Indexing… {n:,} records"))
+
+    def _work():
+        try:
+            stats = learn.stats(on_progress=_progress)
+            top   = learn.top_entries(200)
+            win.after(0, lambda: _show(stats, top))
+        except Exception as e:
+            msg = f"⚠ Could not read file: {e}"    # e is unbound after the block
+            win.after(0, lambda m=msg: status.winfo_exists() and
+                      status.config(text=m, fg="#FF6B6B"))
+
+    def _show(stats, top):
+        if not win.winfo_exists():
+            return
+        status.config(text=f"Index: {learn.index_path}")
+        kinds = ", ".join(f"{k} {v:,}" for k, v in stats['kinds'].items()) or "—"
+        for lbl, val, col in [
+            ("Records:",    f"{stats['records']:,}",   ACCENT),
+            ("Positions:",  f"{stats['positions']:,}", "#00BFFF"),
+            ("Moves / pos:", f"{stats['avg_moves_per_pos']:.2f}"
+                             f"  (max {stats['max_moves_per_pos']})", TEXT),
+            ("Depth:",      f"avg {stats['avg_depth']:.1f}  max {stats['max_depth']}"
+                            if stats['depth_hist'] else "—", "#FFD700"),
+            ("Kinds:",      kinds, TEXT),
+        ]:
+            f = tk.Frame(summary_frame, bg=PANEL_BG)
+            f.pack(side='left', expand=True, padx=8, pady=6)
+            tk.Label(f, text=lbl, bg=PANEL_BG, fg="#666",
+                     font=('Segoe UI', 8)).pack()
+            tk.Label(f, text=val, bg=PANEL_BG, fg=col,
+                     font=('Segoe UI', 9, 'bold'), wraplength=180).pack()
+
+        hist = stats['depth_hist']
+        peak = max(hist.values()) if hist else 1
+        for depth, n in hist.items():
+            filled = int(n / peak * 16)
+            depth_tree.insert('', 'end', values=(
+                depth, n, '█' * filled + '░' * (16 - filled)))
+        for e in top:
+            top_tree.insert('', 'end', values=(
+                e['key'], e['uci'], e['kind'], e['depth'] or '—',
+                e['score'], e['count']))
+
+    threading.Thread(target=_work, daemon=True).start()
+
+    tk.Button(win, text="✕ Close", command=_on_close,
+              bg=BTN_BG, fg=TEXT, font=('Segoe UI', 10),
+              padx=20, pady=8, cursor='hand2', relief='flat').pack(pady=(0, 12))
+
+
 # ═══════════════════════════════════════════════════════════
 #  Game history window
 # ═══════════════════════════════════════════════════════════
@@ -690,29 +1350,75 @@ def show_game_history(root, db, filter_engine=None, opening_book=None):
                        value=val, bg=BG, fg="#AAA",
                        selectcolor=BTN_BG, activebackground=BG,
                        font=('Segoe UI', 8),
-                       command=lambda: refresh_history('')
+                       command=lambda: refresh_history(page_state['query'])
                        ).pack(side='left', padx=6)
 
+    # ── Result / opening / date filters (applied in SQL) ──
+    tk.Label(filter_row, text="  Result:", bg=BG, fg="#888",
+             font=('Segoe UI', 8)).pack(side='left')
+    result_filter_var = tk.StringVar(value='All')
+    result_menu = tk.OptionMenu(filter_row, result_filter_var,
+                                'All', '1-0', '0-1', '1/2-1/2',
+                                command=lambda _v: refresh_history(page_state['query']))
+    result_menu.config(bg=BTN_BG, fg=TEXT, relief='flat', highlightthickness=0,
+                       font=('Segoe UI', 8), activebackground=BTN_HOV)
+    result_menu.pack(side='left', padx=(2, 6))
+
+    filter_entries = {}
+    for key, lbl, width in [('opening', 'Opening/ECO:', 14),
+                            ('date_from', 'From:', 10),
+                            ('date_to', 'To:', 10)]:
+        tk.Label(filter_row, text=lbl, bg=BG, fg="#888",
+                 font=('Segoe UI', 8)).pack(side='left', padx=(4, 0))
+        ent = tk.Entry(filter_row, width=width, bg=BTN_BG, fg=TEXT,
+                       insertbackground=TEXT, relief='flat', font=('Segoe UI', 8))
+        ent.pack(side='left', padx=2)
+        ent.bind('<Return>', lambda e: refresh_history(page_state['query']))
+        filter_entries[key] = ent
+
     search_container = tk.Frame(win, bg=BG)
     search_container.pack(fill='x', padx=20, pady=(4, 4))
 
-    all_games_cache = [None]
+    PAGE_SIZE       = 200
+    all_games_cache = [[]]
     tree_ref2       = [None]
     count_lbl2      = [None]
+    page_state      = {'query': '', 'last_id': None, 'done': True}
 
-    def refresh_history(query=''):
+    def _current_filters():
         src = source_filter_var.get()
-        source_arg = src if src != 'all' else None
-        games = db.get_all_games(
-            filter_engine=filter_engine,
-            search_query=query,
-            source_filter=source_arg,
-        )
-        all_games_cache[0] = games
+        res = result_filter_var.get()
+        filters = {
+            'engine': filter_engine,
+            'source': src if src != 'all' else None,
+            'result': res if res != 'All' else None,
+            'search': page_state['query'] or None,
+        }
+        for key, ent in filter_entries.items():
+            filters[key] = ent.get().strip() or None
+        return filters
+
+    def refresh_history(query=''):
+        """Reset the list and load the first page for the current filters."""
+        page_state.update(query=query, last_id=None, done=False)
+        all_games_cache[0] = []
         tree = tree_ref2[0]
         if tree is None: return
         for row in tree.get_children():
             tree.delete(row)
+        load_next_page()
+
+    def load_next_page():
+        """Append the next keyset page; called again as the user scrolls."""
+        tree = tree_ref2[0]
+        if tree is None or page_state['done']:
+            return
+        games = db.get_games_page(after_id=page_state['last_id'],
+                                  limit=PAGE_SIZE, filters=_current_filters())
+        page_state['done'] = len(games) < PAGE_SIZE
+        if games:
+            page_state['last_id'] = games[-1][0]
+        all_games_cache[0].extend(games)
 
         for game in games:
             # ── Use helper to safely unpack regardless of column count ──
@@ -741,10 +1447,17 @@ def show_game_history(root, db, filter_engine=None, opening_book=None):
                         tags=(tag,))
 
         if count_lbl2[0]:
-            count_lbl2[0].config(text=f"{len(games)} game(s) shown")
+            more = "" if page_state['done'] else "  ·  scroll for more"
+            count_lbl2[0].config(
+                text=f"{len(all_games_cache[0])} game(s) shown{more}")
+
+    def _on_tree_scroll(first, last):
+        scrollbar.set(first, last)
+        if float(last) >= 0.95 and not page_state['done']:
+            win.after_idle(load_next_page)
 
     sb_frame2, _ = make_search_bar(search_container, refresh_history,
-                                    placeholder="🔍 Search by engine, result, reason, date…")
+                                    placeholder="🔍 Search engines, events, openings, reasons, tags…")
     sb_frame2.pack(fill='x')
 
     # ── Treeview ──────────────────────────────────────────
@@ -756,7 +1469,7 @@ def show_game_history(root, db, filter_engine=None, opening_book=None):
     columns = ('ID', 'Date', 'Time', 'White', 'Black',
                'Result', 'Reason', 'Moves', 'Duration')
     tree = ttk.Treeview(tree_frame, columns=columns, show='headings',
-                        yscrollcommand=scrollbar.set)
+                        yscrollcommand=_on_tree_scroll)
     scrollbar.config(command=tree.yview)
     tree_ref2[0] = tree
     _apply_tree_style()
@@ -832,8 +1545,27 @@ def show_game_history(root, db, filter_engine=None, opening_book=None):
                                    show_game_history(root, db, opening_book=opening_book)],
                   bg=BTN_BG, fg=TEXT, font=('Segoe UI', 10), padx=15, pady=8,
                   cursor='hand2').pack(side='left', padx=5)
+    def export_shown():
+        """Stream every game matching the current filters to a PGN file."""
+        from tournament.manager import export_pgn_async    # imports ui.views
+        _, options = ask_pgn_export_options(win, show_filters=False)
+        if options is None:
+            return
+        path = filedialog.asksaveasfilename(
+            parent=win, defaultextension=".pgn",
+            filetypes=[("PGN", "*.pgn"), ("Gzipped PGN", "*.pgn.gz"), ("All", "*.*")],
+            title="Export Games")
+        if not path:
+            return
+        filters = _current_filters()
+        export_pgn_async(win, path, lambda p: db.export_pgn(
+            path, filters, on_progress=p, **options))
+
+    tk.Button(btn_frame, text="Export PGN…", command=export_shown,
+              bg=BTN_BG, fg=TEXT, font=('Segoe UI', 10), padx=15, pady=8,
+              cursor='hand2').pack(side='left', padx=5)
     tk.Button(btn_frame, text="Refresh",
-              command=lambda: refresh_history(''),
+              command=lambda: refresh_history(page_state['query']),
               bg=BTN_BG, fg=TEXT, font=('Segoe UI', 10), padx=15, pady=8,
               cursor='hand2').pack(side='left', padx=5)
     tk.Button(btn_frame, text="Close", command=win.destroy,
@@ -971,9 +1703,20 @@ def show_pgn_viewer(root, db, pgn, game_info, all_games, opening_book=None):
                                highlightcolor=ACCENT, highlightbackground='#333')
     replay_canvas.pack()
 
-    moves_list         = _parse_pgn_moves(pgn)
+    # Packed move list from the database; legacy games are parsed once
+    moves_list = None
+    if db is not None and hasattr(db, 'get_game_moves'):
+        moves_list = db.get_game_moves(current_game_id)
+    if moves_list is None:
+        moves_list = _parse_pgn_moves(pgn)
+    sans_list          = san_moves(pgn)
     current_move_index = [0]
 
+    def _replay_to(n):
+        replay_board.reset()
+        try: replay_board.replay_moves(moves_list[:n], sans_list[:n])
+        except Exception: pass
+
     replay_opening_var = tk.StringVar(value="")
     tk.Label(left_frame, textvariable=replay_opening_var,
              bg=BG, fg="#00BFFF", font=('Segoe UI', 9, 'italic'),
@@ -987,6 +1730,12 @@ def show_pgn_viewer(root, db, pgn, game_info, all_games, opening_book=None):
             else:
                 replay_opening_var.set("")
 
+    explorer_ref = [None]
+
+    def _update_replay_explorer():
+        if explorer_ref[0] is not None:
+            _fill_explorer_tree(explorer_ref[0], _explorer_nodes(db, replay_board))
+
     def draw_replay_board(highlight_move=None):
         replay_canvas.delete('all')
         lm_from = lm_to = None
@@ -1014,6 +1763,7 @@ def show_pgn_viewer(root, db, pgn, game_info, all_games, opening_book=None):
         replay_canvas.create_rectangle(0, 0, replay_size * 8, replay_size * 8,
                                         outline='#555', width=1)
         _update_replay_opening()
+        _update_replay_explorer()
 
     move_label = tk.Label(left_frame, text="Start position", bg=BG, fg=ACCENT,
                           font=('Segoe UI', 11, 'bold'))
@@ -1036,20 +1786,15 @@ def show_pgn_viewer(root, db, pgn, game_info, all_games, opening_book=None):
         draw_replay_board(); update_move_label()
 
     def go_to_end():
-        replay_board.reset()
-        for move in moves_list:
-            try: replay_board.apply_uci(move)
-            except: break
+        _replay_to(len(moves_list))
         current_move_index[0] = len(moves_list)
         draw_replay_board(moves_list[-1] if moves_list else None)
         update_move_label()
 
     def prev_move():
         if current_move_index[0] > 0:
-            replay_board.reset(); current_move_index[0] -= 1
-            for i in range(current_move_index[0]):
-                try: replay_board.apply_uci(moves_list[i])
-                except: break
+            current_move_index[0] -= 1
+            _replay_to(current_move_index[0])
             last = moves_list[current_move_index[0] - 1] if current_move_index[0] > 0 else None
             draw_replay_board(last); update_move_label()
 
@@ -1103,6 +1848,12 @@ def show_pgn_viewer(root, db, pgn, game_info, all_games, opening_book=None):
     pgn_text.insert('1.0', pgn)
     pgn_text.config(state='disabled')
 
+    tk.Label(right_frame, text="Opening Explorer", bg=BG, fg=ACCENT,
+             font=('Segoe UI', 10, 'bold')).pack(anchor='w')
+    explorer_frame = tk.Frame(right_frame, bg=BG)
+    explorer_frame.pack(fill='x', pady=(0, 10))
+    explorer_ref[0] = _make_explorer_tree(explorer_frame, height=5)
+
     btn_frame2 = tk.Frame(right_frame, bg=BG)
     btn_frame2.pack(fill='x', pady=(0, 10))
 